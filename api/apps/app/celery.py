@@ -4,6 +4,9 @@ from celery import Celery
 from celery.schedules import crontab
 from django.conf import settings
 
+import apps.core.instrumentation  # noqa: F401 connects the task metrics signal handlers
+import apps.core.routers  # noqa: F401 keeps tasks on the primary database
+
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "settings.base")
 
 app = Celery("app")
@@ -15,6 +18,14 @@ app.conf.beat_schedule = {
         "task": "apps.privacy.tasks.execute_delete_account_requests",
         "schedule": crontab(hour='*/1', minute='0'),
     },
+    "create_tag_value_partitions": {
+        "task": "apps.kims.tasks.create_tag_value_partitions_task",
+        "schedule": crontab(hour='0', minute='30'),
+    },
+    "downsample_tag_values": {
+        "task": "apps.kims.tasks.downsample_tag_values_task",
+        "schedule": crontab(hour='1', minute='30'),
+    },
     "sync_vessels": {
         "task": "apps.kims.tasks.sync_vessels_task",
         "schedule": crontab(minute=settings.SYNC_VESSELS_TASK_SCHEDULE_MINUTE),
@@ -22,6 +22,7 @@ from django.urls import URLPattern, URLResolver, include, path
 from drf_spectacular.views import SpectacularAPIView, SpectacularSwaggerView
 
 from apps.core.debug import sentry_debug
+from apps.core.instrumentation import metrics_view
 from apps.tenants.apis import TenantDetailsApi
 from apps.tenants.forms import AdminCaptchaAuthenticationForm
 
@@ -45,6 +46,11 @@ urlpatterns: list[URLPattern | URLResolver] = [
     path('api/', include('apps.privacy.urls')),
 ]
 
+if settings.INSTRUMENTATION_ENABLED:
+    urlpatterns += [
+        path('metrics/', metrics_view, name='metrics'),
+    ]
+
 if settings.DEBUG:
     urlpatterns += [
         path('api/docs/schema/', SpectacularAPIView.as_view(), name='schema'),
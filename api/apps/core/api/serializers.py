@@ -1,5 +1,7 @@
 from rest_framework import serializers
 
+from apps.core.export import ExportFormat
+
 
 class DraftSerializer(serializers.Serializer):
     draft = serializers.BooleanField()
@@ -7,3 +9,8 @@ class DraftSerializer(serializers.Serializer):
 
 class IDSerializer(serializers.Serializer):
     id = serializers.IntegerField()
+
+
+class ExportParametersSerializer(serializers.Serializer):
+    file_format = serializers.ChoiceField(choices=ExportFormat.choices, default=ExportFormat.CSV)
+    gzip = serializers.BooleanField(default=False)
@@ -0,0 +1,106 @@
+import csv
+import json
+import zlib
+from typing import Any, Iterable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.http import StreamingHttpResponse
+
+# rows fetched from the database per server-side cursor round trip
+EXPORT_CHUNK_SIZE = 2000
+# bytes collected before a chunk is sent to the client
+EXPORT_BUFFER_SIZE = 64 * 1024
+
+
+class ExportFormat(models.TextChoices):
+    CSV = 'csv', 'CSV'
+    NDJSON = 'ndjson', 'NDJSON'
+
+
+EXPORT_CONTENT_TYPES = {
+    ExportFormat.CSV: 'text/csv',
+    ExportFormat.NDJSON: 'application/x-ndjson',
+}
+
+
+class Echo:
+    """
+    File-like object returning written values instead of storing them.
+    """
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(*, header: list[str], rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    writer = csv.DictWriter(Echo(), fieldnames=header, extrasaction='ignore')
+    yield writer.writeheader()  # type: ignore
+
+    for row in rows:
+        yield writer.writerow(row)  # type: ignore
+
+
+def ndjson_lines(*, header: list[str], rows: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps({key: row.get(key) for key in header}, cls=DjangoJSONEncoder) + '\n'
+
+
+def buffer_lines(lines: Iterable[str]) -> Iterator[bytes]:
+    buffer: list[bytes] = []
+    buffer_size = 0
+
+    for line in lines:
+        encoded_line = line.encode()
+        buffer.append(encoded_line)
+        buffer_size += len(encoded_line)
+
+        if buffer_size >= EXPORT_BUFFER_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            buffer_size = 0
+
+    if buffer:
+        yield b''.join(buffer)
+
+
+def gzip_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+
+    for chunk in chunks:
+        compressed_chunk = compressor.compress(chunk)
+        if compressed_chunk:
+            yield compressed_chunk
+
+    yield compressor.flush()
+
+
+def export_response(
+    *,
+    rows: Iterable[dict[str, Any]],
+    header: list[str],
+    filename: str,
+    export_format: ExportFormat,
+    gzip: bool = False,
+) -> StreamingHttpResponse:
+    """
+    Stream rows as a downloadable file. Rows are consumed lazily, so passing an iterator
+    (e.g. a queryset .iterator()) keeps memory usage constant regardless of the export size.
+    """
+    if export_format == ExportFormat.CSV:
+        lines = csv_lines(header=header, rows=rows)
+    else:
+        lines = ndjson_lines(header=header, rows=rows)
+
+    chunks = buffer_lines(lines)
+    filename = f'{filename}.{export_format}'
+    content_type = EXPORT_CONTENT_TYPES[export_format]
+
+    if gzip:
+        chunks = gzip_chunks(chunks)
+        filename = f'{filename}.gz'
+        content_type = 'application/gzip'
+
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename={filename}'
+    return response
@@ -1,18 +1,238 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import partial
+from typing import Any, Callable, Iterable, Iterator
+
+from celery import Task
+from celery.signals import task_postrun, task_prerun
+from celery_haystack.indexes import CelerySearchIndex
 from celery_haystack.signals import CelerySignalProcessor
-from celery_haystack.utils import get_update_task
+from django.apps import apps
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse
+from haystack import connection_router
+from haystack import connections as haystack_connections
+from haystack.exceptions import NotHandled
+from haystack.utils import get_identifier
+
+logger = logging.getLogger(__name__)
+
+
+class SearchIndexUpdates:
+    """
+    Pending search index changes collapsed by object identifier. Only the last action of every
+    object is kept, e.g. an update followed by a delete results in a single delete.
+    """
+
+    def __init__(self) -> None:
+        self.actions: dict[str, str] = {}
+        self.flush_scheduled = False
+
+    def add(self, action: str, identifier: str) -> None:
+        self.actions.pop(identifier, None)
+        self.actions[identifier] = action
+
+    def schedule_flush(self) -> None:
+        """
+        Flush once the current transaction commits, or immediately outside of a transaction.
+        """
+        if not self.flush_scheduled:
+            self.flush_scheduled = True
+            transaction.on_commit(self.flush)
+
+    def flush(self) -> None:
+        actions = self.actions
+        self.actions = {}
+
+        processor = apps.get_app_config('haystack').signal_processor  # type: ignore
+        if actions and isinstance(processor, BatchedCelerySignalProcessor):
+            processor.dispatch(actions)
+
+
+current_search_index_updates: ContextVar[SearchIndexUpdates | None] = ContextVar(
+    'current_search_index_updates', default=None
+)
+
+
+def group_by_model(actions: dict[str, str]) -> dict[str, tuple[list[str], list[str]]]:
+    """
+    Split identifiers (e.g. 'projects.plan.23') into updated and deleted pks of every model.
+    """
+    updates: defaultdict[str, tuple[list[str], list[str]]] = defaultdict(lambda: ([], []))
+
+    for identifier, action in actions.items():
+        model_label, pk = identifier.rsplit('.', 1)
+        updated_pks, deleted_pks = updates[model_label]
+        if action == 'delete':
+            deleted_pks.append(pk)
+        else:
+            updated_pks.append(pk)
 
+    return updates
 
-class SyncCelerySignalProcessor(CelerySignalProcessor):
-    def run_task(self) -> None:
+
+def add_search_index_update(action: str, identifier: str) -> None:
+    updates = current_search_index_updates.get()
+    if updates is None:
+        # outside of batch_search_index_updates every change is dispatched on its own
+        updates = SearchIndexUpdates()
+        transaction.on_commit(partial(updates.add, action, identifier))
+        updates.schedule_flush()
+        return
+
+    # recorded when the transaction commits, so actions of rolled back savepoints are dropped with them
+    transaction.on_commit(partial(updates.add, action, identifier))
+
+
+class BatchedCelerySignalProcessor(CelerySignalProcessor):
+    """
+    Collect search index changes of a request or a Celery task (see batch_search_index_updates)
+    and dispatch a single update task per model once they are committed.
+    """
+
+    def enqueue(self, action: str, instance: Model, sender: type[Model], **kwargs: Any) -> None:
+        if not self.is_indexed(action, instance, sender):
+            return
+
+        add_search_index_update(action, get_identifier(instance))
+
+    def is_indexed(self, action: str, instance: Model, sender: type[Model]) -> bool:
+        for using in self.connection_router.for_write(instance=instance):
+            try:
+                index = self.connections[using].get_unified_index().get_index(sender)
+            except NotHandled:
+                continue
+
+            if isinstance(index, CelerySearchIndex) and (action == 'delete' or index.should_update(instance)):
+                return True
+
+        return False
+
+    def dispatch_task(self, task: Callable, *args: Any) -> None:
         options = {}
         if settings.CELERY_HAYSTACK_QUEUE:
             options['queue'] = settings.CELERY_HAYSTACK_QUEUE
         if settings.CELERY_HAYSTACK_COUNTDOWN:
             options['countdown'] = settings.CELERY_HAYSTACK_COUNTDOWN
 
-        if self._queue:  # type: ignore
-            task = get_update_task()
-            task.apply((self._queue,), {}, **options)  # type: ignore
+        task.apply_async(args, **options)  # type: ignore
+
+    def dispatch(self, actions: dict[str, str]) -> None:
+        from apps.core.tasks import update_search_index_task
+
+        for model_label, (updated_pks, deleted_pks) in group_by_model(actions).items():
+            self.dispatch_task(update_search_index_task, model_label, updated_pks, deleted_pks)
+
+
+class SyncCelerySignalProcessor(BatchedCelerySignalProcessor):
+    def dispatch_task(self, task: Callable, *args: Any) -> None:
+        task.apply(args)  # type: ignore
+
+
+@contextmanager
+def batch_search_index_updates() -> Iterator[SearchIndexUpdates]:
+    """
+    Collect search index changes made within the block, including changes made in separate
+    transactions, and dispatch them once the block exits and the outer transaction commits.
+    Changes of rolled back transactions and savepoints are not dispatched, even when the block
+    exits with an exception.
+    """
+    updates = current_search_index_updates.get()
+    if updates is not None:
+        yield updates
+        return
+
+    updates = SearchIndexUpdates()
+    token = current_search_index_updates.set(updates)
+
+    try:
+        yield updates
+    finally:
+        current_search_index_updates.reset(token)
+        updates.schedule_flush()
+
+
+class SearchIndexUpdatesMiddleware:
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        with batch_search_index_updates():
+            return self.get_response(request)
+
+
+task_search_index_updates: dict[str, ExitStack] = {}
+
+
+@task_prerun.connect
+def start_task_search_index_updates(task_id: str, task: Task, **kwargs: Any) -> None:
+    stack = ExitStack()
+    stack.enter_context(batch_search_index_updates())
+    task_search_index_updates[task_id] = stack
+
+
+@task_postrun.connect
+def finish_task_search_index_updates(task_id: str, task: Task, **kwargs: Any) -> None:
+    stack = task_search_index_updates.pop(task_id, None)
+    if stack is not None:
+        stack.close()
+
+
+def search_index_version_key(tenant_id: int | None = None) -> str:
+    if tenant_id is None:
+        return 'search-index-version'
+    return f'search-index-version/{tenant_id}'
+
+
+def get_search_index_version(tenant_id: int) -> str:
+    """
+    Return a token changing whenever search documents of the tenant are updated or any document is removed.
+    """
+    global_key = search_index_version_key()
+    tenant_key = search_index_version_key(tenant_id)
+    versions = cache.get_many([global_key, tenant_key])
+    return f'{versions.get(global_key, 0)}-{versions.get(tenant_key, 0)}'
+
+
+def touch_search_index(tenant_ids: Iterable[int] | None = None) -> None:
+    """
+    Change the search index version of the given tenants, or of all tenants when tenant_ids is None.
+    """
+    version = time.time_ns()
+
+    if tenant_ids is None:
+        cache.set(search_index_version_key(), version, None)
+    else:
+        cache.set_many({search_index_version_key(tenant_id): version for tenant_id in tenant_ids}, None)
+
+
+def update_search_index(*, model_label: str, updated_pks: list[str], deleted_pks: list[str]) -> None:
+    model = apps.get_model(model_label)
+
+    for using in connection_router.for_write(models=[model]):
+        index = haystack_connections[using].get_unified_index().get_index(model)
+        backend = index.get_backend(using)
+
+        instances = list(index.index_queryset(using=using).filter(pk__in=updated_pks)) if updated_pks else []
+        if instances:
+            backend.update(index, instances)
+
+        # objects excluded by the index queryset (e.g. draft monitors) are removed as well
+        indexed_pks = {str(instance.pk) for instance in instances}
+        removed_pks = [*deleted_pks, *(pk for pk in updated_pks if pk not in indexed_pks)]
+        for pk in removed_pks:
+            index.remove_object(f'{model_label}.{pk}', using=using)
+
+        if removed_pks:
+            # owners of removed documents are unknown
+            touch_search_index()
+        elif instances:
+            touch_search_index({index.fields['tenant_id'].prepare(instance) for instance in instances})
 
-            self._queue = []  # type: ignore
+    logger.info(f'Updated {len(updated_pks)} and deleted {len(deleted_pks)} {model_label} search index entries')
@@ -0,0 +1,211 @@
+import logging
+import time
+from collections import defaultdict
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterator
+
+from celery import Task
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+from redis.connection import Connection
+from redis.exceptions import RedisError
+from requests import Session
+
+from apps.core.redis import get_redis_client
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = 'instrumentation:metrics'
+METRICS_PREFIX = 'stepwise'
+
+
+@dataclass
+class Metrics:
+    queries: int = 0
+    # seconds
+    db_time: float = 0.0
+    redis_calls: int = 0
+    http_calls: int = 0
+    # seconds
+    total_time: float = 0.0
+
+    @property
+    def python_time(self) -> float:
+        return max(self.total_time - self.db_time, 0.0)
+
+
+current_metrics: ContextVar[Metrics | None] = ContextVar('current_metrics', default=None)
+
+
+def count_redis_call(send_packed_command: Callable) -> Callable:
+    def wrapper(self: Connection, *args: Any, **kwargs: Any) -> Any:
+        metrics = current_metrics.get()
+        if metrics:
+            metrics.redis_calls += 1
+        return send_packed_command(self, *args, **kwargs)
+
+    return wrapper
+
+
+def count_http_call(send: Callable) -> Callable:
+    def wrapper(self: Session, *args: Any, **kwargs: Any) -> Any:
+        metrics = current_metrics.get()
+        if metrics:
+            metrics.http_calls += 1
+        return send(self, *args, **kwargs)
+
+    return wrapper
+
+
+# every round trip to redis (including cache and celery broker calls) and every outgoing http request
+# made while metrics are being collected is counted
+Connection.send_packed_command = count_redis_call(Connection.send_packed_command)  # type: ignore
+Session.send = count_http_call(Session.send)  # type: ignore
+
+
+def make_db_wrapper(metrics: Metrics) -> Callable:
+    def db_wrapper(execute: Callable, sql: str, params: Any, many: bool, context: dict) -> Any:
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.queries += 1
+            metrics.db_time += time.perf_counter() - start
+
+    return db_wrapper
+
+
+@contextmanager
+def collect_metrics() -> Iterator[Metrics]:
+    metrics = Metrics()
+    token = current_metrics.set(metrics)
+    start = time.perf_counter()
+
+    try:
+        with ExitStack() as stack:
+            db_wrapper = make_db_wrapper(metrics)
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(db_wrapper))
+            yield metrics
+    finally:
+        metrics.total_time = time.perf_counter() - start
+        current_metrics.reset(token)
+
+
+def metric_field(name: str, label: str, value: str) -> str:
+    return f'{name}|{label}|{value}'
+
+
+def record_metrics(kind: str, name: str, metrics: Metrics) -> None:
+    try:
+        with get_redis_client().pipeline(transaction=False) as pipeline:
+            pipeline.hincrby(METRICS_KEY, metric_field(f'{kind}_calls_total', kind, name), 1)
+            pipeline.hincrby(METRICS_KEY, metric_field(f'{kind}_db_queries_total', kind, name), metrics.queries)
+            pipeline.hincrbyfloat(METRICS_KEY, metric_field(f'{kind}_db_seconds_total', kind, name), metrics.db_time)
+            pipeline.hincrbyfloat(
+                METRICS_KEY, metric_field(f'{kind}_python_seconds_total', kind, name), metrics.python_time
+            )
+            pipeline.hincrby(METRICS_KEY, metric_field(f'{kind}_redis_calls_total', kind, name), metrics.redis_calls)
+            pipeline.hincrby(METRICS_KEY, metric_field(f'{kind}_http_calls_total', kind, name), metrics.http_calls)
+            pipeline.execute()
+    except RedisError as e:
+        logger.warning(f'Unable to record metrics for {kind} {name}.', exc_info=e)
+
+
+def render_metrics() -> str:
+    """
+    Render recorded metrics in the Prometheus text exposition format.
+    """
+    samples: defaultdict[str, list[str]] = defaultdict(list)
+
+    for field, value in sorted(get_redis_client().hgetall(METRICS_KEY).items()):
+        name, label, label_value = field.split('|', 2)
+        samples[name].append(f'{METRICS_PREFIX}_{name}{{{label}="{label_value}"}} {value}')
+
+    lines = []
+    for name, metric_samples in samples.items():
+        lines.append(f'# TYPE {METRICS_PREFIX}_{name} counter')
+        lines.extend(metric_samples)
+
+    return '\n'.join(lines) + '\n'
+
+
+def server_timing_header(metrics: Metrics) -> str:
+    return ', '.join(
+        [
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f'python;dur={metrics.python_time * 1000:.1f}',
+            f'redis;desc="{metrics.redis_calls} calls"',
+            f'http;desc="{metrics.http_calls} calls"',
+            f'total;dur={metrics.total_time * 1000:.1f}',
+        ]
+    )
+
+
+def get_view_name(request: HttpRequest) -> str:
+    resolver_match = request.resolver_match
+    if resolver_match is None:
+        return 'unknown'
+
+    view = getattr(resolver_match.func, 'view_class', resolver_match.func)
+    return view.__name__
+
+
+class InstrumentationMiddleware:
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not settings.INSTRUMENTATION_ENABLED:
+            return self.get_response(request)
+
+        with collect_metrics() as metrics:
+            response = self.get_response(request)
+
+        view_name = get_view_name(request)
+        response['Server-Timing'] = server_timing_header(metrics)
+        response.instrumentation_view = view_name  # type: ignore
+        response.instrumentation_metrics = metrics  # type: ignore
+
+        record_metrics('view', view_name, metrics)
+        return response
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    authorization = request.headers.get('Authorization', '')
+    token = settings.INSTRUMENTATION_METRICS_TOKEN
+
+    if not (request.user.is_staff or (token and authorization == f'Bearer {token}')):
+        return HttpResponse(status=403)
+
+    return HttpResponse(render_metrics(), content_type='text/plain; version=0.0.4')
+
+
+task_metrics: dict[str, ExitStack] = {}
+
+
+@task_prerun.connect
+def start_task_metrics(task_id: str, task: Task, **kwargs: Any) -> None:
+    if not settings.INSTRUMENTATION_ENABLED:
+        return
+
+    stack = ExitStack()
+    stack.enter_context(collect_metrics())
+    task_metrics[task_id] = stack
+
+
+@task_postrun.connect
+def finish_task_metrics(task_id: str, task: Task, **kwargs: Any) -> None:
+    stack = task_metrics.pop(task_id, None)
+    if stack is None:
+        return
+
+    metrics = current_metrics.get()
+    stack.close()
+
+    if metrics:
+        record_metrics('task', task.name, metrics)
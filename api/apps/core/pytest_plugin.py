@@ -0,0 +1,58 @@
+from typing import Any, Callable, Iterator
+
+import pytest
+from django.db import connection
+from django.db.models import QuerySet
+from django.http import HttpResponse
+from pytest_django.fixtures import SettingsWrapper
+
+from apps.core.instrumentation import Metrics
+
+
+@pytest.fixture
+def assert_query_budget(settings: SettingsWrapper) -> Callable[[HttpResponse, int], Metrics]:
+    """
+    Assert that a single request, including middleware, stays within its query budget, e.g.
+    assert_query_budget(api_client.get(url), 15)
+    """
+    settings.INSTRUMENTATION_ENABLED = True
+
+    def assert_budget(response: HttpResponse, max_queries: int) -> Metrics:
+        metrics: Metrics | None = getattr(response, 'instrumentation_metrics', None)
+        assert metrics is not None, 'Response has not been instrumented'
+
+        view = getattr(response, 'instrumentation_view')
+        assert (
+            metrics.queries <= max_queries
+        ), f'{view} executed {metrics.queries} queries, but its budget is {max_queries}'
+        return metrics
+
+    return assert_budget
+
+
+def iter_plan_nodes(plan: dict[str, Any]) -> Iterator[dict[str, Any]]:
+    yield plan
+    for subplan in plan.get('Plans', []):
+        yield from iter_plan_nodes(subplan)
+
+
+@pytest.fixture
+def explain_table_scans() -> Callable[[QuerySet, str], list[dict[str, Any]]]:
+    """
+    Return the plan nodes reading the table (or its partitions) when running the queryset, e.g.
+    explain_table_scans(queryset, 'monitors_monitorfunctionvalue')[0]['Node Type'] == 'Index Only Scan'
+    Sequential scans are disabled, as the planner prefers them for small test tables.
+    """
+
+    def explain(queryset: QuerySet, table: str) -> list[dict[str, Any]]:
+        sql, params = queryset.query.sql_with_params()
+
+        with connection.cursor() as cursor:
+            cursor.execute(f'ANALYZE {connection.ops.quote_name(table)}')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            (plan,) = cursor.fetchone()
+
+        return [node for node in iter_plan_nodes(plan[0]['Plan']) if node.get('Relation Name', '').startswith(table)]
+
+    return explain
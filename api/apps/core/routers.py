@@ -0,0 +1,164 @@
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+from celery import Task
+from celery.signals import task_postrun, task_prerun
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Model
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
+
+REPLICA_DATABASE = 'replica'
+REPLICA_STICKY_COOKIE = 'replica_sticky'
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+
+@dataclass
+class ReplicaContext:
+    use_replica: bool = False
+    written: bool = False
+
+
+current_replica_context: ContextVar[ReplicaContext | None] = ContextVar('current_replica_context', default=None)
+
+
+def is_replica_enabled() -> bool:
+    return settings.DATABASE_REPLICA_ENABLED and REPLICA_DATABASE in settings.DATABASES
+
+
+def is_replica_view(view_func: Callable) -> bool:
+    """
+    Read-only reporting and export views opt in to the replica with a use_replica attribute, set on the view
+    class or on the view function. Their data may lag behind the primary for the replication delay.
+    """
+    view_class = getattr(view_func, 'view_class', None)
+    return bool(getattr(view_func, 'use_replica', False) or getattr(view_class, 'use_replica', False))
+
+
+def use_primary() -> None:
+    """
+    Send the remaining reads of the current request to the primary database.
+    """
+    context = current_replica_context.get()
+    if context:
+        context.use_replica = False
+
+
+class ReplicaRouter:
+    """
+    Send reads of read-only requests of replica views to the replica database. Everything else, including
+    writes, reads made after a write and all celery tasks, uses the primary database.
+    """
+
+    def db_for_read(self, model: type[Model], **hints: Any) -> str | None:
+        context = current_replica_context.get()
+        if (
+            context is None
+            or not context.use_replica
+            or context.written
+            or not is_replica_enabled()
+            or connections[DEFAULT_DB_ALIAS].in_atomic_block
+        ):
+            return None
+
+        return REPLICA_DATABASE
+
+    def db_for_write(self, model: type[Model], **hints: Any) -> str:
+        context = current_replica_context.get()
+        if context:
+            context.written = True
+
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1: Model, obj2: Model, **hints: Any) -> bool:
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, model_name: str | None = None, **hints: Any) -> bool | None:
+        if db == REPLICA_DATABASE:
+            return False
+        return None
+
+
+def stream_in_replica_context(content: Iterable[bytes], context: ReplicaContext) -> Iterator[bytes]:
+    """
+    Route the queries of a streamed response body with the context of its request. Every chunk sets
+    the context again, as the body is consumed after the middleware has returned.
+    """
+    iterator = iter(content)
+
+    while True:
+        token = current_replica_context.set(context)
+        try:
+            chunk = next(iterator)
+        except StopIteration:
+            return
+        finally:
+            current_replica_context.reset(token)
+
+        yield chunk
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Route read-only requests of views opting in with use_replica to the replica. After a mutation, requests
+    of the same client stay on the primary for DATABASE_REPLICA_STICKINESS seconds, so they always read
+    their own writes. Requests of other views always use the primary.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.get_response = get_response
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if not is_replica_enabled():
+            return self.get_response(request)
+
+        context = ReplicaContext()
+        token = current_replica_context.set(context)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_replica_context.reset(token)
+
+        if isinstance(response, StreamingHttpResponse):
+            response.streaming_content = stream_in_replica_context(response.streaming_content, context)
+
+        if request.method not in SAFE_METHODS or context.written:
+            response.set_cookie(
+                REPLICA_STICKY_COOKIE,
+                '1',
+                max_age=settings.DATABASE_REPLICA_STICKINESS,
+                httponly=True,
+                samesite='Lax',
+            )
+
+        return response
+
+    def process_view(
+        self, request: HttpRequest, view_func: Callable, view_args: tuple, view_kwargs: dict[str, Any]
+    ) -> None:
+        context = current_replica_context.get()
+        if (
+            context is not None
+            and request.method in SAFE_METHODS
+            and REPLICA_STICKY_COOKIE not in request.COOKIES
+            and is_replica_view(view_func)
+        ):
+            context.use_replica = True
+
+
+replica_context_tokens: dict[str, Any] = {}
+
+
+@task_prerun.connect
+def use_primary_in_task(task_id: str, task: Task, **kwargs: Any) -> None:
+    # tasks executed eagerly inside a request must not inherit its replica routing
+    replica_context_tokens[task_id] = current_replica_context.set(None)
+
+
+@task_postrun.connect
+def restore_replica_context(task_id: str, task: Task, **kwargs: Any) -> None:
+    token = replica_context_tokens.pop(task_id, None)
+    if token is not None:
+        current_replica_context.reset(token)
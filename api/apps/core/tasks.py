@@ -0,0 +1,17 @@
+import logging
+
+from celery import Task
+
+from apps.app.celery import app
+from apps.core.haystack import update_search_index
+
+logger = logging.getLogger(__name__)
+
+
+@app.task(bind=True, max_retries=1, default_retry_delay=5 * 60)
+def update_search_index_task(self: Task, model_label: str, updated_pks: list[str], deleted_pks: list[str]) -> None:
+    try:
+        update_search_index(model_label=model_label, updated_pks=updated_pks, deleted_pks=deleted_pks)
+    except Exception as e:
+        logger.exception(f'Unable to update {model_label} search index entries.')
+        raise self.retry(exc=e)
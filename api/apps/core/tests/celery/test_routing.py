@@ -0,0 +1,42 @@
+import pytest
+from django.conf import settings
+
+from apps.app.celery import app
+
+
+@pytest.fixture(scope='module')
+def task_names() -> list[str]:
+    app.loader.import_default_modules()
+    return [name for name in app.tasks if not name.startswith('celery.')]
+
+
+def route(task_name: str) -> dict:
+    return app.amqp.router.route({}, task_name)
+
+
+def test_should_route_every_task_to_known_queue(task_names: list[str]):
+    queues = {queue.name for queue in settings.CELERY_TASK_QUEUES}
+    task_queues = {task_name: route(task_name)['queue'].name for task_name in task_names}
+
+    assert 'apps.kims.tasks.sync_vessels_task' in task_queues
+    assert {task_name: queue for task_name, queue in task_queues.items() if queue not in queues} == {}
+
+
+@pytest.mark.parametrize(
+    'task_name,queue,priority',
+    (
+        ('apps.rigs.tasks.sync_all_plan_co2_calculations_task', 'interactive', 0),
+        ('apps.monitors.tasks.sync_all_monitor_function_values_task', 'monitors', 0),
+        ('apps.monitors.tasks.sync_monitor_function_values_task', 'monitors', 6),
+        ('apps.kims.tasks.sync_vessel_tag_value_task', 'kims', None),
+        ('apps.kims.tasks.downsample_vessel_tag_values_task', 'maintenance', None),
+        ('apps.core.tasks.update_search_index_task', 'search', None),
+        ('apps.privacy.tasks.send_privacy_changed_email_task', 'emails', None),
+        ('apps.privacy.tasks.execute_delete_account_requests', 'default', None),
+    ),
+)
+def test_should_route_task(task_name: str, queue: str, priority: int | None):
+    options = route(task_name)
+
+    assert options['queue'].name == queue
+    assert options.get('priority') == priority
@@ -0,0 +1,62 @@
+import datetime
+import gzip
+import json
+
+import pytest
+
+from apps.core.export import ExportFormat, export_response
+
+HEADER = ['date', 'value']
+ROWS = [
+    dict(date=datetime.datetime(2022, 6, 1, tzinfo=datetime.timezone.utc), value=1.5, ignored='ignored'),
+    dict(date=datetime.datetime(2022, 6, 2, tzinfo=datetime.timezone.utc), value=2.5, ignored='ignored'),
+]
+
+
+class TestExportResponse:
+    def test_should_stream_csv(self):
+        response = export_response(rows=iter(ROWS), header=HEADER, filename='export', export_format=ExportFormat.CSV)
+
+        assert response.streaming
+        assert response['Content-Type'] == 'text/csv'
+        assert response['Content-Disposition'] == 'attachment; filename=export.csv'
+        assert b''.join(response.streaming_content).decode().splitlines() == [
+            'date,value',
+            '2022-06-01 00:00:00+00:00,1.5',
+            '2022-06-02 00:00:00+00:00,2.5',
+        ]
+
+    def test_should_stream_ndjson(self):
+        response = export_response(rows=iter(ROWS), header=HEADER, filename='export', export_format=ExportFormat.NDJSON)
+
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert response['Content-Disposition'] == 'attachment; filename=export.ndjson'
+        assert [json.loads(line) for line in b''.join(response.streaming_content).splitlines()] == [
+            dict(date='2022-06-01T00:00:00Z', value=1.5),
+            dict(date='2022-06-02T00:00:00Z', value=2.5),
+        ]
+
+    @pytest.mark.parametrize('export_format', ExportFormat.values)
+    def test_should_stream_gzip(self, export_format: ExportFormat):
+        plain_response = export_response(rows=iter(ROWS), header=HEADER, filename='export', export_format=export_format)
+        gzip_response = export_response(
+            rows=iter(ROWS), header=HEADER, filename='export', export_format=export_format, gzip=True
+        )
+
+        assert gzip_response['Content-Type'] == 'application/gzip'
+        assert gzip_response['Content-Disposition'] == f'attachment; filename=export.{export_format}.gz'
+        assert gzip.decompress(b''.join(gzip_response.streaming_content)) == b''.join(plain_response.streaming_content)
+
+    def test_should_consume_rows_lazily(self):
+        consumed_rows = []
+
+        def rows():
+            for row in ROWS:
+                consumed_rows.append(row)
+                yield row
+
+        response = export_response(rows=rows(), header=HEADER, filename='export', export_format=ExportFormat.CSV)
+
+        assert consumed_rows == []
+        b''.join(response.streaming_content)
+        assert consumed_rows == ROWS
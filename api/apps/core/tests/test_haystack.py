@@ -0,0 +1,162 @@
+from unittest.mock import MagicMock
+
+import pytest
+from django.db import transaction
+from haystack.query import SearchQuerySet
+from pytest_mock import MockerFixture
+
+from apps.core.haystack import (
+    SyncCelerySignalProcessor,
+    batch_search_index_updates,
+    finish_task_search_index_updates,
+    group_by_model,
+    start_task_search_index_updates,
+)
+from apps.core.tasks import update_search_index_task
+from apps.projects.factories import PlanFactory, ProjectFactory
+from apps.projects.models import Plan
+
+
+@pytest.fixture
+def dispatch_task_mock(mocker: MockerFixture) -> MagicMock:
+    return mocker.patch.object(SyncCelerySignalProcessor, 'dispatch_task')
+
+
+def get_dispatched_updates(dispatch_task_mock: MagicMock, model_label: str) -> list[tuple[list[str], list[str]]]:
+    return [
+        (updated_pks, deleted_pks)
+        for task, dispatched_model_label, updated_pks, deleted_pks in (
+            dispatch_task_call.args for dispatch_task_call in dispatch_task_mock.call_args_list
+        )
+        if task == update_search_index_task and dispatched_model_label == model_label
+    ]
+
+
+def test_group_by_model():
+    assert group_by_model(
+        {
+            'projects.plan.1': 'update',
+            'projects.plan.2': 'delete',
+            'projects.project.1': 'update',
+        }
+    ) == {
+        'projects.plan': (['1'], ['2']),
+        'projects.project': (['1'], []),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBatchedCelerySignalProcessor:
+    def test_should_dispatch_single_task_for_bulk_save(self, dispatch_task_mock: MagicMock):
+        project = ProjectFactory()
+
+        with batch_search_index_updates(), transaction.atomic():
+            plans = PlanFactory.create_batch(10, project=project)
+            for plan in plans:
+                plan.save()
+                plan.save()
+
+            assert dispatch_task_mock.call_count == 0
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [
+            ([str(plan.pk) for plan in plans], []),
+        ]
+
+    def test_should_collapse_update_and_delete(self, dispatch_task_mock: MagicMock):
+        with batch_search_index_updates(), transaction.atomic():
+            plan = PlanFactory()
+            plan_id = plan.pk
+            plan.delete()
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [([], [str(plan_id)])]
+
+    def test_should_not_dispatch_rolled_back_changes(self, dispatch_task_mock: MagicMock):
+        with pytest.raises(RuntimeError):
+            with transaction.atomic():
+                PlanFactory()
+                raise RuntimeError()
+
+        with transaction.atomic():
+            plan = PlanFactory()
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [([str(plan.pk)], [])]
+
+    def test_should_dispatch_immediately_outside_of_transaction(self, dispatch_task_mock: MagicMock):
+        plan = PlanFactory()
+        dispatch_task_mock.reset_mock()
+
+        plan.save()
+        plan.save()
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [
+            ([str(plan.pk)], []),
+            ([str(plan.pk)], []),
+        ]
+
+    def test_should_batch_updates_across_transactions(self, dispatch_task_mock: MagicMock):
+        with batch_search_index_updates():
+            plans = PlanFactory.create_batch(3)
+
+            assert dispatch_task_mock.call_count == 0
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [
+            ([str(plan.pk) for plan in plans], []),
+        ]
+
+    def test_should_drop_changes_of_rolled_back_savepoint(self, dispatch_task_mock: MagicMock):
+        plan = PlanFactory()
+        dispatch_task_mock.reset_mock()
+
+        with batch_search_index_updates(), transaction.atomic():
+            other_plan = PlanFactory()
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    Plan.objects.get(pk=plan.pk).delete()
+                    raise RuntimeError()
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [([str(other_plan.pk)], [])]
+
+    def test_should_dispatch_committed_changes_of_batch_exiting_with_exception(self, dispatch_task_mock: MagicMock):
+        with pytest.raises(RuntimeError):
+            with batch_search_index_updates():
+                plan = PlanFactory()
+                with transaction.atomic():
+                    PlanFactory()
+                    raise RuntimeError()
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [([str(plan.pk)], [])]
+
+    def test_should_batch_updates_of_celery_task(self, dispatch_task_mock: MagicMock):
+        start_task_search_index_updates(task_id='task', task=MagicMock())
+        plans = PlanFactory.create_batch(3)
+
+        assert dispatch_task_mock.call_count == 0
+
+        finish_task_search_index_updates(task_id='task', task=MagicMock())
+
+        assert get_dispatched_updates(dispatch_task_mock, 'projects.plan') == [
+            ([str(plan.pk) for plan in plans], []),
+        ]
+
+    def test_should_keep_object_deleted_in_rolled_back_transaction_indexed(self, clear_haystack):
+        plan = PlanFactory(name='Kept plan')
+
+        with batch_search_index_updates():
+            with pytest.raises(RuntimeError):
+                with transaction.atomic():
+                    Plan.objects.get(pk=plan.pk).delete()
+                    raise RuntimeError()
+
+        results = SearchQuerySet().models(Plan)
+
+        assert [result.pk for result in results] == [str(plan.pk)]
+
+    def test_should_update_search_index(self, clear_haystack):
+        with transaction.atomic():
+            plans = PlanFactory.create_batch(3, name='Batched plan')
+            deleted_plan = PlanFactory(name='Deleted plan')
+            deleted_plan.delete()
+
+        results = SearchQuerySet().models(Plan)
+
+        assert sorted(result.pk for result in results) == sorted(str(plan.pk) for plan in plans)
@@ -0,0 +1,179 @@
+from typing import Callable
+
+import pytest
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from pytest_django.fixtures import SettingsWrapper
+from rest_framework.test import APIClient
+
+from apps.core.instrumentation import (
+    METRICS_KEY,
+    Metrics,
+    collect_metrics,
+    metrics_view,
+    record_metrics,
+    render_metrics,
+)
+from apps.core.redis import get_redis_client
+from apps.emissions.factories import BaselineInputFactory, EmissionReductionInitiativeInputFactory
+from apps.privacy.tasks import execute_delete_account_requests
+from apps.tenants.factories import TenantUserRelationFactory, UserFactory
+from apps.tenants.models import User
+from apps.wells.factories import WellPlannerFactory, WellPlannerPlannedStepFactory
+
+
+@pytest.fixture(autouse=True)
+def clear_metrics():
+    get_redis_client().delete(METRICS_KEY)
+
+
+@pytest.mark.django_db
+class TestCollectMetrics:
+    def test_should_count_queries(self):
+        with collect_metrics() as metrics:
+            User.objects.count()
+            User.objects.exists()
+
+        assert metrics.queries == 2
+        assert metrics.db_time > 0
+        assert metrics.total_time >= metrics.db_time
+
+    def test_should_count_redis_calls(self):
+        with collect_metrics() as metrics:
+            cache.set('key', 'value')
+            cache.get('key')
+
+        assert metrics.redis_calls >= 2
+        assert metrics.queries == 0
+
+    def test_should_not_count_outside_of_context(self):
+        with collect_metrics() as metrics:
+            pass
+
+        User.objects.count()
+
+        assert metrics.queries == 0
+
+
+@pytest.mark.django_db
+class TestInstrumentationMiddleware:
+    def test_should_add_server_timing_header(self, api_client: APIClient, settings: SettingsWrapper):
+        settings.INSTRUMENTATION_ENABLED = True
+        tenant_user = TenantUserRelationFactory()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(reverse('tenants:me', kwargs={"tenant_id": tenant_user.tenant_id}))
+
+        assert response.status_code == 200
+        assert response['Server-Timing'].startswith('db;dur=')
+        assert response.instrumentation_view == 'MeApi'
+        assert 'stepwise_view_calls_total{view="MeApi"} 1' in render_metrics()
+
+    def test_should_skip_disabled_instrumentation(self, api_client: APIClient, settings: SettingsWrapper):
+        settings.INSTRUMENTATION_ENABLED = False
+        tenant_user = TenantUserRelationFactory()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(reverse('tenants:me', kwargs={"tenant_id": tenant_user.tenant_id}))
+
+        assert response.status_code == 200
+        assert 'Server-Timing' not in response
+        assert render_metrics() == '\n'
+
+    def test_should_assert_query_budget(
+        self, api_client: APIClient, assert_query_budget: Callable[[HttpResponse, int], Metrics]
+    ):
+        tenant_user = TenantUserRelationFactory()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(reverse('tenants:me', kwargs={"tenant_id": tenant_user.tenant_id}))
+
+        assert assert_query_budget(response, 10).queries > 0
+
+        with pytest.raises(AssertionError, match='MeApi executed'):
+            assert_query_budget(response, 0)
+
+    @pytest.mark.parametrize('steps', [1, 20])
+    def test_should_keep_planned_co2_within_query_budget(
+        self, api_client: APIClient, assert_query_budget: Callable[[HttpResponse, int], Metrics], steps: int
+    ):
+        tenant_user = TenantUserRelationFactory()
+        well_planner = WellPlannerFactory(asset__tenant=tenant_user.tenant)
+        for _ in range(steps):
+            planned_step = WellPlannerPlannedStepFactory(
+                well_planner=well_planner, duration=2, improved_duration=1, external_energy_supply_enabled=False
+            )
+            BaselineInputFactory(
+                baseline=well_planner.baseline,
+                phase=planned_step.phase,
+                mode=planned_step.mode,
+                season=planned_step.season,
+            )
+            emission_reduction_initiative_input = EmissionReductionInitiativeInputFactory(
+                emission_reduction_initiative__emission_management_plan=well_planner.emission_management_plan,
+                phase=planned_step.phase,
+                mode=planned_step.mode,
+            )
+            planned_step.emission_reduction_initiatives.add(
+                emission_reduction_initiative_input.emission_reduction_initiative
+            )
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(
+            reverse(
+                'wells:well_planner_planned_co2',
+                kwargs={"tenant_id": tenant_user.tenant_id, "well_planner_id": well_planner.pk},
+            )
+        )
+
+        assert response.status_code == 200
+        assert_query_budget(response, 15)
+
+
+@pytest.mark.django_db
+def test_record_task_metrics(settings: SettingsWrapper):
+    settings.INSTRUMENTATION_ENABLED = True
+
+    execute_delete_account_requests.apply()
+
+    metrics = render_metrics()
+    assert 'stepwise_task_calls_total{task="apps.privacy.tasks.execute_delete_account_requests"} 1' in metrics
+    assert 'stepwise_task_db_queries_total{task="apps.privacy.tasks.execute_delete_account_requests"} 3' in metrics
+
+
+@pytest.mark.django_db
+class TestMetricsView:
+    def test_should_render_metrics(self, settings: SettingsWrapper):
+        settings.INSTRUMENTATION_METRICS_TOKEN = 'secret'
+        record_metrics('view', 'MeApi', Metrics(queries=3, db_time=0.5, total_time=1.5))
+        request = RequestFactory().get('/metrics/', HTTP_AUTHORIZATION='Bearer secret')
+        request.user = UserFactory()
+
+        response = metrics_view(request)
+
+        assert response.status_code == 200
+        assert response.content.decode().splitlines() == [
+            '# TYPE stepwise_view_calls_total counter',
+            'stepwise_view_calls_total{view="MeApi"} 1',
+            '# TYPE stepwise_view_db_queries_total counter',
+            'stepwise_view_db_queries_total{view="MeApi"} 3',
+            '# TYPE stepwise_view_db_seconds_total counter',
+            'stepwise_view_db_seconds_total{view="MeApi"} 0.5',
+            '# TYPE stepwise_view_http_calls_total counter',
+            'stepwise_view_http_calls_total{view="MeApi"} 0',
+            '# TYPE stepwise_view_python_seconds_total counter',
+            'stepwise_view_python_seconds_total{view="MeApi"} 1',
+            '# TYPE stepwise_view_redis_calls_total counter',
+            'stepwise_view_redis_calls_total{view="MeApi"} 0',
+        ]
+
+    def test_should_be_forbidden_without_token(self, settings: SettingsWrapper):
+        settings.INSTRUMENTATION_METRICS_TOKEN = 'secret'
+        request = RequestFactory().get('/metrics/', HTTP_AUTHORIZATION='Bearer invalid')
+        request.user = UserFactory(is_staff=False)
+
+        response = metrics_view(request)
+
+        assert response.status_code == 403
@@ -0,0 +1,191 @@
+from typing import Callable
+
+import pytest
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from pytest_django.fixtures import SettingsWrapper
+from rest_framework.test import APIClient
+
+from apps.core.routers import (
+    REPLICA_DATABASE,
+    REPLICA_STICKY_COOKIE,
+    ReplicaContext,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    current_replica_context,
+)
+from apps.emissions.factories import BaselineInputFactory
+from apps.monitors.factories import MonitorFunctionValueFactory
+from apps.monitors.models import MonitorFunctionType
+from apps.privacy.tasks import execute_delete_account_requests
+from apps.tenants.factories import TenantUserRelationFactory, UserFactory
+from apps.tenants.models import User
+from apps.wells.factories import WellPlannerCompleteStepFactory, WellPlannerFactory
+from apps.wells.models import WellPlannerWizardStep
+
+
+@pytest.fixture
+def replica_enabled(settings: SettingsWrapper):
+    settings.DATABASE_REPLICA_ENABLED = True
+
+
+@pytest.mark.usefixtures('replica_enabled')
+class TestReplicaRouter:
+    @pytest.fixture
+    def replica_context(self):
+        context = ReplicaContext(use_replica=True)
+        token = current_replica_context.set(context)
+        yield context
+        current_replica_context.reset(token)
+
+    def test_should_read_from_replica(self, replica_context: ReplicaContext):
+        assert ReplicaRouter().db_for_read(User) == REPLICA_DATABASE
+
+    def test_should_read_from_primary_without_context(self):
+        assert ReplicaRouter().db_for_read(User) is None
+
+    def test_should_read_from_primary_after_write(self, replica_context: ReplicaContext):
+        assert ReplicaRouter().db_for_write(User) == DEFAULT_DB_ALIAS
+        assert replica_context.written is True
+        assert ReplicaRouter().db_for_read(User) is None
+
+    def test_should_read_from_primary_when_disabled(self, replica_context: ReplicaContext, settings: SettingsWrapper):
+        settings.DATABASE_REPLICA_ENABLED = False
+
+        assert ReplicaRouter().db_for_read(User) is None
+
+    def test_should_not_migrate_replica(self):
+        assert ReplicaRouter().allow_migrate(REPLICA_DATABASE, 'tenants') is False
+        assert ReplicaRouter().allow_migrate(DEFAULT_DB_ALIAS, 'tenants') is None
+
+
+def count_users(request: HttpRequest) -> HttpResponse:
+    return HttpResponse(User.objects.count())
+
+
+def count_users_in_replica(request: HttpRequest) -> HttpResponse:
+    return count_users(request)
+
+
+count_users_in_replica.use_replica = True  # type: ignore
+
+
+def call_middleware(request: HttpRequest, view_func: Callable[[HttpRequest], HttpResponse]) -> HttpResponse:
+    def get_response(request: HttpRequest) -> HttpResponse:
+        middleware.process_view(request, view_func, (), {})
+        return view_func(request)
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    return middleware(request)
+
+
+@pytest.mark.usefixtures('replica_enabled')
+@pytest.mark.django_db(transaction=True, databases=[DEFAULT_DB_ALIAS, REPLICA_DATABASE])
+class TestReplicaRoutingMiddleware:
+    def test_should_read_from_replica(self):
+        request = RequestFactory().get('/')
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            response = call_middleware(request, count_users_in_replica)
+
+        assert len(replica_queries) == 1
+        assert REPLICA_STICKY_COOKIE not in response.cookies
+
+    def test_should_read_from_primary_without_opt_in(self):
+        request = RequestFactory().get('/')
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            response = call_middleware(request, count_users)
+
+        assert len(replica_queries) == 0
+        assert response.content == b'0'
+
+    def test_should_make_client_sticky_after_mutation(self, settings: SettingsWrapper):
+        settings.DATABASE_REPLICA_STICKINESS = 30
+        request = RequestFactory().post('/')
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            response = call_middleware(request, count_users_in_replica)
+
+        assert len(replica_queries) == 0
+        assert response.cookies[REPLICA_STICKY_COOKIE]['max-age'] == 30
+
+    def test_should_read_from_primary_when_sticky(self):
+        request = RequestFactory().get('/')
+        request.COOKIES[REPLICA_STICKY_COOKIE] = '1'
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            call_middleware(request, count_users_in_replica)
+
+        assert len(replica_queries) == 0
+
+    def test_should_make_client_sticky_after_write_in_safe_request(self):
+        def create_user(request: HttpRequest) -> HttpResponse:
+            UserFactory()
+            return HttpResponse(User.objects.count())
+
+        create_user.use_replica = True  # type: ignore
+        request = RequestFactory().get('/')
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            response = call_middleware(request, create_user)
+
+        assert len(replica_queries) == 0
+        assert response.content == b'1'
+        assert REPLICA_STICKY_COOKIE in response.cookies
+
+    def test_should_keep_tasks_on_primary(self):
+        def run_task(request: HttpRequest) -> HttpResponse:
+            execute_delete_account_requests.apply()
+            return HttpResponse()
+
+        run_task.use_replica = True  # type: ignore
+        request = RequestFactory().get('/')
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            call_middleware(request, run_task)
+
+        assert len(replica_queries) == 0
+
+    def test_should_keep_api_view_without_opt_in_on_primary(self, api_client: APIClient):
+        tenant_user = TenantUserRelationFactory()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            response = api_client.get(reverse('tenants:me', kwargs={"tenant_id": tenant_user.tenant_id}))
+
+        assert response.status_code == 200
+        assert len(replica_queries) == 0
+
+    def test_should_stream_export_from_replica(self, api_client: APIClient):
+        tenant_user = TenantUserRelationFactory()
+        well_planner = WellPlannerFactory(
+            asset__tenant=tenant_user.tenant, current_step=WellPlannerWizardStep.WELL_REVIEWING
+        )
+        complete_step = WellPlannerCompleteStepFactory(
+            well_planner=well_planner, duration=1, external_energy_supply_enabled=False
+        )
+        BaselineInputFactory(baseline__asset=well_planner.asset, phase=complete_step.phase, value=0)
+        MonitorFunctionValueFactory(
+            monitor_function__vessel=well_planner.asset.vessel,
+            monitor_function__type=MonitorFunctionType.CO2_EMISSION,
+            value=0,
+        )
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(
+            reverse(
+                'wells:well_planner_measured_co2_export',
+                kwargs={"tenant_id": tenant_user.tenant_id, "well_planner_id": well_planner.pk},
+            )
+        )
+
+        with CaptureQueriesContext(connections[REPLICA_DATABASE]) as replica_queries:
+            content = b''.join(response.streaming_content)
+
+        assert response.status_code == 200
+        assert content.startswith(b'date,step,phase')
+        assert len(replica_queries) > 0
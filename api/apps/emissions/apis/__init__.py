@@ -67,7 +67,11 @@ from .wells import (  # noqa: F401
     UpdateWellPlannedStartDateApi,
     UpdateWellPlannedVesselUseApi,
     WellBaselineCO2EmissionsApi,
+    WellBaselineCO2EmissionsExportApi,
+    WellBaselineNOXEmissionsExportApi,
     WellNameListApi,
     WellTargetCO2EmissionReductionsApi,
     WellTargetCO2EmissionsApi,
+    WellTargetCO2EmissionsExportApi,
+    WellTargetNOXEmissionsExportApi,
 )
@@ -1,12 +1,25 @@
 from typing import cast
 
+from django.http import StreamingHttpResponse
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
 from rest_framework.generics import get_object_or_404
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from apps.emissions.models import BaselineCO2, TargetCO2, TargetCO2Reduction, WellName
+from apps.core.api.serializers import ExportParametersSerializer
+from apps.core.export import export_response
+from apps.emissions.models import (
+    BaseCO2,
+    BaselineCO2,
+    BaselineNOX,
+    BaseNOX,
+    TargetCO2,
+    TargetCO2Reduction,
+    TargetNOX,
+    WellName,
+)
 from apps.emissions.serializers import (
     CreateUpdateCompleteHelicopterUseSerializer,
     CreateUpdateCompleteVesselUseSerializer,
@@ -34,6 +47,8 @@ from apps.emissions.services import (
     duplicate_well,
     get_co2_emissions,
     get_emission_reductions,
+    get_emissions_export_header,
+    iter_emissions_export_rows,
     update_complete_helicopter_use,
     update_complete_vessel_use,
     update_planned_helicopter_use,
@@ -463,3 +478,74 @@ class WellTargetCO2EmissionReductionsApi(WellPlannerMixin, APIView):
         response_data = WellEmissionReductionSerializer(dataset, many=True).data
 
         return Response(response_data, status=200)
+
+
+class BaseWellEmissionsExportApi(WellPlannerMixin, APIView):
+    permission_classes = [IsTenantUser, IsAdminUser]
+    use_replica = True
+    emission_model: type[BaseCO2] | type[BaseNOX]
+    export_name: str
+
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        export_parameters_serializer = ExportParametersSerializer(data=request.GET)
+        export_parameters_serializer.is_valid(raise_exception=True)
+
+        return export_response(
+            rows=iter_emissions_export_rows(well_planner=self.well_planner, emission_model=self.emission_model),
+            header=get_emissions_export_header(self.emission_model),
+            filename=f'well-{self.well_planner.pk}-{self.export_name}',
+            export_format=export_parameters_serializer.validated_data['file_format'],
+            gzip=export_parameters_serializer.validated_data['gzip'],
+        )
+
+
+class WellBaselineCO2EmissionsExportApi(BaseWellEmissionsExportApi):
+    emission_model = BaselineCO2
+    export_name = 'baseline-co2'
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[ExportParametersSerializer],
+        summary="Export well baseline CO2 emissions",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
+
+
+class WellTargetCO2EmissionsExportApi(BaseWellEmissionsExportApi):
+    emission_model = TargetCO2
+    export_name = 'target-co2'
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[ExportParametersSerializer],
+        summary="Export well target CO2 emissions",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
+
+
+class WellBaselineNOXEmissionsExportApi(BaseWellEmissionsExportApi):
+    emission_model = BaselineNOX
+    export_name = 'baseline-nox'
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[ExportParametersSerializer],
+        summary="Export well baseline NOX emissions",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
+
+
+class WellTargetNOXEmissionsExportApi(BaseWellEmissionsExportApi):
+    emission_model = TargetNOX
+    export_name = 'target-nox'
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[ExportParametersSerializer],
+        summary="Export well target NOX emissions",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
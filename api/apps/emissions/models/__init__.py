@@ -24,6 +24,7 @@ from .wells import (  # noqa: F401
     BaseHelicopterUse,
     BaselineCO2,
     BaselineNOX,
+    BaseNOX,
     BaseVesselUse,
     BaseWellStepMaterial,
     CompleteHelicopterUse,
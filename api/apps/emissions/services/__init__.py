@@ -52,6 +52,8 @@ from .wells import (  # noqa
     duplicate_well,
     get_co2_emissions,
     get_emission_reductions,
+    get_emissions_export_header,
+    iter_emissions_export_rows,
     update_complete_helicopter_use,
     update_complete_vessel_use,
     update_planned_helicopter_use,
@@ -1,8 +1,9 @@
 import datetime
 import logging
 import math
+from collections import defaultdict
 from itertools import groupby
-from typing import TypedDict, cast
+from typing import Any, Iterator, TypedDict, cast
 
 import pytz
 from django.core.exceptions import ValidationError
@@ -12,12 +13,14 @@ from django.db.models.functions import TruncDate
 from django.utils import timezone
 from django_generate_series.models import generate_series
 
+from apps.core.export import EXPORT_CHUNK_SIZE
 from apps.emissions.models import (
     Asset,
     AssetSeason,
     BaseCO2,
     BaselineCO2,
     BaselineNOX,
+    BaseNOX,
     CompleteHelicopterUse,
     CompleteVesselUse,
     EmissionReductionInitiativeType,
@@ -43,6 +46,7 @@ from apps.emissions.services.calculator import (
     multiply_target_co2,
 )
 from apps.emissions.services.calculator.baseline import BaselineNOXData, multiply_baseline_nox
+from apps.emissions.services.calculator.emission_reduction_initiatives import InitiativeReductionData
 from apps.emissions.services.calculator.target import TargetNOXData, multiply_target_nox
 from apps.tenants.models import Tenant, User
 from apps.wells.decorators import require_well_step
@@ -843,6 +847,15 @@ def save_target_nox(
     return target_nox
 
 
+def get_plan_start_date(well_plan: WellPlanner) -> datetime.datetime:
+    return datetime.datetime(
+        day=well_plan.planned_start_date.day,
+        month=well_plan.planned_start_date.month,
+        year=well_plan.planned_start_date.year,
+        tzinfo=pytz.UTC,
+    )
+
+
 def calculate_baselines(*, well_plan: WellPlanner) -> None:
     from apps.wells.services.api import split_duration_into_days
 
@@ -862,12 +875,7 @@ def calculate_baselines(*, well_plan: WellPlanner) -> None:
         ),
     }
 
-    plan_start_date = datetime.datetime(
-        day=well_plan.planned_start_date.day,
-        month=well_plan.planned_start_date.month,
-        year=well_plan.planned_start_date.year,
-        tzinfo=pytz.UTC,
-    )
+    plan_start_date = get_plan_start_date(well_plan)
 
     processed_duration = 0.0
 
@@ -920,12 +928,7 @@ def calculate_targets(*, well_plan: WellPlanner) -> None:
     TargetNOX.objects.filter(planned_step__well_planner=well_plan).delete()
 
     planned_steps = well_plan.planned_steps.order_by('order')  # type: ignore
-    plan_start_date = datetime.datetime(
-        day=well_plan.planned_start_date.day,
-        month=well_plan.planned_start_date.month,
-        year=well_plan.planned_start_date.year,
-        tzinfo=pytz.UTC,
-    )
+    plan_start_date = get_plan_start_date(well_plan)
 
     target_plan_duration = sum(planned_step.improved_duration for planned_step in planned_steps)
     target_season_duration = {
@@ -990,6 +993,218 @@ def calculate_planned_emissions(well_plan: WellPlanner) -> None:
     logger.info(f"Calculated planned emissions for WellPlan(pk=${well_plan.pk}).")
 
 
+CO2_EMISSION_FIELDS = ['asset', 'boilers', 'vessels', 'helicopters', 'materials', 'external_energy_supply']
+NOX_EMISSION_FIELDS = ['asset', 'boilers', 'vessels', 'helicopters', 'external_energy_supply']
+
+
+def get_planned_step_emission_totals(
+    *, emission_model: type[BaseCO2] | type[BaseNOX], fields: list[str], planned_steps: list[WellPlannerPlannedStep]
+) -> dict[int, dict[str, float]]:
+    """
+    Sum the per-day emissions of every planned step. The totals don't depend on the dates of the step.
+    """
+    return {
+        totals['planned_step']: {field: totals[f'total_{field}'] for field in fields}
+        for totals in emission_model.objects.filter(planned_step__in=planned_steps)  # type: ignore
+        .values('planned_step')
+        .annotate(**{f'total_{field}': Sum(field) for field in fields})
+        .order_by()
+    }
+
+
+def get_planned_step_reduction_totals(
+    *,
+    reduction_model: type[TargetCO2Reduction] | type[TargetNOXReduction],
+    planned_steps: list[WellPlannerPlannedStep],
+) -> dict[int, list[InitiativeReductionData]]:
+    reduction_totals: defaultdict[int, list[InitiativeReductionData]] = defaultdict(list)
+
+    for totals in (
+        reduction_model.objects.filter(target__planned_step__in=planned_steps)  # type: ignore
+        .values('target__planned_step', 'emission_reduction_initiative')
+        .annotate(total_value=Sum('value'))
+        .order_by('emission_reduction_initiative')
+    ):
+        reduction_totals[totals['target__planned_step']].append(
+            InitiativeReductionData(
+                emission_reduction_initiative_id=totals['emission_reduction_initiative'],
+                value=totals['total_value'],
+            )
+        )
+
+    return reduction_totals
+
+
+@transaction.atomic
+def recalculate_moved_planned_steps(*, well_plan: WellPlanner, first_order: int, last_order: int) -> None:
+    """
+    Rewrite the planned emissions of steps placed between first_order and last_order after a step has been moved.
+    Moving a step changes neither the plan nor the season durations, so totals of the affected steps are reused
+    and only their per-day entries are moved to the new dates. Steps outside of the range keep their dates.
+    """
+    from apps.wells.services.api import split_duration_into_days
+
+    if well_plan.current_step != WellPlannerWizardStep.WELL_PLANNING:
+        raise ValueError("Unable to calculate planned emissions")
+
+    logger.info(f"Recalculating planned emissions of steps {first_order}-{last_order} for WellPlan(pk={well_plan.pk}).")
+
+    planned_steps = list(well_plan.planned_steps.order_by('order'))  # type: ignore
+    moved_steps = [planned_step for planned_step in planned_steps if first_order <= planned_step.order <= last_order]
+
+    baseline_co2_totals = get_planned_step_emission_totals(
+        emission_model=BaselineCO2, fields=CO2_EMISSION_FIELDS, planned_steps=moved_steps
+    )
+    baseline_nox_totals = get_planned_step_emission_totals(
+        emission_model=BaselineNOX, fields=NOX_EMISSION_FIELDS, planned_steps=moved_steps
+    )
+    target_co2_totals = get_planned_step_emission_totals(
+        emission_model=TargetCO2, fields=CO2_EMISSION_FIELDS, planned_steps=moved_steps
+    )
+    target_nox_totals = get_planned_step_emission_totals(
+        emission_model=TargetNOX, fields=NOX_EMISSION_FIELDS, planned_steps=moved_steps
+    )
+
+    if any(
+        planned_step.pk not in totals
+        for planned_step in moved_steps
+        for totals in (baseline_co2_totals, baseline_nox_totals, target_co2_totals, target_nox_totals)
+    ):
+        logger.info(
+            f"Planned emissions of moved steps are missing for WellPlan(pk={well_plan.pk}). "
+            "Recalculating all planned emissions."
+        )
+        calculate_planned_emissions(well_plan)
+        return
+
+    target_co2_reduction_totals = get_planned_step_reduction_totals(
+        reduction_model=TargetCO2Reduction, planned_steps=moved_steps
+    )
+    target_nox_reduction_totals = get_planned_step_reduction_totals(
+        reduction_model=TargetNOXReduction, planned_steps=moved_steps
+    )
+
+    BaselineCO2.objects.filter(planned_step__in=moved_steps).delete()
+    BaselineNOX.objects.filter(planned_step__in=moved_steps).delete()
+    TargetCO2.objects.filter(planned_step__in=moved_steps).delete()
+    TargetNOX.objects.filter(planned_step__in=moved_steps).delete()
+
+    plan_start_date = get_plan_start_date(well_plan)
+    baseline_co2_entries: list[BaselineCO2] = []
+    baseline_nox_entries: list[BaselineNOX] = []
+    target_co2_entries: list[tuple[TargetCO2, list[InitiativeReductionData]]] = []
+    target_nox_entries: list[tuple[TargetNOX, list[InitiativeReductionData]]] = []
+
+    # offsets are accumulated exactly like in calculate_baselines and calculate_targets
+    processed_duration = 0.0
+    processed_target_duration = 0.0
+
+    for planned_step in planned_steps:
+        is_moved = first_order <= planned_step.order <= last_order
+
+        if is_moved:
+            daily_baseline_co2 = multiply_baseline_co2(
+                baseline=cast(BaselineCO2Data, baseline_co2_totals[planned_step.pk]),
+                multiplier=1 / planned_step.duration,
+            )
+            daily_baseline_nox = multiply_baseline_nox(
+                baseline=cast(BaselineNOXData, baseline_nox_totals[planned_step.pk]),
+                multiplier=1 / planned_step.duration,
+            )
+            daily_target_co2 = multiply_target_co2(
+                target=TargetCO2Data(  # type: ignore
+                    **target_co2_totals[planned_step.pk],
+                    emission_reduction_initiatives=target_co2_reduction_totals[planned_step.pk],
+                ),
+                multiplier=1 / planned_step.improved_duration,
+            )
+            daily_target_nox = multiply_target_nox(
+                target=TargetNOXData(  # type: ignore
+                    **target_nox_totals[planned_step.pk],
+                    emission_reduction_initiatives=target_nox_reduction_totals[planned_step.pk],
+                ),
+                multiplier=1 / planned_step.improved_duration,
+            )
+
+        for day_date, day_duration in split_duration_into_days(
+            start_date=plan_start_date,
+            total_days=processed_duration,
+            duration=planned_step.duration,
+        ):
+            if is_moved:
+                baseline_co2_entries.append(
+                    BaselineCO2(
+                        planned_step=planned_step,
+                        datetime=day_date,
+                        **multiply_baseline_co2(baseline=daily_baseline_co2, multiplier=day_duration),
+                    )
+                )
+                baseline_nox_entries.append(
+                    BaselineNOX(
+                        planned_step=planned_step,
+                        datetime=day_date,
+                        **multiply_baseline_nox(baseline=daily_baseline_nox, multiplier=day_duration),
+                    )
+                )
+
+            processed_duration += day_duration
+
+        for day_date, day_duration in split_duration_into_days(
+            start_date=plan_start_date,
+            total_days=processed_target_duration,
+            duration=planned_step.improved_duration,
+        ):
+            if is_moved:
+                target_co2_for_day = multiply_target_co2(target=daily_target_co2, multiplier=day_duration)
+                target_co2_reductions = target_co2_for_day.pop('emission_reduction_initiatives')  # type: ignore
+                target_co2_entries.append(
+                    (
+                        TargetCO2(planned_step=planned_step, datetime=day_date, **target_co2_for_day),
+                        target_co2_reductions,
+                    )
+                )
+
+                target_nox_for_day = multiply_target_nox(target=daily_target_nox, multiplier=day_duration)
+                target_nox_reductions = target_nox_for_day.pop('emission_reduction_initiatives')  # type: ignore
+                target_nox_entries.append(
+                    (
+                        TargetNOX(planned_step=planned_step, datetime=day_date, **target_nox_for_day),
+                        target_nox_reductions,
+                    )
+                )
+
+            processed_target_duration += day_duration
+
+    BaselineCO2.objects.bulk_create(baseline_co2_entries)
+    BaselineNOX.objects.bulk_create(baseline_nox_entries)
+    TargetCO2.objects.bulk_create([target_co2 for target_co2, _ in target_co2_entries])
+    TargetNOX.objects.bulk_create([target_nox for target_nox, _ in target_nox_entries])
+    TargetCO2Reduction.objects.bulk_create(
+        [
+            TargetCO2Reduction(
+                target=target_co2,
+                emission_reduction_initiative_id=reduction_data['emission_reduction_initiative_id'],
+                value=reduction_data['value'],
+            )
+            for target_co2, reductions in target_co2_entries
+            for reduction_data in reductions
+        ]
+    )
+    TargetNOXReduction.objects.bulk_create(
+        [
+            TargetNOXReduction(
+                target=target_nox,
+                emission_reduction_initiative_id=reduction_data['emission_reduction_initiative_id'],
+                value=reduction_data['value'],
+            )
+            for target_nox, reductions in target_nox_entries
+            for reduction_data in reductions
+        ]
+    )
+
+    logger.info(f"Recalculated planned emissions of {len(moved_steps)} steps for WellPlan(pk={well_plan.pk}).")
+
+
 def get_co2_emissions(well_planner: WellPlanner, co2_model: type[BaseCO2]) -> models.QuerySet[BaseCO2]:
     return cast(
         models.QuerySet[BaseCO2],
@@ -1010,6 +1225,25 @@ def get_co2_emissions(well_planner: WellPlanner, co2_model: type[BaseCO2]) -> mo
     )
 
 
+def get_emissions_export_header(emission_model: type[BaseCO2] | type[BaseNOX]) -> list[str]:
+    return [
+        'datetime',
+        'planned_step',
+        *(field.name for field in emission_model._meta.concrete_fields if isinstance(field, models.FloatField)),
+    ]
+
+
+def iter_emissions_export_rows(
+    well_planner: WellPlanner, emission_model: type[BaseCO2] | type[BaseNOX]
+) -> Iterator[dict[str, Any]]:
+    return (
+        emission_model.objects.filter(planned_step__well_planner=well_planner)  # type: ignore
+        .order_by('datetime', 'planned_step__order')
+        .values(*get_emissions_export_header(emission_model))
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
 class EmissionReductionInitiativeReduction(TypedDict):
     date: datetime.date
     emission_reduction_initiative: int
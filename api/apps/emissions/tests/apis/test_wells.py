@@ -1,4 +1,5 @@
 import datetime
+import json
 from datetime import date
 
 import pytest
@@ -20,7 +21,13 @@ from apps.emissions.factories import (
     VesselTypeFactory,
     WellNameFactory,
 )
-from apps.emissions.factories.wells import BaseCO2Factory, BaselineCO2Factory, TargetCO2ReductionFactory
+from apps.emissions.factories.wells import (
+    BaseCO2Factory,
+    BaselineCO2Factory,
+    BaselineNOXFactory,
+    TargetCO2ReductionFactory,
+    TargetNOXFactory,
+)
 from apps.emissions.models import CompleteHelicopterUse, PlannedHelicopterUse, WellName
 from apps.emissions.models.wells import BaseCO2, BaselineCO2, TargetCO2, TargetCO2Reduction
 from apps.emissions.serializers import WellCO2EmissionSerializer, WellNameListSerializer
@@ -1589,6 +1596,77 @@ class TestCO2EmissionsApi:
         assert response.data == {"detail": 'You do not have permission to perform this action.'}
 
 
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "path,emission_factory,fields",
+    (
+        (
+            "emissions:well_baseline_co2_emissions_export",
+            BaselineCO2Factory,
+            ["asset", "boilers", "vessels", "helicopters", "materials", "external_energy_supply"],
+        ),
+        (
+            "emissions:well_target_co2_emissions_export",
+            TargetCO2Factory,
+            ["asset", "boilers", "vessels", "helicopters", "materials", "external_energy_supply"],
+        ),
+        (
+            "emissions:well_baseline_nox_emissions_export",
+            BaselineNOXFactory,
+            ["asset", "boilers", "vessels", "helicopters", "external_energy_supply"],
+        ),
+        (
+            "emissions:well_target_nox_emissions_export",
+            TargetNOXFactory,
+            ["asset", "boilers", "vessels", "helicopters", "external_energy_supply"],
+        ),
+    ),
+)
+class TestWellEmissionsExportApi:
+    def test_should_export_emissions(self, path: str, emission_factory: type[BaseCO2Factory], fields: list[str]):
+        tenant_user = TenantUserRelationFactory()
+        well_plan = WellPlannerFactory(asset__tenant=tenant_user.tenant)
+        planned_step = WellPlannerPlannedStepFactory(well_planner=well_plan)
+        start = datetime.datetime(year=2022, month=1, day=1, tzinfo=datetime.timezone.utc)
+        second_emission = emission_factory(planned_step=planned_step, datetime=start + datetime.timedelta(days=1))
+        first_emission = emission_factory(planned_step=planned_step, datetime=start)
+        emission_factory(datetime=start)
+
+        api_client = APIClient()
+        api_client.force_authenticate(tenant_user.user)
+
+        response = api_client.get(
+            reverse(path, kwargs={"tenant_id": tenant_user.tenant.pk, "well_planner_id": well_plan.pk}),
+            {"file_format": "ndjson"},
+        )
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/x-ndjson'
+        assert [json.loads(line) for line in b''.join(response.streaming_content).splitlines()] == [
+            {
+                "datetime": emission.datetime.isoformat().replace('+00:00', 'Z'),
+                "planned_step": planned_step.pk,
+                **{field: getattr(emission, field) for field in fields},
+            }
+            for emission in (first_emission, second_emission)
+        ]
+
+    def test_should_be_not_found_for_unknown_well_plan(
+        self, path: str, emission_factory: type[BaseCO2Factory], fields: list[str]
+    ):
+        tenant_user = TenantUserRelationFactory()
+        well_plan = WellPlannerFactory()
+
+        api_client = APIClient()
+        api_client.force_authenticate(tenant_user.user)
+
+        response = api_client.get(
+            reverse(path, kwargs={"tenant_id": tenant_user.tenant.pk, "well_planner_id": well_plan.pk})
+        )
+
+        assert response.status_code == 404
+
+
 @pytest.mark.django_db
 class TestWellTargetCO2EmissionReductionsApi:
     def test_should_retrieve_emission_reductions(self):
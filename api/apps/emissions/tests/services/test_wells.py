@@ -81,6 +81,7 @@ from apps.emissions.services.wells import (
     calculate_targets,
     get_co2_emissions,
     get_emission_reductions,
+    recalculate_moved_planned_steps,
 )
 from apps.tenants.factories import TenantFactory, UserFactory
 from apps.wells.factories import WellPlannerCompleteStepFactory, WellPlannerFactory, WellPlannerPlannedStepFactory
@@ -1703,6 +1704,190 @@ class TestCalculatePlannedEmissions:
         assert str(ex.value) == "Unable to calculate planned emissions"
 
 
+@pytest.mark.django_db
+class TestRecalculateMovedPlannedSteps:
+    @pytest.fixture
+    def well_plan(self):
+        return WellPlannerFactory(
+            current_step=WellPlannerWizardStep.WELL_PLANNING,
+            planned_start_date=datetime.date(2021, 1, 1),
+        )
+
+    @pytest.fixture
+    def mock_planned_step_calculations(self, mocker: MockerFixture, well_plan):
+        emission_reduction_initiative = EmissionReductionInitiativeFactory(
+            emission_management_plan=well_plan.emission_management_plan
+        )
+
+        def calculate_baseline_nox(*, planned_step, step_duration, plan_duration, season_duration) -> BaselineNOXData:
+            return BaselineNOXData(
+                asset=100 * step_duration,
+                boilers=10 * step_duration + planned_step.pk,
+                vessels=step_duration / plan_duration,
+                helicopters=step_duration / season_duration,
+                external_energy_supply=planned_step.pk,
+            )
+
+        def calculate_baseline_co2(*, planned_step, step_duration, plan_duration, season_duration) -> BaselineCO2Data:
+            return BaselineCO2Data(
+                **calculate_baseline_nox(
+                    planned_step=planned_step,
+                    step_duration=step_duration,
+                    plan_duration=plan_duration,
+                    season_duration=season_duration,
+                ),
+                materials=3 * step_duration,
+            )
+
+        def calculate_target_nox(*, planned_step, step_duration, plan_duration, season_duration) -> TargetNOXData:
+            return TargetNOXData(
+                **calculate_baseline_nox(
+                    planned_step=planned_step,
+                    step_duration=step_duration,
+                    plan_duration=plan_duration,
+                    season_duration=season_duration,
+                ),
+                emission_reduction_initiatives=[
+                    {'emission_reduction_initiative_id': emission_reduction_initiative.pk, 'value': step_duration}
+                ],
+            )
+
+        def calculate_target_co2(*, planned_step, step_duration, plan_duration, season_duration) -> TargetCO2Data:
+            return TargetCO2Data(
+                **calculate_baseline_co2(
+                    planned_step=planned_step,
+                    step_duration=step_duration,
+                    plan_duration=plan_duration,
+                    season_duration=season_duration,
+                ),
+                emission_reduction_initiatives=[
+                    {'emission_reduction_initiative_id': emission_reduction_initiative.pk, 'value': 2 * step_duration}
+                ],
+            )
+
+        mocker.patch(
+            "apps.emissions.services.wells.calculate_planned_step_baseline_co2", side_effect=calculate_baseline_co2
+        )
+        mocker.patch(
+            "apps.emissions.services.wells.calculate_planned_step_baseline_nox", side_effect=calculate_baseline_nox
+        )
+        mocker.patch(
+            "apps.emissions.services.wells.calculate_planned_step_target_co2", side_effect=calculate_target_co2
+        )
+        mocker.patch(
+            "apps.emissions.services.wells.calculate_planned_step_target_nox", side_effect=calculate_target_nox
+        )
+
+    def get_planned_emissions(self, well_plan) -> dict[str, tuple[list, list]]:
+        planned_emissions = {}
+
+        for emission_model in [BaselineCO2, BaselineNOX, TargetCO2, TargetNOX]:
+            fields = [field.name for field in emission_model._meta.concrete_fields if field.name not in ['id']]
+            entries = list(
+                emission_model.objects.filter(planned_step__well_planner=well_plan)
+                .order_by('planned_step', 'datetime')
+                .values(*fields)
+            )
+            planned_emissions[emission_model.__name__] = (
+                [(entry.pop('planned_step'), entry.pop('datetime')) for entry in entries],
+                entries,
+            )
+
+        for reduction_model in [TargetCO2Reduction, TargetNOXReduction]:
+            entries = list(
+                reduction_model.objects.filter(target__planned_step__well_planner=well_plan)
+                .order_by('target__planned_step', 'target__datetime', 'emission_reduction_initiative')
+                .values('target__planned_step', 'target__datetime', 'emission_reduction_initiative', 'value')
+            )
+            planned_emissions[reduction_model.__name__] = (
+                [
+                    (
+                        entry.pop('target__planned_step'),
+                        entry.pop('target__datetime'),
+                        entry.pop('emission_reduction_initiative'),
+                    )
+                    for entry in entries
+                ],
+                entries,
+            )
+
+        return planned_emissions
+
+    @pytest.mark.parametrize('moved_step_index,order', ((3, 1), (0, 3), (1, 4)))
+    def test_should_match_full_recalculation(
+        self, well_plan, mock_planned_step_calculations, moved_step_index: int, order: int
+    ):
+        planned_steps = [
+            WellPlannerPlannedStepFactory(
+                well_planner=well_plan, duration=duration, improved_duration=improved_duration, season=season
+            )
+            for duration, improved_duration, season in (
+                (0.5, 0.25, AssetSeason.SUMMER),
+                (1.25, 1.0, AssetSeason.WINTER),
+                (2.0, 1.75, AssetSeason.SUMMER),
+                (0.75, 0.5, AssetSeason.WINTER),
+                (1.5, 1.25, AssetSeason.SUMMER),
+            )
+        ]
+        calculate_planned_emissions(well_plan)
+
+        moved_step = planned_steps[moved_step_index]
+        previous_order = moved_step.order
+        moved_step.to(order=order)
+
+        recalculate_moved_planned_steps(
+            well_plan=well_plan,
+            first_order=min(previous_order, order),
+            last_order=max(previous_order, order),
+        )
+        recalculated_emissions = self.get_planned_emissions(well_plan)
+
+        calculate_planned_emissions(well_plan)
+        calculated_emissions = self.get_planned_emissions(well_plan)
+
+        assert recalculated_emissions.keys() == calculated_emissions.keys()
+        for model_name, (keys, values) in calculated_emissions.items():
+            recalculated_keys, recalculated_values = recalculated_emissions[model_name]
+            assert recalculated_keys == keys
+            assert recalculated_values == [pytest.approx(entry) for entry in values]
+
+    def test_should_keep_entries_of_steps_outside_of_range(self, well_plan, mock_planned_step_calculations):
+        first_step, second_step, third_step = WellPlannerPlannedStepFactory.create_batch(
+            3, well_planner=well_plan, duration=1.5, improved_duration=1.0
+        )
+        calculate_planned_emissions(well_plan)
+        first_step_entry_ids = list(BaselineCO2.objects.filter(planned_step=first_step).values_list('pk', flat=True))
+
+        third_step.to(order=1)
+        recalculate_moved_planned_steps(well_plan=well_plan, first_order=1, last_order=2)
+
+        assert list(BaselineCO2.objects.filter(planned_step=first_step).values_list('pk', flat=True)) == (
+            first_step_entry_ids
+        )
+        assert BaselineCO2.objects.filter(planned_step=third_step).earliest('datetime').datetime == datetime.datetime(
+            2021, 1, 2, 12, tzinfo=datetime.timezone.utc
+        )
+
+    def test_should_fall_back_to_full_recalculation(self, well_plan, mocker: MockerFixture):
+        mocked_calculate_planned_emissions = mocker.patch("apps.emissions.services.wells.calculate_planned_emissions")
+        WellPlannerPlannedStepFactory.create_batch(2, well_planner=well_plan)
+
+        recalculate_moved_planned_steps(well_plan=well_plan, first_order=0, last_order=1)
+
+        mocked_calculate_planned_emissions.assert_called_once_with(well_plan)
+
+    @pytest.mark.parametrize(
+        'current_step', (set(WellPlannerWizardStep.values) - {WellPlannerWizardStep.WELL_PLANNING})
+    )
+    def test_should_raise_error_for_invalid_current_step(self, current_step: WellPlannerWizardStep):
+        well_planner = WellPlannerFactory(current_step=current_step)
+
+        with pytest.raises(ValueError) as ex:
+            recalculate_moved_planned_steps(well_plan=well_planner, first_order=0, last_order=1)
+
+        assert str(ex.value) == "Unable to calculate planned emissions"
+
+
 @pytest.mark.django_db
 class TestGetEmissionReductions:
     @pytest.mark.parametrize(
@@ -279,6 +279,26 @@ urlpatterns += [
         apis.WellBaselineCO2EmissionsApi.as_view(),
         name='well_baseline_co2_emissions',
     ),
+    path(
+        'emissions/wells/<int:well_planner_id>/planned/emissions/baseline/co2/export/',
+        apis.WellBaselineCO2EmissionsExportApi.as_view(),
+        name='well_baseline_co2_emissions_export',
+    ),
+    path(
+        'emissions/wells/<int:well_planner_id>/planned/emissions/target/co2/export/',
+        apis.WellTargetCO2EmissionsExportApi.as_view(),
+        name='well_target_co2_emissions_export',
+    ),
+    path(
+        'emissions/wells/<int:well_planner_id>/planned/emissions/baseline/nox/export/',
+        apis.WellBaselineNOXEmissionsExportApi.as_view(),
+        name='well_baseline_nox_emissions_export',
+    ),
+    path(
+        'emissions/wells/<int:well_planner_id>/planned/emissions/target/nox/export/',
+        apis.WellTargetNOXEmissionsExportApi.as_view(),
+        name='well_target_nox_emissions_export',
+    ),
     path(
         'emissions/wells/<int:well_planner_id>/complete/vessel-uses/create/',
         apis.CreateWellCompleteVesselUseApi.as_view(),
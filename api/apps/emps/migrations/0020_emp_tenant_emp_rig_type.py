@@ -0,0 +1,57 @@
+# Generated by Django 4.0.2 on 2026-10-19 09:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+RIG_TYPES = (
+    ('CustomSemiRig', 'semi'),
+    ('CustomJackupRig', 'jackup'),
+    ('CustomDrillship', 'drillship'),
+)
+
+
+def populate_emp_tenant_and_rig_type(apps, *args):
+    EMPModel = apps.get_model('emps', 'EMP')
+
+    for model_name, rig_type in RIG_TYPES:
+        RigModel = apps.get_model('rigs', model_name)
+        rigs = RigModel.objects.filter(emp=OuterRef('pk'))
+
+        EMPModel.objects.filter(pk__in=RigModel.objects.filter(emp__isnull=False).values('emp')).update(
+            tenant_id=Subquery(rigs.values('tenant_id')[:1]),
+            rig_type=rig_type,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0009_alter_user_options_user_company_user_role_and_more'),
+        ('rigs', '0029_alter_customjackupplanco2_total_days_and_more'),
+        ('emps', '0019_auto_20220928_0707'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='emp',
+            name='rig_type',
+            field=models.CharField(
+                blank=True,
+                choices=[('semi', 'Semi rig'), ('jackup', 'Jackup rig'), ('drillship', 'Drillship')],
+                max_length=20,
+            ),
+        ),
+        migrations.AddField(
+            model_name='emp',
+            name='tenant',
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name='+',
+                to='tenants.tenant',
+            ),
+        ),
+        migrations.RunPython(populate_emp_tenant_and_rig_type, migrations.RunPython.noop),
+    ]
@@ -1,8 +1,13 @@
+from typing import TYPE_CHECKING
+
 from django.core.validators import MinValueValidator
 from django.db import models
 
 from apps.core.models import TimestampedModel
 
+if TYPE_CHECKING:
+    from apps.rigs.models import CustomDrillship, CustomJackupRig, CustomSemiRig
+
 
 class ConceptEMPElement(TimestampedModel):
     name = models.CharField(max_length=255)
@@ -36,6 +41,19 @@ class CustomEMPElement(TimestampedModel):
         constraints = [models.UniqueConstraint(fields=["emp", "concept_emp_element"], name="unique_custom_emp_element")]
 
 
+class EMPRigType(models.TextChoices):
+    SEMI = 'semi', 'Semi rig'
+    JACKUP = 'jackup', 'Jackup rig'
+    DRILLSHIP = 'drillship', 'Drillship'
+
+
+EMP_RIG_ACCESSORS = {
+    EMPRigType.SEMI: 'customsemirig',
+    EMPRigType.JACKUP: 'customjackuprig',
+    EMPRigType.DRILLSHIP: 'customdrillship',
+}
+
+
 class EMP(TimestampedModel):
     name = models.CharField(max_length=255)
     description = models.TextField()
@@ -44,6 +62,15 @@ class EMP(TimestampedModel):
     end_date = models.DateField()
     total_rig_baseline_average = models.FloatField(validators=[MinValueValidator(0)])
     total_rig_target_average = models.FloatField(validators=[MinValueValidator(0)])
+    # denormalized from the rig the EMP belongs to
+    tenant = models.ForeignKey('tenants.Tenant', on_delete=models.PROTECT, null=True, blank=True, related_name='+')
+    rig_type = models.CharField(max_length=20, choices=EMPRigType.choices, blank=True)
 
     def __str__(self) -> str:
         return self.name
+
+    @property
+    def rig(self) -> 'CustomSemiRig | CustomJackupRig | CustomDrillship | None':
+        if not self.rig_type:
+            return None
+        return getattr(self, EMP_RIG_ACCESSORS[EMPRigType(self.rig_type)], None)
@@ -4,13 +4,20 @@ from typing import TypedDict
 
 from django.core.exceptions import ValidationError
 from django.db import transaction
+from django.utils import timezone
 
-from apps.emps.models import EMP, ConceptEMPElement, CustomEMPElement
+from apps.emps.models import EMP, ConceptEMPElement, CustomEMPElement, EMPRigType
 from apps.rigs.models import CustomDrillship, CustomJackupRig, CustomSemiRig
 from apps.tenants.models import User
 
 logger = logging.getLogger(__name__)
 
+EMP_RIG_TYPES = {
+    CustomSemiRig: EMPRigType.SEMI,
+    CustomJackupRig: EMPRigType.JACKUP,
+    CustomDrillship: EMPRigType.DRILLSHIP,
+}
+
 
 class CustomEMPElementData(TypedDict):
     id: int | None
@@ -30,6 +37,19 @@ class EMPData(TypedDict):
     elements: list[CustomEMPElementData]
 
 
+def get_concept_emp_elements(concept_ids: list[int]) -> dict[int, ConceptEMPElement]:
+    concept_emp_elements = ConceptEMPElement.objects.in_bulk(concept_ids)
+    missing_concept_ids = sorted(set(concept_ids) - concept_emp_elements.keys())
+
+    if missing_concept_ids:
+        logger.info(f'Unable to add ConceptEMPElements(pk__in={missing_concept_ids}). ConceptEMPElements do not exist.')
+        raise ValidationError(
+            {"concept_id": f"Concept emp elements do not exist: {', '.join(map(str, missing_concept_ids))}."}
+        )
+
+    return concept_emp_elements
+
+
 @transaction.atomic
 def create_emp(*, user: User, custom_rig: CustomJackupRig | CustomSemiRig | CustomDrillship, **data: EMPData) -> EMP:
     logger.info(f'User(pk={user.pk}) is creating an EMP for {custom_rig.__class__.__name__}(pk={custom_rig.pk})')
@@ -46,24 +66,26 @@ def create_emp(*, user: User, custom_rig: CustomJackupRig | CustomSemiRig | Cust
         logger.info('Unable to create EMP. End date before start date.')
         raise ValidationError({"end_date": "End date can't be before start date."})
 
-    emp: EMP = EMP.objects.create(**data)
-
-    for element_data in element_data_list:
-        concept_id: int = element_data.pop("concept_id")  # type: ignore
-        logger.info(f'Adding ConceptEMPElement(pk={concept_id}) to EMP(pk={emp.pk}).')
-
-        try:
-            concept_emp_element = ConceptEMPElement.objects.get(pk=concept_id)
-        except ConceptEMPElement.DoesNotExist:
-            logger.info(f'Unable to add ConceptEMPElement(pk={concept_id}). ConceptEMPElement does not exist.')
-            raise ValidationError({"concept_id": "Concept emp element does not exist"})
-
-        CustomEMPElement.objects.create(
-            emp=emp,
-            concept_emp_element=concept_emp_element,
-            baseline_average=element_data["baseline_average"],
-            target_average=element_data["target_average"],
-        )
+    concept_emp_elements = get_concept_emp_elements([element_data["concept_id"] for element_data in element_data_list])
+
+    emp: EMP = EMP.objects.create(
+        **data,
+        tenant_id=custom_rig.tenant_id,
+        rig_type=EMP_RIG_TYPES[type(custom_rig)],
+    )
+
+    logger.info(f'Adding ConceptEMPElements(pk__in={list(concept_emp_elements)}) to EMP(pk={emp.pk}).')
+    CustomEMPElement.objects.bulk_create(
+        [
+            CustomEMPElement(
+                emp=emp,
+                concept_emp_element=concept_emp_elements[element_data["concept_id"]],
+                baseline_average=element_data["baseline_average"],
+                target_average=element_data["target_average"],
+            )
+            for element_data in element_data_list
+        ]
+    )
 
     custom_rig.emp = emp
     custom_rig.save()
@@ -76,62 +98,64 @@ def create_emp(*, user: User, custom_rig: CustomJackupRig | CustomSemiRig | Cust
 def update_emp(*, user: User, emp: EMP, **data: EMPData) -> EMP:
     logger.info(f'User(pk={user.pk}) is updating an EMP(pk={emp.pk})')
     element_data_list: list[CustomEMPElementData] = data.pop("elements")  # type: ignore
-    element_data_id_list: list[int] = [
-        element_data["id"]
-        for element_data in element_data_list
-        if "id" in element_data and element_data["id"] is not None
+    updated_element_data_list = [
+        element_data for element_data in element_data_list if element_data.get("id") is not None
     ]
-    custom_emp_elements_to_delete = emp.elements.exclude(pk__in=element_data_id_list)
+    created_element_data_list = [element_data for element_data in element_data_list if element_data.get("id") is None]
 
     if data["end_date"] < data["start_date"]:  # type: ignore
         logger.info('Unable to create EMP. End date before start date.')
         raise ValidationError({"end_date": "End date can't be before start date."})
 
+    custom_emp_elements = emp.elements.in_bulk([element_data["id"] for element_data in updated_element_data_list])
+    missing_element_errors = [
+        f"CustomEMPElement(pk={custom_emp_element_id}, concept_emp_element_id={concept_id}) does not exist."
+        for custom_emp_element_id, concept_id in (
+            (element_data["id"], element_data["concept_id"]) for element_data in updated_element_data_list
+        )
+        if custom_emp_element_id not in custom_emp_elements
+        or custom_emp_elements[custom_emp_element_id].concept_emp_element_id != concept_id  # type: ignore
+    ]
+    if missing_element_errors:
+        logger.info(f"Unable to update EMP(pk={emp.pk}). {' '.join(missing_element_errors)}")
+        raise ValidationError(missing_element_errors)
+
+    concept_emp_elements = get_concept_emp_elements(
+        [element_data["concept_id"] for element_data in created_element_data_list]
+    )
+
     for field, value in data.items():
         setattr(emp, field, value)
 
     emp.save()
 
-    if custom_emp_elements_to_delete.exists():
-        for element_to_delete in custom_emp_elements_to_delete:
-            logger.info("Deleting CustomEMPElement(pk={element_to_delete.pk})")
-            element_to_delete.delete()
-
-    for element_data in element_data_list:
-        custom_emp_element_id = element_data.pop("id", None)  # type: ignore
-        concept_emp_element_id: int = element_data.pop("concept_id")  # type: ignore
-
-        if custom_emp_element_id is not None:
-            logger.info(f"Upadting CustomEMPElement(pk={custom_emp_element_id}).")
-            try:
-                custom_emp_element: CustomEMPElement = CustomEMPElement.objects.get(
-                    pk=custom_emp_element_id, concept_emp_element_id=concept_emp_element_id
-                )
-            except CustomEMPElement.DoesNotExist:
-                logger.info(
-                    f"Unable to update CustomEMPElement(pk={custom_emp_element_id}, concept_emp_element_id={concept_emp_element_id}). CustomEMPElement does not exist."
-                )
-                raise ValidationError(
-                    f"CustomEMPElement(pk={custom_emp_element_id}, concept_emp_element_id={concept_emp_element_id}) does not exist."
-                )
-
-            for field, value in element_data.items():  # type: ignore
-                setattr(custom_emp_element, field, value)
-
-        else:
-            logger.info(f"Creating CustomEMPElement for ConceptEMPElement(pk={concept_emp_element_id})")
-
-            try:
-                concept_emp_element = ConceptEMPElement.objects.get(pk=concept_emp_element_id)
-            except ConceptEMPElement.DoesNotExist:
-                logger.info(
-                    "Unable create CustomEMPElement. ConceptEMPElement(pk={concept_emp_element_id}) does not exist."
-                )
-                raise ValidationError(f"ConceptEMPElement(pk={concept_emp_element_id}) does not exist.")
-
-            custom_emp_element = CustomEMPElement(emp=emp, concept_emp_element=concept_emp_element, **element_data)
-
-        custom_emp_element.save()
+    deleted, _ = emp.elements.exclude(pk__in=custom_emp_elements.keys()).delete()
+    logger.info(f"Deleted {deleted} CustomEMPElements of EMP(pk={emp.pk}).")
+
+    now = timezone.now()
+    for element_data in updated_element_data_list:
+        custom_emp_element = custom_emp_elements[element_data["id"]]  # type: ignore
+        custom_emp_element.baseline_average = element_data["baseline_average"]
+        custom_emp_element.target_average = element_data["target_average"]
+        custom_emp_element.updated_at = now
+
+    logger.info(f"Updating CustomEMPElements(pk__in={list(custom_emp_elements)}).")
+    CustomEMPElement.objects.bulk_update(
+        custom_emp_elements.values(), fields=['baseline_average', 'target_average', 'updated_at']
+    )
+
+    logger.info(f"Creating CustomEMPElements for ConceptEMPElements(pk__in={list(concept_emp_elements)}).")
+    CustomEMPElement.objects.bulk_create(
+        [
+            CustomEMPElement(
+                emp=emp,
+                concept_emp_element=concept_emp_elements[element_data["concept_id"]],
+                baseline_average=element_data["baseline_average"],
+                target_average=element_data["target_average"],
+            )
+            for element_data in created_element_data_list
+        ]
+    )
 
     logger.info(f"EMP(pk={emp.pk}) has been updated.")
     return emp
@@ -3,6 +3,8 @@ from copy import deepcopy
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 
 from apps.emps.factories import ConceptEMPElementFactory, CustomEMPElementFactory, EMPFactory
 from apps.emps.models import EMP, ConceptEMPElement
@@ -65,6 +67,33 @@ class TestCreateEMP:
         custom_rig.refresh_from_db()
         assert custom_rig.emp == emp
 
+        assert emp.tenant == custom_rig.tenant
+        assert emp.rig == custom_rig
+
+    def test_should_create_elements_in_constant_number_of_queries(
+        self, emp_data: EMPData, RigFactory: AnyCustomRigFactory
+    ):
+        user = UserFactory()
+        queries = []
+
+        for elements in (1, 10):
+            custom_rig = RigFactory(emp=None)
+            data = deepcopy(emp_data)
+            data["elements"] = [
+                CustomEMPElementData(  # type: ignore
+                    concept_id=concept_emp_element.pk, baseline_average=20.0, target_average=100.0
+                )
+                for concept_emp_element in ConceptEMPElementFactory.create_batch(elements)
+            ]
+
+            with CaptureQueriesContext(connection) as context:
+                emp = create_emp(user=user, custom_rig=custom_rig, **data)
+
+            assert emp.elements.count() == elements
+            queries.append(len(context))
+
+        assert queries[0] == queries[1]
+
     def test_should_raise_validation_error_for_rig_with_emp(self, emp_data: EMPData, RigFactory: AnyCustomRigFactory):
         user = UserFactory()
         custom_rig = RigFactory()
@@ -79,7 +108,7 @@ class TestCreateEMP:
         custom_rig = RigFactory(emp=None)
         emp_data["elements"][0]["concept_id"] = 999
 
-        with pytest.raises(ValidationError, match='Concept emp element does not exist'):
+        with pytest.raises(ValidationError, match='Concept emp elements do not exist: 999.'):
             create_emp(user=user, custom_rig=custom_rig, **emp_data)
 
     def test_should_raise_validation_error_for_end_date_before_start_date(
@@ -151,6 +180,58 @@ class TestUpdateEMP:
         assert custom_emp_elements[1].baseline_average == emp_update_data["elements"][1]["baseline_average"]
         assert custom_emp_elements[1].target_average == emp_update_data["elements"][1]["target_average"]
 
+    def test_should_update_elements_in_constant_number_of_queries(self):
+        user = UserFactory()
+        queries = []
+
+        for elements in (2, 10):
+            emp = EMPFactory()
+            CustomEMPElementFactory.create_batch(elements, emp=emp)
+            data = EMPData(
+                name="Updated EMP name",
+                description="Updated EMP description",
+                api_description="Updated EMP api description",
+                start_date=datetime.date.today(),
+                end_date=datetime.date.today(),
+                total_rig_baseline_average=10.0,
+                total_rig_target_average=20.0,
+                elements=[
+                    *(
+                        CustomEMPElementData(
+                            id=custom_emp_element.pk,
+                            concept_id=custom_emp_element.concept_emp_element_id,
+                            baseline_average=30.0,
+                            target_average=40.0,
+                        )
+                        for custom_emp_element in emp.elements.all()[1:]
+                    ),
+                    *(
+                        CustomEMPElementData(  # type: ignore
+                            concept_id=concept_emp_element.pk, baseline_average=20.0, target_average=100.0
+                        )
+                        for concept_emp_element in ConceptEMPElementFactory.create_batch(elements)
+                    ),
+                ],
+            )
+
+            with CaptureQueriesContext(connection) as context:
+                update_emp(user=user, emp=emp, **data)
+
+            assert emp.elements.count() == 2 * elements - 1
+            assert emp.elements.filter(baseline_average=30.0).count() == elements - 1
+            queries.append(len(context))
+
+        assert queries[0] == queries[1]
+
+    def test_should_not_update_element_of_other_emp(self, emp: EMP, emp_update_data: EMPData):
+        user = UserFactory()
+        other_custom_emp_element = CustomEMPElementFactory()
+        emp_update_data["elements"][0]["id"] = other_custom_emp_element.pk
+        emp_update_data["elements"][0]["concept_id"] = other_custom_emp_element.concept_emp_element_id
+
+        with pytest.raises(ValidationError):
+            update_emp(user=user, emp=emp, **emp_update_data)
+
     def test_should_raise_validation_error_for_non_existing_custom_element_when_updating_element(
         self, emp: EMP, emp_update_data: EMPData
     ):
@@ -172,11 +253,14 @@ class TestUpdateEMP:
     ):
         user = UserFactory()
         emp_update_data["elements"][1]["concept_id"] = 999
+        emp_update_data["elements"].append(
+            CustomEMPElementData(concept_id=998, baseline_average=20.0, target_average=100.0)  # type: ignore
+        )
 
         with pytest.raises(ValidationError) as ex:
             update_emp(user=user, emp=emp, **emp_update_data)
 
-        assert ex.value.messages == ["ConceptEMPElement(pk=999) does not exist."]
+        assert ex.value.messages == ["Concept emp elements do not exist: 998, 999."]
 
     def test_should_raise_validation_error_for_end_date_before_start_date(self, emp: EMP, emp_update_data: EMPData):
         user = UserFactory()
@@ -39,7 +39,7 @@ class VesselAdmin(admin.ModelAdmin):
         'is_active',
     )
     inlines = (TagInline,)
-    readonly_fields = ('tags_synced_at',)
+    readonly_fields = ('tags_synced_at', 'tag_values_downsampled_until')
     search_fields = ('id', 'kims_vessel_id', 'name')
     autocomplete_fields = ('kims_api',)
 
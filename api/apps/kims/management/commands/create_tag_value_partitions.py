@@ -0,0 +1,26 @@
+from typing import Any
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandParser
+
+from apps.kims.services import create_tag_value_partitions
+
+
+class Command(BaseCommand):
+    help = 'Create monthly tag value partitions for upcoming months and move historic tag values into partitions'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument(
+            '--months-ahead',
+            type=int,
+            default=settings.KIMS_TAG_VALUE_PARTITION_MONTHS_AHEAD,
+            help='Number of upcoming months to create partitions for',
+        )
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        created_partitions = create_tag_value_partitions(options['months_ahead'])
+
+        for partition_name, moved in created_partitions.items():
+            self.stdout.write(f'{partition_name}: created, moved {moved} tag values')
+
+        self.stdout.write(f'Created {len(created_partitions)} partitions')
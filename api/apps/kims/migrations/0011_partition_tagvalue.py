@@ -0,0 +1,75 @@
+# Generated by Django 4.0.2 on 2026-10-19 10:00
+
+from django.db import migrations
+
+TABLE = 'kims_tagvalue'
+DEFAULT_PARTITION = 'kims_tagvalue_default'
+
+
+def get_constraints(schema_editor, table: str) -> list[tuple[str, str]]:
+    # check and foreign key constraints have to be recreated on the partitioned table with the same names
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint "
+            "WHERE conrelid = %s::regclass AND contype IN ('c', 'f') ORDER BY conname",
+            [table],
+        )
+        return cursor.fetchall()
+
+
+def partition_tag_value(apps, schema_editor):
+    """
+    Turn the tag value table into a table partitioned by month of the date. Existing rows are kept
+    in the default partition and moved to monthly partitions by the create_tag_value_partitions command.
+    """
+    quote_name = schema_editor.quote_name
+    constraints = get_constraints(schema_editor, TABLE)
+
+    schema_editor.execute(f'ALTER TABLE {TABLE} RENAME TO {DEFAULT_PARTITION}')
+    schema_editor.execute(
+        f'ALTER TABLE {DEFAULT_PARTITION} RENAME CONSTRAINT unique_tag_value TO {DEFAULT_PARTITION}_tag_id_date_key'
+    )
+    # primary keys of partitioned tables have to include the partition key
+    schema_editor.execute(
+        f'ALTER TABLE {DEFAULT_PARTITION} DROP CONSTRAINT {TABLE}_pkey, '
+        f'ADD CONSTRAINT {DEFAULT_PARTITION}_pkey PRIMARY KEY (id, date)'
+    )
+
+    schema_editor.execute(
+        f'CREATE TABLE {TABLE} (LIKE {DEFAULT_PARTITION} INCLUDING DEFAULTS) PARTITION BY RANGE (date)'
+    )
+    schema_editor.execute(f'ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}.id')
+    schema_editor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id, date)')
+    schema_editor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT unique_tag_value UNIQUE (tag_id, date)')
+    for name, definition in constraints:
+        schema_editor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {quote_name(name)} {definition}')
+
+    schema_editor.execute(f'ALTER TABLE {TABLE} ATTACH PARTITION {DEFAULT_PARTITION} DEFAULT')
+
+
+def unpartition_tag_value(apps, schema_editor):
+    quote_name = schema_editor.quote_name
+    constraints = get_constraints(schema_editor, TABLE)
+
+    schema_editor.execute(f'CREATE TABLE {TABLE}_unpartitioned (LIKE {TABLE} INCLUDING DEFAULTS)')
+    schema_editor.execute(f'INSERT INTO {TABLE}_unpartitioned SELECT * FROM {TABLE}')
+    schema_editor.execute(f'ALTER SEQUENCE {TABLE}_id_seq OWNED BY {TABLE}_unpartitioned.id')
+    schema_editor.execute(f'DROP TABLE {TABLE} CASCADE')
+    schema_editor.execute(f'ALTER TABLE {TABLE}_unpartitioned RENAME TO {TABLE}')
+
+    schema_editor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {TABLE}_pkey PRIMARY KEY (id)')
+    schema_editor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT unique_tag_value UNIQUE (tag_id, date)')
+    schema_editor.execute(f'CREATE INDEX {TABLE}_tag_id ON {TABLE} (tag_id)')
+    for name, definition in constraints:
+        schema_editor.execute(f'ALTER TABLE {TABLE} ADD CONSTRAINT {quote_name(name)} {definition}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kims', '0010_alter_vessel_name'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_tag_value, unpartition_tag_value),
+    ]
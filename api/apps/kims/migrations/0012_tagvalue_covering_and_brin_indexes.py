@@ -0,0 +1,82 @@
+# Generated by Django 4.0.2 on 2026-10-19 11:00
+
+import django.contrib.postgres.indexes
+from django.db import migrations, models
+
+TABLE = 'kims_tagvalue'
+BRIN_INDEX = 'tag_value_date_brin'
+
+
+def get_partitions(schema_editor) -> list[str]:
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass", [TABLE])
+        return [name for name, in cursor.fetchall()]
+
+
+def create_brin_index(apps, schema_editor):
+    """
+    Indexes of partitioned tables can't be created concurrently. The index is created on the partitioned
+    table only, built concurrently on every partition and becomes valid once all partitions are attached.
+    """
+    schema_editor.execute(f'CREATE INDEX IF NOT EXISTS {BRIN_INDEX} ON ONLY {TABLE} USING brin (date)')
+
+    for partition in get_partitions(schema_editor):
+        partition_index = schema_editor.quote_name(f'{partition}_date_brin')
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {partition_index} ON {partition} USING brin (date)'
+        )
+        schema_editor.execute(f'ALTER INDEX {BRIN_INDEX} ATTACH PARTITION {partition_index}')
+
+
+def drop_brin_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS {BRIN_INDEX}')
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently
+    atomic = False
+
+    dependencies = [
+        ('kims', '0011_partition_tagvalue'),
+    ]
+
+    operations = [
+        # Unique constraints of partitioned tables can't be built concurrently or attached from an existing index.
+        # The constraint is rebuilt by a single statement holding an ACCESS EXCLUSIVE lock on the tag value table,
+        # so K-IMS syncs and dataset reads wait until the index of every partition is built. Expect the time of
+        # a full scan and sort of the table, i.e. minutes for hundreds of millions of tag values. Run it outside
+        # of the hourly sync.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=f'ALTER TABLE {TABLE} DROP CONSTRAINT unique_tag_value, '
+                    'ADD CONSTRAINT unique_tag_value UNIQUE (tag_id, date) INCLUDE (mean, average)',
+                    reverse_sql=f'ALTER TABLE {TABLE} DROP CONSTRAINT unique_tag_value, '
+                    'ADD CONSTRAINT unique_tag_value UNIQUE (tag_id, date)',
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name='tagvalue',
+                    name='unique_tag_value',
+                ),
+                migrations.AddConstraint(
+                    model_name='tagvalue',
+                    constraint=models.UniqueConstraint(
+                        fields=('tag', 'date'), include=('mean', 'average'), name='unique_tag_value'
+                    ),
+                ),
+            ],
+        ),
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_brin_index, drop_brin_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(
+                    model_name='tagvalue',
+                    index=django.contrib.postgres.indexes.BrinIndex(fields=['date'], name=BRIN_INDEX),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 4.0.2 on 2026-10-19 12:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('kims', '0012_tagvalue_covering_and_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='vessel',
+            name='tag_values_retention_days',
+            field=models.PositiveIntegerField(
+                blank=True,
+                help_text='Tag values older than this number of days are replaced by daily aggregates. '
+                'Leave empty to keep all tag values.',
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name='vessel',
+            name='tag_values_downsampled_until',
+            field=models.DateTimeField(
+                help_text='Tag values before this time have been replaced by daily aggregates', null=True
+            ),
+        ),
+        migrations.CreateModel(
+            name='DailyTagValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('count', models.PositiveIntegerField(help_text='Number of aggregated tag values')),
+                (
+                    'last_tag_value_id',
+                    models.BigIntegerField(
+                        help_text='Id of the newest aggregated tag value. '
+                        'Newer tag values of the day are added by the next run.'
+                    ),
+                ),
+                ('mean_count', models.PositiveIntegerField()),
+                ('mean_min', models.FloatField(null=True)),
+                ('mean_mean', models.FloatField(null=True)),
+                ('mean_max', models.FloatField(null=True)),
+                ('average_count', models.PositiveIntegerField()),
+                ('average_min', models.FloatField(null=True)),
+                ('average_mean', models.FloatField(null=True)),
+                ('average_max', models.FloatField(null=True)),
+                (
+                    'tag',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.PROTECT, related_name='daily_values', to='kims.tag'
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='dailytagvalue',
+            constraint=models.UniqueConstraint(fields=('tag', 'date'), name='unique_daily_tag_value'),
+        ),
+    ]
@@ -1,6 +1,7 @@
 from typing import cast
 
 import pgcrypto
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.db.models import Q
 
@@ -27,6 +28,15 @@ class Vessel(TimestampedModel):
     name = models.CharField(max_length=255, unique=True)
     is_active = models.BooleanField(default=False, help_text="Data will be synced only for active vessels.")
     tags_synced_at = models.DateTimeField(null=True, help_text="Time of the last sync of tag values")
+    tag_values_retention_days = models.PositiveIntegerField(
+        null=True,
+        blank=True,
+        help_text="Tag values older than this number of days are replaced by daily aggregates. "
+        "Leave empty to keep all tag values.",
+    )
+    tag_values_downsampled_until = models.DateTimeField(
+        null=True, help_text="Tag values before this time have been replaced by daily aggregates"
+    )
 
     def __str__(self) -> str:
         return self.name
@@ -75,9 +85,41 @@ class TagValue(TimestampedModel):
 
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=["tag", "date"], name="unique_tag_value"),
+            # includes metrics, so reads of tag values in a date range are served by index only scans
+            models.UniqueConstraint(fields=["tag", "date"], include=["mean", "average"], name="unique_tag_value"),
             models.CheckConstraint(check=Q(date__minute=0, date__second=0), name="even_tag_value_date_hour"),
         ]
+        indexes = [BrinIndex(fields=["date"], name="tag_value_date_brin")]
 
     def __str__(self) -> str:
         return f"Tag Value: {self.pk}"
+
+
+class DailyTagValue(TimestampedModel):
+    """
+    Daily aggregates of downsampled tag values. Aggregates of non-numeric tags are empty.
+    """
+
+    tag = models.ForeignKey('kims.Tag', on_delete=models.PROTECT, related_name="daily_values")
+    date = models.DateField()
+    count = models.PositiveIntegerField(help_text="Number of aggregated tag values")
+    last_tag_value_id = models.BigIntegerField(
+        help_text="Id of the newest aggregated tag value. Newer tag values of the day are added by the next run."
+    )
+    mean_count = models.PositiveIntegerField()
+    mean_min = models.FloatField(null=True)
+    mean_mean = models.FloatField(null=True)
+    mean_max = models.FloatField(null=True)
+    average_count = models.PositiveIntegerField()
+    average_min = models.FloatField(null=True)
+    average_mean = models.FloatField(null=True)
+    average_max = models.FloatField(null=True)
+
+    # aggregates of every metric in TagValue.metrics, stored as <metric>_<aggregate> fields
+    aggregates = ['count', 'min', 'mean', 'max']
+
+    class Meta:
+        constraints = [models.UniqueConstraint(fields=["tag", "date"], name="unique_daily_tag_value")]
+
+    def __str__(self) -> str:
+        return f"Daily Tag Value: {self.pk}"
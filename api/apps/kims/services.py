@@ -1,11 +1,15 @@
 import logging
 from datetime import datetime, timedelta
 
-from django.db import transaction
+import pytz
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Avg, Case, Count, Exists, FloatField, Max, Min, OuterRef, Q, When
+from django.db.models.functions import Cast
 from django.utils import timezone
 
 from apps.kims.client import get_kims_client
-from apps.kims.models import Tag, TagDataType, TagValue, Vessel
+from apps.kims.models import DailyTagValue, Tag, TagDataType, TagValue, Vessel
 
 logger = logging.getLogger(__name__)
 
@@ -104,3 +108,277 @@ def sync_vessel_tag_value(*, tag: Tag, start: datetime, end: datetime) -> bool:
     logger.info(f"Synced tag value for Tag({tag.name}).")
 
     return True
+
+
+TAG_VALUE_TABLE = TagValue._meta.db_table
+TAG_VALUE_DEFAULT_PARTITION = f'{TAG_VALUE_TABLE}_default'
+
+
+def get_month_start(date: datetime) -> datetime:
+    return date.astimezone(pytz.UTC).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+
+def add_months(month: datetime, months: int) -> datetime:
+    year, month_index = divmod(month.month - 1 + months, 12)
+    return month.replace(year=month.year + year, month=month_index + 1)
+
+
+def get_tag_value_partition_name(month: datetime) -> str:
+    return f'{TAG_VALUE_TABLE}_{month:%Y_%m}'
+
+
+def get_tag_value_partitions() -> set[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT inhrelid::regclass::text FROM pg_inherits WHERE inhparent = %s::regclass', [TAG_VALUE_TABLE]
+        )
+        return {name for name, in cursor.fetchall()}
+
+
+@transaction.atomic
+def create_tag_value_partition(month: datetime) -> int:
+    """
+    Create the tag value partition of the month and move its rows out of the default partition.
+    Returns the number of moved rows.
+    """
+    start, end = month, add_months(month, 1)
+    partition_name = get_tag_value_partition_name(month)
+    partition = connection.ops.quote_name(partition_name)
+    logger.info(f'Creating TagValue partition {partition_name} from {start} to {end}.')
+
+    with connection.cursor() as cursor:
+        cursor.execute(f'CREATE TABLE {partition} (LIKE {TAG_VALUE_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)')
+        # lets postgres skip the validation scan of the partition when attaching it
+        cursor.execute(
+            f'ALTER TABLE {partition} ADD CONSTRAINT {partition_name}_range CHECK (date >= %s AND date < %s)',
+            [start, end],
+        )
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM {TAG_VALUE_DEFAULT_PARTITION} WHERE date >= %s AND date < %s RETURNING *) '
+            f'INSERT INTO {partition} SELECT * FROM moved',
+            [start, end],
+        )
+        moved = cursor.rowcount
+        cursor.execute(
+            f'ALTER TABLE {TAG_VALUE_TABLE} ATTACH PARTITION {partition} FOR VALUES FROM (%s) TO (%s)', [start, end]
+        )
+        cursor.execute(f'ALTER TABLE {partition} DROP CONSTRAINT {partition_name}_range')
+
+    logger.info(f'TagValue partition {partition_name} has been created. Moved {moved} tag values.')
+    return moved
+
+
+def create_tag_value_partitions(months_ahead: int) -> dict[str, int]:
+    """
+    Create monthly tag value partitions for all months with tag values in the default partition
+    and for the upcoming months. Returns the number of moved rows of every created partition.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT MIN(date) FROM {TAG_VALUE_DEFAULT_PARTITION}')
+        (oldest_date,) = cursor.fetchone()
+
+    current_month = get_month_start(timezone.now())
+    month = min(get_month_start(oldest_date), current_month) if oldest_date else current_month
+    last_month = add_months(current_month, months_ahead)
+    partitions = get_tag_value_partitions()
+    created_partitions = {}
+
+    while month <= last_month:
+        partition_name = get_tag_value_partition_name(month)
+        if partition_name not in partitions:
+            created_partitions[partition_name] = create_tag_value_partition(month)
+        month = add_months(month, 1)
+
+    logger.info(f'Created {len(created_partitions)} TagValue partitions.')
+    return created_partitions
+
+
+# tag values of these data types are stored as numbers and can be aggregated
+NUMERIC_TAG_DATA_TYPES = [TagDataType.DOUBLE, TagDataType.BOOLEAN, TagDataType.SINGLE, TagDataType.INT_32]
+
+
+def get_day_start(date: datetime) -> datetime:
+    return date.astimezone(pytz.UTC).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def get_tag_values_retention_cutoff(vessel: Vessel) -> datetime | None:
+    """
+    Return the start of the day before which tag values of the vessel are downsampled, or None when
+    the vessel keeps all tag values. Tag values newer than the last sync are always kept, as monitor
+    function values have not been calculated for them yet.
+    """
+    if vessel.tag_values_retention_days is None or vessel.tags_synced_at is None:
+        return None
+
+    return get_day_start(min(timezone.now() - timedelta(days=vessel.tag_values_retention_days), vessel.tags_synced_at))
+
+
+def get_numeric_metric(metric: str) -> Case:
+    return Case(
+        When(
+            Q(tag__data_type__in=NUMERIC_TAG_DATA_TYPES) & ~Q(**{metric: 'NaN'}),
+            then=Cast(metric, output_field=FloatField()),
+        ),
+        default=None,
+        output_field=FloatField(),
+    )
+
+
+def merge_daily_tag_value(daily_tag_value: DailyTagValue, values: dict) -> None:
+    """
+    Add aggregates of tag values that were not aggregated into the daily tag value yet.
+    """
+    for metric in TagValue.metrics:
+        count = getattr(daily_tag_value, f'{metric}_count')
+        added_count = values[f'{metric}_count']
+        if not added_count:
+            continue
+
+        if count:
+            mean = getattr(daily_tag_value, f'{metric}_mean')
+            added_mean = values[f'{metric}_mean']
+            values[f'{metric}_min'] = min(getattr(daily_tag_value, f'{metric}_min'), values[f'{metric}_min'])
+            values[f'{metric}_mean'] = (mean * count + added_mean * added_count) / (count + added_count)
+            values[f'{metric}_max'] = max(getattr(daily_tag_value, f'{metric}_max'), values[f'{metric}_max'])
+
+        setattr(daily_tag_value, f'{metric}_count', count + added_count)
+        for aggregate in ['min', 'mean', 'max']:
+            setattr(daily_tag_value, f'{metric}_{aggregate}', values[f'{metric}_{aggregate}'])
+
+    daily_tag_value.count += values['count']
+    daily_tag_value.last_tag_value_id = max(daily_tag_value.last_tag_value_id, values['last_tag_value_id'])
+
+
+@transaction.atomic
+def downsample_vessel_tag_values_day(*, vessel: Vessel, day: datetime) -> int:
+    """
+    Aggregate tag values of the vessel in the day starting at the given date into daily tag values
+    and mark the day as downsampled. Tag values stored after the day has been downsampled are added
+    to the existing daily tag values. Returns the number of created or updated daily tag values.
+    """
+    next_day = day + timedelta(days=1)
+    aggregates = {}
+    for metric in TagValue.metrics:
+        value = get_numeric_metric(metric)
+        aggregates[f'{metric}_count'] = Count(value)
+        aggregates[f'{metric}_min'] = Min(value)
+        aggregates[f'{metric}_mean'] = Avg(value)
+        aggregates[f'{metric}_max'] = Max(value)
+
+    # tag values up to the last tag value id of a daily tag value have been aggregated into it
+    aggregated = DailyTagValue.objects.filter(
+        tag=OuterRef('tag'), date=day.date(), last_tag_value_id__gte=OuterRef('id')
+    )
+    values = (
+        TagValue.objects.filter(tag__vessel=vessel, date__gte=day, date__lt=next_day)
+        .filter(~Exists(aggregated))
+        .values('tag')
+        .annotate(count=Count('id'), last_tag_value_id=Max('id'), **aggregates)
+        .order_by()
+    )
+    existing_daily_tag_values = {
+        daily_tag_value.tag_id: daily_tag_value
+        for daily_tag_value in DailyTagValue.objects.select_for_update(of=('self',)).filter(
+            tag__vessel=vessel, date=day.date()
+        )
+    }
+
+    created_daily_tag_values = []
+    updated_daily_tag_values = []
+    for value in values:
+        tag_id = value.pop('tag')
+        if tag_id in existing_daily_tag_values:
+            daily_tag_value = existing_daily_tag_values[tag_id]
+            merge_daily_tag_value(daily_tag_value, value)
+            updated_daily_tag_values.append(daily_tag_value)
+        else:
+            created_daily_tag_values.append(DailyTagValue(date=day.date(), tag_id=tag_id, **value))
+
+    DailyTagValue.objects.bulk_create(created_daily_tag_values)
+    DailyTagValue.objects.bulk_update(
+        updated_daily_tag_values,
+        fields=[
+            'count',
+            'last_tag_value_id',
+            *(f'{metric}_{aggregate}' for metric in TagValue.metrics for aggregate in DailyTagValue.aggregates),
+        ],
+    )
+
+    if vessel.tag_values_downsampled_until is None or vessel.tag_values_downsampled_until < next_day:
+        Vessel.objects.filter(pk=vessel.pk).update(tag_values_downsampled_until=next_day)
+        vessel.tag_values_downsampled_until = next_day
+
+    downsampled = len(created_daily_tag_values) + len(updated_daily_tag_values)
+    logger.info(f"Downsampled {downsampled} tags of Vessel(pk={vessel.pk}) on {day.date()}.")
+    return downsampled
+
+
+def delete_downsampled_tag_values(*, vessel: Vessel, batch_size: int | None = None) -> int:
+    """
+    Delete tag values of the vessel that have been aggregated into daily tag values. Every batch is
+    deleted in its own transaction, so row locks are held briefly and the deletion can be interrupted
+    at any time. Returns the number of deleted tag values.
+    """
+    if vessel.tag_values_downsampled_until is None:
+        return 0
+
+    batch_size = batch_size or settings.KIMS_TAG_VALUE_DELETE_BATCH_SIZE
+    deleted = 0
+
+    while True:
+        with transaction.atomic(), connection.cursor() as cursor:
+            # the partition key is part of the primary key, so postgres only visits the old partitions.
+            # tag values stored after their day has been downsampled are kept until the next run adds them.
+            cursor.execute(
+                f'DELETE FROM {TAG_VALUE_TABLE} WHERE (id, date) IN ('
+                f'SELECT tag_value.id, tag_value.date FROM {TAG_VALUE_TABLE} tag_value '
+                f'JOIN {Tag._meta.db_table} tag ON tag.id = tag_value.tag_id '
+                f'JOIN {DailyTagValue._meta.db_table} daily_tag_value ON daily_tag_value.tag_id = tag_value.tag_id '
+                f"AND daily_tag_value.date = (tag_value.date AT TIME ZONE 'UTC')::date "
+                f'WHERE tag_value.date < %s AND tag.vessel_id = %s '
+                f'AND tag_value.id <= daily_tag_value.last_tag_value_id LIMIT %s)',
+                [vessel.tag_values_downsampled_until, vessel.pk, batch_size],
+            )
+            batch_deleted = cursor.rowcount
+
+        deleted += batch_deleted
+        if batch_deleted < batch_size:
+            break
+
+    logger.info(f"Deleted {deleted} downsampled tag values of Vessel(pk={vessel.pk}).")
+    return deleted
+
+
+def downsample_vessel_tag_values(*, vessel: Vessel, batch_size: int | None = None) -> tuple[int, int]:
+    """
+    Replace tag values of the vessel older than its retention period by daily tag values.
+    Returns the number of created daily tag values and the number of deleted tag values.
+    """
+    cutoff = get_tag_values_retention_cutoff(vessel)
+    if cutoff is None:
+        logger.info(f"Vessel(pk={vessel.pk}) keeps all tag values.")
+        return 0, 0
+
+    logger.info(f"Downsampling tag values of Vessel(pk={vessel.pk}) before {cutoff}.")
+
+    created = 0
+    day = vessel.tag_values_downsampled_until
+    if day is not None:
+        # tag values can be stored after their day has been downsampled, e.g. by a late sync
+        for late_day in TagValue.objects.filter(tag__vessel=vessel, date__lt=day).datetimes(
+            'date', 'day', tzinfo=pytz.UTC
+        ):
+            created += downsample_vessel_tag_values_day(vessel=vessel, day=late_day)
+    else:
+        oldest = TagValue.objects.filter(tag__vessel=vessel).order_by('date').values_list('date', flat=True).first()
+        day = get_day_start(oldest) if oldest else cutoff
+
+    while day < cutoff:
+        created += downsample_vessel_tag_values_day(vessel=vessel, day=day)
+        day += timedelta(days=1)
+
+    if vessel.tag_values_downsampled_until is None:
+        Vessel.objects.filter(pk=vessel.pk).update(tag_values_downsampled_until=cutoff)
+        vessel.tag_values_downsampled_until = cutoff
+
+    return created, delete_downsampled_tag_values(vessel=vessel, batch_size=batch_size)
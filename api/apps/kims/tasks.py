@@ -13,7 +13,13 @@ from apps.app.celery import app
 from apps.core.celery.throttle import get_task_wait, throttle_task
 from apps.kims.client import KimsClientException
 from apps.kims.models import Tag, Vessel
-from apps.kims.services import get_tags_sync_period, sync_vessel_tag_value, sync_vessel_tags
+from apps.kims.services import (
+    create_tag_value_partitions,
+    downsample_vessel_tag_values,
+    get_tags_sync_period,
+    sync_vessel_tag_value,
+    sync_vessel_tags,
+)
 from apps.monitors.tasks import sync_overlapping_monitor_functions_task
 
 logger = logging.getLogger(__name__)
@@ -143,3 +149,30 @@ def sync_vessels_task() -> None:
         delay[vessel.kims_api_id] += 2
 
     logger.info('Started tasks for all active vessels')
+
+
+@app.task
+def create_tag_value_partitions_task() -> None:
+    logger.info('Creating upcoming tag value partitions')
+    create_tag_value_partitions(settings.KIMS_TAG_VALUE_PARTITION_MONTHS_AHEAD)
+
+
+@app.task
+def downsample_vessel_tag_values_task(vessel_id: int) -> None:
+    logger.info(f'Downsampling tag values of Vessel(pk={vessel_id})')
+
+    try:
+        vessel = Vessel.objects.get(pk=vessel_id)
+    except Vessel.DoesNotExist:
+        logger.exception(f'Unable to downsample tag values of Vessel(pk={vessel_id}). No vessel found.')
+        return
+
+    downsample_vessel_tag_values(vessel=vessel)
+
+
+@app.task
+def downsample_tag_values_task() -> None:
+    logger.info('Downsampling tag values of vessels with a retention period')
+
+    for vessel_id in Vessel.objects.filter(tag_values_retention_days__isnull=False).values_list('pk', flat=True):
+        downsample_vessel_tag_values_task.delay(vessel_id)
@@ -2,11 +2,27 @@ import datetime
 
 import pytest
 import pytz
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
 from vcr import VCR
 
 from apps.kims.factories import TagFactory, TagValueFactory, VesselFactory
-from apps.kims.models import Tag, TagDataType, TagValue
-from apps.kims.services import cast_tag_value, get_tags_sync_period, sync_vessel_tag_value, sync_vessel_tags
+from apps.kims.models import DailyTagValue, Tag, TagDataType, TagValue
+from apps.kims.services import (
+    TAG_VALUE_DEFAULT_PARTITION,
+    add_months,
+    cast_tag_value,
+    create_tag_value_partitions,
+    delete_downsampled_tag_values,
+    downsample_vessel_tag_values,
+    downsample_vessel_tag_values_day,
+    get_month_start,
+    get_tag_value_partitions,
+    get_tags_sync_period,
+    sync_vessel_tag_value,
+    sync_vessel_tags,
+)
 
 
 @pytest.mark.django_db
@@ -206,3 +222,200 @@ class TestGetTagsSyncPeriod:
 )
 def test_cast_tag_value(data_type, input_value, output_value):
     assert cast_tag_value(data_type, input_value) == output_value
+
+
+def get_tag_value_partition(tag_value: TagValue) -> str:
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT tableoid::regclass::text FROM kims_tagvalue WHERE id = %s', [tag_value.pk])
+        return cursor.fetchone()[0]
+
+
+def test_add_months():
+    month = datetime.datetime(2022, 11, 1, tzinfo=pytz.UTC)
+
+    assert add_months(month, 1) == datetime.datetime(2022, 12, 1, tzinfo=pytz.UTC)
+    assert add_months(month, 2) == datetime.datetime(2023, 1, 1, tzinfo=pytz.UTC)
+    assert add_months(month, 14) == datetime.datetime(2024, 1, 1, tzinfo=pytz.UTC)
+
+
+@pytest.mark.django_db
+class TestCreateTagValuePartitions:
+    def test_should_create_partitions(self):
+        current_month = get_month_start(timezone.now())
+        historic_tag_value = TagValueFactory(date=add_months(current_month, -2) + datetime.timedelta(hours=5))
+        current_tag_value = TagValueFactory(date=current_month)
+
+        created_partitions = create_tag_value_partitions(months_ahead=2)
+
+        assert created_partitions == {
+            f'kims_tagvalue_{add_months(current_month, -2):%Y_%m}': 1,
+            f'kims_tagvalue_{add_months(current_month, -1):%Y_%m}': 0,
+            f'kims_tagvalue_{current_month:%Y_%m}': 1,
+            f'kims_tagvalue_{add_months(current_month, 1):%Y_%m}': 0,
+            f'kims_tagvalue_{add_months(current_month, 2):%Y_%m}': 0,
+        }
+        assert get_tag_value_partitions() == {*created_partitions, TAG_VALUE_DEFAULT_PARTITION}
+        assert get_tag_value_partition(historic_tag_value) == f'kims_tagvalue_{add_months(current_month, -2):%Y_%m}'
+        assert get_tag_value_partition(current_tag_value) == f'kims_tagvalue_{current_month:%Y_%m}'
+
+    def test_should_keep_model_api_working(self):
+        create_tag_value_partitions(months_ahead=1)
+        tag = TagFactory()
+        date = get_month_start(timezone.now())
+
+        tag_value, created = TagValue.objects.update_or_create(
+            tag=tag, date=date, defaults={'mean': '1', 'average': '2'}
+        )
+        updated_tag_value, updated = TagValue.objects.update_or_create(
+            tag=tag, date=date, defaults={'mean': '3', 'average': '4'}
+        )
+
+        assert created is True
+        assert updated is False
+        assert updated_tag_value.pk == tag_value.pk
+        assert TagValue.objects.get(pk=tag_value.pk).mean == '3'
+        assert get_tag_value_partition(tag_value) == f'kims_tagvalue_{date:%Y_%m}'
+
+    def test_should_not_recreate_existing_partitions(self):
+        create_tag_value_partitions(months_ahead=1)
+
+        assert create_tag_value_partitions(months_ahead=1) == {}
+
+    def test_create_tag_value_partitions_command(self, capsys):
+        call_command('create_tag_value_partitions', '--months-ahead', '0')
+
+        captured = capsys.readouterr()
+        partition_name = f'kims_tagvalue_{get_month_start(timezone.now()):%Y_%m}'
+        assert captured.out == f'{partition_name}: created, moved 0 tag values\nCreated 1 partitions\n'
+
+
+@pytest.mark.django_db
+@pytest.mark.freeze_time("2022-01-14 12:02:01")
+class TestDownsampleVesselTagValues:
+    @pytest.fixture
+    def vessel(self):
+        return VesselFactory(
+            tags_synced_at=datetime.datetime(2022, 1, 14, 12, tzinfo=pytz.UTC), tag_values_retention_days=3
+        )
+
+    def test_should_replace_old_tag_values_by_daily_aggregates(self, vessel):
+        tag = TagFactory(vessel=vessel)
+        object_tag = TagFactory(vessel=vessel, data_type=TagDataType.OBJECT)
+        day = datetime.datetime(2022, 1, 9, tzinfo=pytz.UTC)
+        TagValueFactory(tag=tag, date=day, mean='1.0', average='10.0')
+        TagValueFactory(tag=tag, date=day + datetime.timedelta(hours=1), mean='3.0', average='NaN')
+        TagValueFactory(tag=object_tag, date=day, mean='True', average='False')
+        TagValueFactory(tag=tag, date=day + datetime.timedelta(days=1), mean='5.0', average='50.0')
+        kept_tag_value = TagValueFactory(tag=tag, date=datetime.datetime(2022, 1, 11, 1, tzinfo=pytz.UTC))
+        other_tag_value = TagValueFactory(date=day)
+
+        created, deleted = downsample_vessel_tag_values(vessel=vessel, batch_size=2)
+
+        assert (created, deleted) == (3, 4)
+        assert list(TagValue.objects.order_by('pk')) == [kept_tag_value, other_tag_value]
+        assert list(
+            DailyTagValue.objects.order_by('date', 'tag_id').values(
+                'tag', 'date', 'count', 'mean_min', 'mean_mean', 'mean_max', 'average_min', 'average_max'
+            )
+        ) == [
+            {
+                'tag': tag.pk,
+                'date': datetime.date(2022, 1, 9),
+                'count': 2,
+                'mean_min': 1.0,
+                'mean_mean': 2.0,
+                'mean_max': 3.0,
+                'average_min': 10.0,
+                'average_max': 10.0,
+            },
+            {
+                'tag': object_tag.pk,
+                'date': datetime.date(2022, 1, 9),
+                'count': 1,
+                'mean_min': None,
+                'mean_mean': None,
+                'mean_max': None,
+                'average_min': None,
+                'average_max': None,
+            },
+            {
+                'tag': tag.pk,
+                'date': datetime.date(2022, 1, 10),
+                'count': 1,
+                'mean_min': 5.0,
+                'mean_mean': 5.0,
+                'mean_max': 5.0,
+                'average_min': 50.0,
+                'average_max': 50.0,
+            },
+        ]
+        vessel.refresh_from_db()
+        assert vessel.tag_values_downsampled_until == datetime.datetime(2022, 1, 11, tzinfo=pytz.UTC)
+
+    def test_should_continue_after_downsampled_day(self, vessel, freezer):
+        tag = TagFactory(vessel=vessel)
+        TagValueFactory(tag=tag, date=datetime.datetime(2022, 1, 9, tzinfo=pytz.UTC))
+        downsample_vessel_tag_values(vessel=vessel)
+        TagValueFactory(tag=tag, date=datetime.datetime(2022, 1, 10, tzinfo=pytz.UTC))
+
+        freezer.move_to("2022-01-15 12:02:01")
+        vessel.tags_synced_at = datetime.datetime(2022, 1, 15, 12, tzinfo=pytz.UTC)
+
+        assert downsample_vessel_tag_values(vessel=vessel) == (1, 1)
+
+        assert list(DailyTagValue.objects.order_by('date').values_list('date', flat=True)) == [
+            datetime.date(2022, 1, 9),
+            datetime.date(2022, 1, 10),
+        ]
+
+    def test_should_add_late_tag_values_to_daily_aggregates(self, vessel, freezer):
+        tag = TagFactory(vessel=vessel)
+        day = datetime.datetime(2022, 1, 9, tzinfo=pytz.UTC)
+        TagValueFactory(tag=tag, date=day, mean='1.0', average='NaN')
+        downsample_vessel_tag_values(vessel=vessel)
+        TagValueFactory(tag=tag, date=day + datetime.timedelta(hours=1), mean='4.0', average='20.0')
+        TagValueFactory(tag=tag, date=day + datetime.timedelta(hours=2), mean='7.0', average='NaN')
+
+        freezer.move_to("2022-01-15 12:02:01")
+        vessel.tags_synced_at = datetime.datetime(2022, 1, 15, 12, tzinfo=pytz.UTC)
+
+        assert downsample_vessel_tag_values(vessel=vessel) == (1, 2)
+
+        assert not TagValue.objects.exists()
+        assert DailyTagValue.objects.values(
+            'date', 'count', 'mean_count', 'mean_min', 'mean_mean', 'mean_max', 'average_count', 'average_mean'
+        ).get() == {
+            'date': datetime.date(2022, 1, 9),
+            'count': 3,
+            'mean_count': 3,
+            'mean_min': 1.0,
+            'mean_mean': 4.0,
+            'mean_max': 7.0,
+            'average_count': 1,
+            'average_mean': 20.0,
+        }
+
+    def test_should_keep_tag_values_stored_after_day_was_downsampled(self, vessel):
+        tag = TagFactory(vessel=vessel)
+        day = datetime.datetime(2022, 1, 9, tzinfo=pytz.UTC)
+        TagValueFactory(tag=tag, date=day)
+        downsample_vessel_tag_values_day(vessel=vessel, day=day)
+        late_tag_value = TagValueFactory(tag=tag, date=day + datetime.timedelta(hours=1))
+
+        assert delete_downsampled_tag_values(vessel=vessel) == 1
+        assert TagValue.objects.get() == late_tag_value
+
+    def test_should_keep_tag_values_newer_than_last_sync(self, vessel):
+        vessel.tags_synced_at = datetime.datetime(2022, 1, 5, 12, tzinfo=pytz.UTC)
+        tag_value = TagValueFactory(tag__vessel=vessel, date=datetime.datetime(2022, 1, 5, 6, tzinfo=pytz.UTC))
+
+        assert downsample_vessel_tag_values(vessel=vessel) == (0, 0)
+        assert TagValue.objects.get() == tag_value
+
+    def test_should_keep_all_tag_values_without_retention(self, vessel):
+        vessel.tag_values_retention_days = None
+        TagValueFactory(tag__vessel=vessel, date=datetime.datetime(2021, 1, 1, tzinfo=pytz.UTC))
+
+        assert downsample_vessel_tag_values(vessel=vessel) == (0, 0)
+        assert TagValue.objects.count() == 1
+        assert vessel.tag_values_downsampled_until is None
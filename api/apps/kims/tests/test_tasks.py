@@ -11,6 +11,7 @@ from vcr import VCR
 
 from apps.kims.factories import KimsAPIFactory, TagFactory, VesselFactory
 from apps.kims.tasks import (
+    downsample_tag_values_task,
     sync_vessel_tag_value_task,
     sync_vessel_tags_task,
     sync_vessel_tags_values_task,
@@ -297,3 +298,16 @@ class TestSyncedVesselTask:
         assert result.state == states.SUCCESS
 
         mock_sync_overlapping_monitor_functions_task.assert_not_called()
+
+
+@pytest.mark.django_db
+class TestDownsampleTagValuesTask:
+    def test_should_downsample_vessels_with_retention(self, mocker: MockerFixture):
+        mock_downsample = mocker.patch('apps.kims.tasks.downsample_vessel_tag_values_task.delay')
+        vessel = VesselFactory(tag_values_retention_days=30)
+        VesselFactory(tag_values_retention_days=None)
+
+        result = downsample_tag_values_task.apply()
+
+        assert result.state == states.SUCCESS
+        mock_downsample.assert_called_once_with(vessel.pk)
@@ -1,11 +1,29 @@
-from django.contrib import admin
-from django.db import transaction
-from django.shortcuts import render
+from django.contrib import admin, messages
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import models, transaction
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404, render
+from django.urls import path
 
 from apps.monitors.forms import TEST_MONITOR_FUNCTION_ACTION, MonitorFunctionForm, MonitorFunctionTestForm
-from apps.monitors.models import Monitor, MonitorElement, MonitorElementPhase, MonitorFunction, MonitorFunctionValue
+from apps.monitors.models import (
+    Monitor,
+    MonitorElement,
+    MonitorElementPhase,
+    MonitorFunction,
+    MonitorFunctionTestRun,
+    MonitorFunctionValue,
+)
+from apps.monitors.services import (
+    cancel_monitor_function_test_run,
+    create_monitor_function_test_run,
+    get_monitor_function_test_run_progress,
+)
 from apps.monitors.tasks import sync_all_monitor_function_values_task
 
+# number of test run values returned by a single progress request
+TEST_RUN_PROGRESS_PAGE_SIZE = 500
+
 
 class MonitorElementInline(admin.StackedInline):
     model = MonitorElement
@@ -64,6 +82,18 @@ class MonitorFunctionAdmin(admin.ModelAdmin):
     autocomplete_fields = ('vessel',)
     readonly_fields = ('created_at', 'updated_at')
     form = MonitorFunctionForm
+    actions = ['run_test']
+
+    @admin.action(description='Test monitor function over its whole range')
+    def run_test(self, request: WSGIRequest, queryset: models.QuerySet[MonitorFunction]) -> None:
+        for monitor_function in queryset.select_related('vessel'):
+            try:
+                test_run = create_monitor_function_test_run(monitor_function=monitor_function, user=request.user)
+                self.message_user(
+                    request, f"{monitor_function}: test run {test_run.pk} has been started.", messages.SUCCESS
+                )
+            except ValueError as e:
+                self.message_user(request, f"{monitor_function}: {e}", messages.ERROR)
 
     def save_model(self, request, obj, form, change):
         super().save_model(request, obj, form, change)
@@ -77,6 +107,7 @@ class MonitorFunctionAdmin(admin.ModelAdmin):
                 obj.start_date != form.initial.get('start_date'),
                 obj.monitor_function_source != form.initial.get('monitor_function_source'),
                 obj.draft != form.initial.get('draft'),
+                obj.vectorized != form.initial.get('vectorized'),
             ]
         ):
             transaction.on_commit(lambda: sync_all_monitor_function_values_task.delay(obj.pk))
@@ -118,3 +149,54 @@ class MonitorFunctionValueAdmin(admin.ModelAdmin):
         'monitor_function__name',
     )
     list_filter = ('date',)
+
+
+@admin.register(MonitorFunctionTestRun)
+class MonitorFunctionTestRunAdmin(admin.ModelAdmin):
+    list_display = ('id', 'monitor_function', 'status', 'calculated_hours', 'total_hours', 'cpu_time', 'created_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('id', 'monitor_function__name')
+    readonly_fields = (
+        'monitor_function',
+        'monitor_function_source',
+        'vectorized',
+        'start_date',
+        'end_date',
+        'status',
+        'calculated_hours',
+        'total_hours',
+        'cpu_time',
+        'error',
+        'created_by',
+        'created_at',
+        'updated_at',
+    )
+    change_form_template = 'admin/monitors/monitor_function_test_run_change_form.html'
+    actions = ['cancel_test_runs']
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                '<path:object_id>/progress/',
+                self.admin_site.admin_view(self.progress_view),
+                name='monitors_monitorfunctiontestrun_progress',
+            ),
+            *super().get_urls(),
+        ]
+
+    def progress_view(self, request: WSGIRequest, object_id: str) -> JsonResponse:
+        test_run = get_object_or_404(MonitorFunctionTestRun, pk=object_id)
+        try:
+            offset = max(int(request.GET.get('offset', 0)), 0)
+        except ValueError:
+            return JsonResponse({'error': 'Offset must be an integer.'}, status=400)
+
+        return JsonResponse(get_monitor_function_test_run_progress(test_run, offset, TEST_RUN_PROGRESS_PAGE_SIZE))
+
+    @admin.action(description='Cancel test runs')
+    def cancel_test_runs(self, request: WSGIRequest, queryset: models.QuerySet[MonitorFunctionTestRun]) -> None:
+        cancelled = sum(cancel_monitor_function_test_run(test_run) for test_run in queryset)
+        self.message_user(request, f"{cancelled} test runs have been cancelled.", messages.SUCCESS)
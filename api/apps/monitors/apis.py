@@ -1,11 +1,24 @@
-from functools import cached_property
+import datetime
 from typing import cast
 
 from django.db import models
-from django.db.models import Case, F, OuterRef, QuerySet, Subquery, Sum, When, Window
+from django.db.models import (
+    Case,
+    DateTimeField,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    QuerySet,
+    Subquery,
+    Sum,
+    When,
+    Window,
+)
 from django.db.models.functions import Coalesce
+from django.http import StreamingHttpResponse
 from django.utils import timezone
 from django_generate_series.models import generate_series
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
 from rest_framework import filters
 from rest_framework.generics import ListAPIView, get_object_or_404
@@ -15,8 +28,11 @@ from rest_framework.settings import api_settings
 from rest_framework.views import APIView
 from rest_framework_csv.renderers import CSVRenderer
 
+from apps.core.api.serializers import ExportParametersSerializer
+from apps.core.export import EXPORT_CHUNK_SIZE, export_response
 from apps.monitors.choices import MonitorElementDatasetType
-from apps.monitors.models import Monitor, MonitorElement, MonitorElementPhase, MonitorFunctionValue, MonitorQuerySet
+from apps.monitors.mixins import MonitorElementMixin
+from apps.monitors.models import Monitor, MonitorElementPhase, MonitorFunctionValue, MonitorQuerySet
 from apps.monitors.serializers import (
     MonitorDetailsSerializer,
     MonitorElementDatasetListParamsSerializer,
@@ -58,27 +74,18 @@ class MonitorCSVRenderer(CSVRenderer):
     header = ['date', 'baseline', 'target', 'current']
 
 
-class MonitorElementDatasetListApi(TenantMixin, APIView):
+class MonitorElementDatasetListApi(MonitorElementMixin, APIView):
     renderer_classes = (MonitorCSVRenderer, *api_settings.DEFAULT_RENDERER_CLASSES)  # type: ignore
     permission_classes = [IsTenantUser]
-
-    @cached_property
-    def monitor_element(self) -> MonitorElement:
-        monitor_element = get_object_or_404(
-            MonitorElement.objects.filter(
-                monitor__tenant=self.tenant,
-                monitor__draft=False,
-                monitor__pk=self.kwargs['monitor_id'],
-                draft=False,
-            ).select_related('monitor', 'monitor_function'),
-            pk=self.kwargs['element_id'],
-        )
-        return monitor_element
+    use_replica = True
 
     def get_monitor_element_queryset(self) -> models.QuerySet:
         element_values = (
             MonitorFunctionValue.objects.filter(
-                date__date=OuterRef('date'), monitor_function=self.monitor_element.monitor_function
+                monitor_function=self.monitor_element.monitor_function,
+                # a range instead of date__date lets the lookup use the (monitor_function, date) index
+                date__gte=OuterRef('date'),
+                date__lt=ExpressionWrapper(OuterRef('date') + datetime.timedelta(days=1), output_field=DateTimeField()),
             )
             .values('date__date')
             .annotate(total_value=Coalesce(Sum('value'), 0, output_field=models.FloatField()))
@@ -164,3 +171,37 @@ class MonitorElementDatasetListApi(TenantMixin, APIView):
     def finalize_response(self, request: Request, response: Response, *args: str, **kwargs: str) -> Response:
         response['Content-Disposition'] = f"attachment; filename={self.monitor_element.name}.csv"
         return super().finalize_response(request, response, *args, **kwargs)
+
+
+class MonitorElementValuesExportApi(MonitorElementMixin, APIView):
+    permission_classes = [IsTenantUser]
+    use_replica = True
+    export_header = ['date', 'value']
+
+    @extend_schema(
+        parameters=[ExportParametersSerializer],
+        responses={200: OpenApiTypes.BINARY},
+        summary="Export monitor element values",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        export_parameters_serializer = ExportParametersSerializer(data=request.GET)
+        export_parameters_serializer.is_valid(raise_exception=True)
+
+        monitor_function_values = (
+            MonitorFunctionValue.objects.filter(
+                monitor_function=self.monitor_element.monitor_function,
+                date__gte=self.monitor_element.monitor.start_date,
+                date__lte=self.monitor_element.monitor.end_date,
+            )
+            .order_by('date')
+            .values(*self.export_header)
+            .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+        )
+
+        return export_response(
+            rows=monitor_function_values,
+            header=self.export_header,
+            filename=f'{self.monitor_element.name}-values',
+            export_format=export_parameters_serializer.validated_data['file_format'],
+            gzip=export_parameters_serializer.validated_data['gzip'],
+        )
@@ -42,6 +42,7 @@ class MonitorFunctionTestForm(forms.ModelForm):
                 callable_monitor_function=callable_monitor_function,
                 vessel=vessel,
                 hours=3,
+                vectorized=cleaned_data.get("vectorized", False),
             )
 
         return cleaned_data
@@ -51,10 +52,25 @@ class MonitorFunctionTestForm(forms.ModelForm):
         fields = (
             'vessel',
             'monitor_function_source',
+            'vectorized',
         )
 
 
 class MonitorFunctionForm(MonitorFunctionTestForm):
+    def clean(self):
+        cleaned_data = super().clean()
+        vessel = cleaned_data.get("vessel")
+        start_date = cleaned_data.get("start_date")
+        downsampled_until = vessel.tag_values_downsampled_until if vessel else None
+
+        if start_date and downsampled_until and start_date < downsampled_until:
+            self.add_error(
+                "start_date",
+                f"Start date must not be before {downsampled_until.isoformat()}. Older tag values have been downsampled.",
+            )
+
+        return cleaned_data
+
     class Meta:
         model = MonitorFunction
         fields = '__all__'
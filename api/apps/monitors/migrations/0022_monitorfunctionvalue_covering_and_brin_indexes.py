@@ -0,0 +1,54 @@
+# Generated by Django 4.0.2 on 2026-10-19 11:00
+
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+TABLE = 'monitors_monitorfunctionvalue'
+CONSTRAINT = 'unique_monitor_function_value'
+
+
+def swap_unique_constraint(include: str) -> list[str]:
+    """
+    Build the new unique index concurrently and swap it in. Only the swap takes a short ACCESS EXCLUSIVE lock.
+    """
+    return [
+        f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {CONSTRAINT}_new ON {TABLE} (monitor_function_id, date) {include}',
+        f'ALTER TABLE {TABLE} DROP CONSTRAINT {CONSTRAINT}, ADD CONSTRAINT {CONSTRAINT} UNIQUE USING INDEX {CONSTRAINT}_new',
+    ]
+
+
+class Migration(migrations.Migration):
+    # indexes are built concurrently
+    atomic = False
+
+    dependencies = [
+        ('monitors', '0021_monitorfunction_unique_together_monitor_function_vessel_type'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunSQL(
+                    sql=swap_unique_constraint(include='INCLUDE (value)'),
+                    reverse_sql=swap_unique_constraint(include=''),
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveConstraint(
+                    model_name='monitorfunctionvalue',
+                    name=CONSTRAINT,
+                ),
+                migrations.AddConstraint(
+                    model_name='monitorfunctionvalue',
+                    constraint=models.UniqueConstraint(
+                        fields=('monitor_function', 'date'), include=('value',), name=CONSTRAINT
+                    ),
+                ),
+            ],
+        ),
+        AddIndexConcurrently(
+            model_name='monitorfunctionvalue',
+            index=django.contrib.postgres.indexes.BrinIndex(fields=['date'], name='monitor_value_date_brin'),
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 4.0.2 on 2026-10-19 13:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitors', '0022_monitorfunctionvalue_covering_and_brin_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='monitorfunction',
+            name='vectorized',
+            field=models.BooleanField(
+                default=False,
+                help_text='Vectorized functions receive lists of hourly tag values of a whole period '
+                'and return a list with a value for every hour.',
+            ),
+        ),
+    ]
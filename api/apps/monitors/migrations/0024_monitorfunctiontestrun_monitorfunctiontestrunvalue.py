@@ -0,0 +1,89 @@
+# Generated by Django 4.0.2 on 2026-10-19 14:00
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('monitors', '0023_monitorfunction_vectorized'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MonitorFunctionTestRun',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('monitor_function_source', models.TextField(help_text='Tested source of the monitor function')),
+                ('vectorized', models.BooleanField(default=False)),
+                ('start_date', models.DateTimeField()),
+                ('end_date', models.DateTimeField()),
+                (
+                    'status',
+                    models.CharField(
+                        choices=[
+                            ('PENDING', 'Pending'),
+                            ('RUNNING', 'Running'),
+                            ('SUCCEEDED', 'Succeeded'),
+                            ('FAILED', 'Failed'),
+                            ('CANCELLED', 'Cancelled'),
+                        ],
+                        default='PENDING',
+                        max_length=16,
+                    ),
+                ),
+                ('calculated_hours', models.PositiveIntegerField(default=0)),
+                ('total_hours', models.PositiveIntegerField()),
+                ('cpu_time', models.FloatField(default=0, help_text='CPU seconds spent on the test run')),
+                ('error', models.TextField(blank=True)),
+                (
+                    'created_by',
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    'monitor_function',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='test_runs',
+                        to='monitors.monitorfunction',
+                    ),
+                ),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='MonitorFunctionTestRunValue',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateTimeField()),
+                ('value', models.FloatField(null=True)),
+                ('error', models.TextField(blank=True)),
+                (
+                    'test_run',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='values',
+                        to='monitors.monitorfunctiontestrun',
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='monitorfunctiontestrunvalue',
+            constraint=models.UniqueConstraint(
+                fields=('test_run', 'date'), name='unique_monitor_function_test_run_value'
+            ),
+        ),
+    ]
@@ -0,0 +1,21 @@
+from functools import cached_property
+
+from rest_framework.generics import get_object_or_404
+
+from apps.monitors.models import MonitorElement
+from apps.tenants.mixins import TenantMixin
+
+
+class MonitorElementMixin(TenantMixin):
+    @cached_property
+    def monitor_element(self) -> MonitorElement:
+        monitor_element = get_object_or_404(
+            MonitorElement.objects.filter(
+                monitor__tenant=self.tenant,
+                monitor__draft=False,
+                monitor__pk=self.kwargs['monitor_id'],
+                draft=False,
+            ).select_related('monitor', 'monitor_function'),
+            pk=self.kwargs['element_id'],
+        )
+        return monitor_element
@@ -1,3 +1,4 @@
+from django.contrib.postgres.indexes import BrinIndex
 from django.db import models
 from django.db.models import Prefetch, Q
 
@@ -71,6 +72,11 @@ class MonitorFunction(TimestampedModel):
     monitor_function_source = models.TextField(verbose_name="Monitor function")
     vessel = models.ForeignKey('kims.Vessel', on_delete=models.PROTECT)
     start_date = models.DateTimeField(help_text="Calculation start time")
+    vectorized = models.BooleanField(
+        default=False,
+        help_text="Vectorized functions receive lists of hourly tag values of a whole period "
+        "and return a list with a value for every hour.",
+    )
 
     def __str__(self) -> str:
         return f'Monitor function: {self.name}'
@@ -92,8 +98,55 @@ class MonitorFunctionValue(TimestampedModel):
 
     class Meta:
         constraints = [
-            models.UniqueConstraint(fields=["monitor_function", "date"], name="unique_monitor_function_value"),
+            # includes value, so dataset queries are served by index only scans
+            models.UniqueConstraint(
+                fields=["monitor_function", "date"], include=["value"], name="unique_monitor_function_value"
+            ),
             models.CheckConstraint(
                 check=Q(date__minute=0, date__second=0), name="even_monitor_function_value_date_hour"
             ),
         ]
+        indexes = [BrinIndex(fields=["date"], name="monitor_value_date_brin")]
+
+
+class MonitorFunctionTestRun(TimestampedModel):
+    """
+    Background evaluation of a monitor function over its whole range without storing monitor function values.
+    """
+
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        RUNNING = 'RUNNING', 'Running'
+        SUCCEEDED = 'SUCCEEDED', 'Succeeded'
+        FAILED = 'FAILED', 'Failed'
+        CANCELLED = 'CANCELLED', 'Cancelled'
+
+    monitor_function = models.ForeignKey(MonitorFunction, on_delete=models.CASCADE, related_name='test_runs')
+    monitor_function_source = models.TextField(help_text="Tested source of the monitor function")
+    vectorized = models.BooleanField(default=False)
+    start_date = models.DateTimeField()
+    end_date = models.DateTimeField()
+    status = models.CharField(max_length=16, choices=Status.choices, default=Status.PENDING)
+    calculated_hours = models.PositiveIntegerField(default=0)
+    total_hours = models.PositiveIntegerField()
+    cpu_time = models.FloatField(default=0, help_text="CPU seconds spent on the test run")
+    error = models.TextField(blank=True)
+    created_by = models.ForeignKey('tenants.User', on_delete=models.SET_NULL, null=True, blank=True)
+
+    # statuses of test runs that are not finished yet
+    active_statuses = [Status.PENDING, Status.RUNNING]
+
+    def __str__(self) -> str:
+        return f'Monitor function test run: {self.pk}'
+
+
+class MonitorFunctionTestRunValue(models.Model):
+    test_run = models.ForeignKey(MonitorFunctionTestRun, on_delete=models.CASCADE, related_name='values')
+    date = models.DateTimeField()
+    value = models.FloatField(null=True)
+    error = models.TextField(blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["test_run", "date"], name="unique_monitor_function_test_run_value"),
+        ]
@@ -1,21 +1,38 @@
 import datetime
 import itertools
 import logging
+import signal
+import threading
+import time
+from contextlib import contextmanager
 from datetime import timedelta
-from typing import Any, Callable, TypedDict
+from functools import lru_cache
+from types import CodeType
+from typing import Any, Callable, Iterator, TypedDict
 
+from django.conf import settings
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import Q
+from django.db.models import F, Q
 from django.utils import timezone
 from RestrictedPython import compile_restricted
+from RestrictedPython.Guards import guarded_iter_unpack_sequence
 
 from apps.kims.models import Tag, TagValue, Vessel
 from apps.kims.services import cast_tag_value
-from apps.monitors.models import MonitorFunction, MonitorFunctionValue
+from apps.monitors.models import (
+    MonitorFunction,
+    MonitorFunctionTestRun,
+    MonitorFunctionTestRunValue,
+    MonitorFunctionValue,
+)
+from apps.tenants.models import User
 
 CallableMonitorFunction = Callable[[dict], Any]
 
+# number of hours passed to a vectorized monitor function at once
+VECTORIZED_WINDOW_HOURS = 31 * 24
+
 logger = logging.getLogger(__name__)
 
 
@@ -31,26 +48,44 @@ class TagDict(dict):
             raise TagNotFoundException(key)
 
 
+class TagSeries(list):
+    """
+    Hourly values of a tag metric passed to vectorized monitor functions.
+    """
+
+
 class MonitorFunctionTestResult(TypedDict):
     columns: list[str]
     rows: list[list]
 
 
-def _restricted_getitem(tags: TagDict, key: str) -> Any:
-    if not isinstance(tags, TagDict):
+def _restricted_getitem(tags: TagDict | TagSeries, key: Any) -> Any:
+    if not isinstance(tags, (TagDict, TagSeries)):
         raise NameError(f'Unknown "{key}" property used')
 
     return tags[key]
 
 
+@lru_cache(maxsize=settings.MONITOR_FUNCTION_CODE_CACHE_SIZE)
+def compile_monitor_function_code(monitor_function_source: str) -> CodeType:
+    """
+    Compile restricted byte code of a monitor function. The byte code is cached per process, so every
+    worker compiles a monitor function once. Changing the source compiles it again.
+    """
+    return compile_restricted(monitor_function_source, filename='<inline code>', mode='exec')
+
+
 def compile_monitor_function(monitor_function_source: str) -> CallableMonitorFunction:
     logger.info("Compiling monitor function")
 
     try:
         locals_dict = {
             '_getitem_': _restricted_getitem,
+            # loops and comprehensions over tag series of vectorized functions
+            '_getiter_': iter,
+            '_iter_unpack_sequence_': guarded_iter_unpack_sequence,
         }
-        byte_code = compile_restricted(monitor_function_source, filename='<inline code>', mode='exec')
+        byte_code = compile_monitor_function_code(monitor_function_source)
         exec(byte_code, locals_dict)
 
         monitor_function = locals_dict.get('monitor')
@@ -82,12 +117,42 @@ def generate_function_input(tag_names: list[str], tag_values: list[TagValue]) ->
     return function_input
 
 
+def generate_vectorized_function_input(
+    tag_names: list[str], tag_values: list[TagValue], dates: list[datetime.datetime]
+) -> TagDict:
+    date_indexes = {date: index for index, date in enumerate(dates)}
+    function_input = TagDict(
+        {
+            tag_name: TagDict({metric: TagSeries([None] * len(dates)) for metric in TagValue.metrics})
+            for tag_name in tag_names
+        }
+    )
+    for tag_value in tag_values:
+        index = date_indexes[tag_value.date]
+        tag_series = function_input.setdefault(
+            tag_value.name,  # type: ignore
+            TagDict({metric: TagSeries([None] * len(dates)) for metric in TagValue.metrics}),
+        )
+        for metric in TagValue.metrics:
+            tag_series[metric][index] = cast_tag_value(tag_value.data_type, getattr(tag_value, metric))  # type: ignore
+    return function_input
+
+
+def run_vectorized_monitor_function(
+    callable_monitor_function: CallableMonitorFunction, function_input: TagDict, hours: int
+) -> list:
+    values = list(callable_monitor_function(function_input))
+    if len(values) != hours:
+        raise ValueError(f"Vectorized monitor function returned {len(values)} values for {hours} hours.")
+    return values
+
+
 def run_monitor_function_test(
-    *, vessel: Vessel, callable_monitor_function: CallableMonitorFunction, hours: int
+    *, vessel: Vessel, callable_monitor_function: CallableMonitorFunction, hours: int, vectorized: bool = False
 ) -> MonitorFunctionTestResult:
     logger.info(f'Running tests for monitor function for Vessel(pk={vessel.pk}) for last {hours} hours.')
     last_sync_date = timezone.now().replace(minute=0, second=0, microsecond=0) - datetime.timedelta(hours=1)
-    grouped_tag_values = (
+    tag_values = (
         TagValue.objects.filter(
             tag__vessel=vessel,
             date__gte=(last_sync_date - timedelta(hours=hours)),
@@ -105,21 +170,29 @@ def run_monitor_function_test(
     ]
     monitor_function_test_result = MonitorFunctionTestResult(columns=columns, rows=[])
 
-    for date, grouped_tag_values in itertools.groupby(grouped_tag_values, lambda o: o.date):  # type: ignore
-        test_input = generate_function_input(list(unique_tag_names), grouped_tag_values)
+    grouped_inputs = [
+        (date, generate_function_input(list(unique_tag_names), grouped_tag_values))
+        for date, grouped_tag_values in itertools.groupby(tag_values, lambda o: o.date)  # type: ignore
+    ]
 
-        try:
-            result = callable_monitor_function(test_input)
-        except TagNotFoundException as e:
-            logger.info("Monitor function test failed. Tag %s not found.", e)
-            raise ValidationError(
-                {'monitor_function_source': f"Tag {e} not found. Available tags: {', '.join(unique_tag_names)}."}
-            )
+    try:
+        if vectorized:
+            dates = [date for date, _ in grouped_inputs]
+            vectorized_input = generate_vectorized_function_input(list(unique_tag_names), list(tag_values), dates)
+            results = run_vectorized_monitor_function(callable_monitor_function, vectorized_input, len(dates))
+        else:
+            results = [callable_monitor_function(test_input) for _, test_input in grouped_inputs]
+    except TagNotFoundException as e:
+        logger.info("Monitor function test failed. Tag %s not found.", e)
+        raise ValidationError(
+            {'monitor_function_source': f"Tag {e} not found. Available tags: {', '.join(unique_tag_names)}."}
+        )
 
-        except Exception as e:
-            logger.exception("Monitor function test failed. Error %s", e)
-            raise ValidationError({'monitor_function_source': e})
+    except Exception as e:
+        logger.exception("Monitor function test failed. Error %s", e)
+        raise ValidationError({'monitor_function_source': e})
 
+    for (date, test_input), result in zip(grouped_inputs, results):
         row_tag_values = [test_input.get(tag_name, None) for tag_name in unique_tag_names]
         row = [date, result, *row_tag_values]
 
@@ -129,12 +202,19 @@ def run_monitor_function_test(
     return monitor_function_test_result
 
 
-def calculate_monitor_function_value(monitor_function: MonitorFunction, date: datetime.datetime) -> float:
+def calculate_monitor_function_value(
+    monitor_function: MonitorFunction,
+    date: datetime.datetime,
+    callable_monitor_function: CallableMonitorFunction | None = None,
+    tag_names: list[str] | None = None,
+) -> float:
     logger.info(f"Calculating value for MonitorFunction(pk={monitor_function.pk}) for {date}.")
-    callable_monitor_function = compile_monitor_function(monitor_function.monitor_function_source)
+    if callable_monitor_function is None:
+        callable_monitor_function = compile_monitor_function(monitor_function.monitor_function_source)
 
     vessel = monitor_function.vessel
-    unique_tag_names = Tag.objects.filter(vessel=vessel).values_list('name', flat=True)
+    if tag_names is None:
+        tag_names = list(Tag.objects.filter(vessel=vessel).values_list('name', flat=True))
     tag_values = (
         TagValue.objects.filter(
             tag__vessel=vessel,
@@ -144,7 +224,7 @@ def calculate_monitor_function_value(monitor_function: MonitorFunction, date: da
         .with_name()
     )
 
-    monitor_function_input = generate_function_input(list(unique_tag_names), tag_values)
+    monitor_function_input = generate_function_input(tag_names, tag_values)
     logger.info('Monitor function input: %s', monitor_function_input)
 
     try:
@@ -159,6 +239,81 @@ def calculate_monitor_function_value(monitor_function: MonitorFunction, date: da
     return value or 0
 
 
+def calculate_vectorized_monitor_function_values(
+    monitor_function: MonitorFunction,
+    dates: list[datetime.datetime],
+    callable_monitor_function: CallableMonitorFunction,
+    tag_names: list[str],
+) -> list:
+    logger.info(f"Calculating values for MonitorFunction(pk={monitor_function.pk}) from {dates[0]} to {dates[-1]}.")
+    tag_values = (
+        TagValue.objects.filter(
+            tag__vessel=monitor_function.vessel,
+            date__gte=dates[0],
+            date__lte=dates[-1],
+        )
+        .with_data_type()  # type: ignore
+        .with_name()
+    )
+    monitor_function_input = generate_vectorized_function_input(tag_names, list(tag_values), dates)
+
+    try:
+        values = run_vectorized_monitor_function(callable_monitor_function, monitor_function_input, len(dates))
+    except Exception:
+        if len(dates) == 1:
+            logger.exception(
+                f'Unable to calculate function value for MonitorFunction(pk={monitor_function.pk}) for {dates[0]}. '
+                'Returning 0. Input values: %s',
+                monitor_function_input,
+            )
+            return [0]
+
+        # evaluate hour by hour, so only the failing hours are returned as 0 like in the per-hour mode
+        logger.warning(
+            f'Unable to calculate function values for MonitorFunction(pk={monitor_function.pk}) '
+            f'from {dates[0]} to {dates[-1]}. Calculating values hour by hour.',
+            exc_info=True,
+        )
+        return [
+            value
+            for date in dates
+            for value in calculate_vectorized_monitor_function_values(
+                monitor_function, [date], callable_monitor_function, tag_names
+            )
+        ]
+
+    return [value or 0 for value in values]
+
+
+def get_hourly_dates(start_date: datetime.datetime, end_date: datetime.datetime) -> list[datetime.datetime]:
+    return [start_date + timedelta(hours=hour) for hour in range(int((end_date - start_date) / timedelta(hours=1)) + 1)]
+
+
+def calculate_monitor_function_values(
+    monitor_function: MonitorFunction,
+    start_date: datetime.datetime,
+    end_date: datetime.datetime,
+    callable_monitor_function: CallableMonitorFunction,
+    tag_names: list[str],
+) -> Iterator[tuple[datetime.datetime, Any]]:
+    dates = get_hourly_dates(start_date, end_date)
+
+    if not monitor_function.vectorized:
+        for date in dates:
+            yield date, calculate_monitor_function_value(
+                monitor_function, date, callable_monitor_function=callable_monitor_function, tag_names=tag_names
+            )
+        return
+
+    for window_start in range(0, len(dates), VECTORIZED_WINDOW_HOURS):
+        window_end = window_start + VECTORIZED_WINDOW_HOURS
+        window = dates[window_start:window_end]
+        values = calculate_vectorized_monitor_function_values(
+            monitor_function, window, callable_monitor_function, tag_names
+        )
+        yield from zip(window, values)
+
+
 @transaction.atomic
 def sync_monitor_function_values(
     *, monitor_function: MonitorFunction, start_date: datetime.datetime, end_date: datetime.datetime
@@ -172,12 +327,19 @@ def sync_monitor_function_values(
         raise ValueError("Unable to calculate monitor function values. End date must be in the past.")
     if end_date < start_date:
         raise ValueError("Unable to calculate monitor function values. End date must come after start date.")
+    downsampled_until = monitor_function.vessel.tag_values_downsampled_until
+    if downsampled_until and start_date < downsampled_until:
+        raise ValueError(
+            "Unable to calculate monitor function values. "
+            f"Tag values before {downsampled_until.isoformat()} have been downsampled."
+        )
 
-    current_date = start_date
-
-    while current_date <= end_date:
-        value = calculate_monitor_function_value(monitor_function, current_date)
-
+    # compiled and looked up once for the whole period instead of once per hour
+    callable_monitor_function = compile_monitor_function(monitor_function.monitor_function_source)
+    tag_names = list(Tag.objects.filter(vessel=monitor_function.vessel).values_list('name', flat=True))
+    for current_date, value in calculate_monitor_function_values(
+        monitor_function, start_date, end_date, callable_monitor_function, tag_names
+    ):
         try:
             float(value)
         except TypeError:
@@ -199,8 +361,6 @@ def sync_monitor_function_values(
         else:
             logger.info(f"Updated MonitorFunctionValue(pk={monitor_function_value.pk}).")
 
-        current_date += timedelta(hours=1)
-
     logger.info(f"Calculated values for MonitorFunction(pk={monitor_function.pk}) from {start_date} to {end_date}.")
 
 
@@ -218,10 +378,267 @@ def sync_all_monitor_function_values(monitor_function: MonitorFunction) -> bool:
         logger.info(f"Removing MonitorFunctionValue(pk={monitor_function_value.pk}). Out of monitoring time range.")
         monitor_function_value.delete()
 
+    start_date = monitor_function.start_date
+    downsampled_until = monitor_function.vessel.tag_values_downsampled_until
+    if downsampled_until and start_date < downsampled_until:
+        logger.info(
+            f"Tag values before {downsampled_until.isoformat()} have been downsampled. "
+            "Keeping older monitor function values."
+        )
+        start_date = downsampled_until
+
     sync_monitor_function_values(
         monitor_function=monitor_function,
-        start_date=monitor_function.start_date,
+        start_date=start_date,
         end_date=monitor_function.vessel.tags_synced_at - datetime.timedelta(hours=1),
     )
 
     return True
+
+
+class CPUTimeLimitExceeded(BaseException):
+    # not an Exception, so monitor functions catching all exceptions can't swallow it
+    pass
+
+
+# seconds of CPU time between repeated interruptions once the limit has been exceeded
+CPU_TIME_LIMIT_INTERVAL = 0.1
+
+
+@contextmanager
+def cpu_time_limit(seconds: float) -> Iterator[None]:
+    """
+    Interrupt the block once the process spent the given CPU time in it. Signals can only be handled
+    by the main thread, elsewhere the block runs without the interruption.
+    """
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    def handle_timer(signum: int, frame: Any) -> None:
+        raise CPUTimeLimitExceeded()
+
+    previous_handler = signal.signal(signal.SIGPROF, handle_timer)
+    # the timer keeps firing, so code swallowing the interruption is interrupted again
+    signal.setitimer(signal.ITIMER_PROF, seconds, CPU_TIME_LIMIT_INTERVAL)
+    try:
+        yield
+    finally:
+        signal.setitimer(signal.ITIMER_PROF, 0)
+        signal.signal(signal.SIGPROF, previous_handler)
+
+
+@transaction.atomic
+def create_monitor_function_test_run(*, monitor_function: MonitorFunction, user: User | None) -> MonitorFunctionTestRun:
+    from apps.monitors.tasks import run_monitor_function_test_task
+
+    logger.info(f"Creating test run for MonitorFunction(pk={monitor_function.pk}).")
+
+    tags_synced_at = monitor_function.vessel.tags_synced_at
+    if not tags_synced_at:
+        raise ValueError("Unable to test monitor function. Vessel tags have not been synced yet.")
+
+    end_date = tags_synced_at - timedelta(hours=1)
+    if end_date < monitor_function.start_date:
+        raise ValueError("Unable to test monitor function. No tags have been synced since the start date.")
+
+    test_run = MonitorFunctionTestRun.objects.create(
+        monitor_function=monitor_function,
+        monitor_function_source=monitor_function.monitor_function_source,
+        vectorized=monitor_function.vectorized,
+        start_date=monitor_function.start_date,
+        end_date=end_date,
+        total_hours=len(get_hourly_dates(monitor_function.start_date, end_date)),
+        created_by=user,
+    )
+
+    transaction.on_commit(lambda: run_monitor_function_test_task.delay(test_run.pk))
+
+    logger.info(f"MonitorFunctionTestRun(pk={test_run.pk}) has been created.")
+    return test_run
+
+
+def cancel_monitor_function_test_run(test_run: MonitorFunctionTestRun) -> bool:
+    cancelled = MonitorFunctionTestRun.objects.filter(
+        pk=test_run.pk, status__in=MonitorFunctionTestRun.active_statuses
+    ).update(status=MonitorFunctionTestRun.Status.CANCELLED)
+
+    if cancelled:
+        test_run.status = MonitorFunctionTestRun.Status.CANCELLED
+        logger.info(f"MonitorFunctionTestRun(pk={test_run.pk}) has been cancelled.")
+
+    return bool(cancelled)
+
+
+def create_monitor_function_test_run_value(
+    test_run: MonitorFunctionTestRun, date: datetime.datetime, value: Any, error: str
+) -> MonitorFunctionTestRunValue:
+    if value is not None:
+        try:
+            value = float(value)
+        except (TypeError, ValueError, OverflowError):
+            value, error = None, f"Expected number but got {value!r}."
+
+    return MonitorFunctionTestRunValue(test_run=test_run, date=date, value=value, error=error)
+
+
+def evaluate_monitor_function_test_run_page(
+    test_run: MonitorFunctionTestRun,
+    callable_monitor_function: CallableMonitorFunction,
+    tag_names: list[str],
+    dates: list[datetime.datetime],
+) -> list[MonitorFunctionTestRunValue]:
+    tag_values = list(
+        TagValue.objects.filter(
+            tag__vessel=test_run.monitor_function.vessel,
+            date__gte=dates[0],
+            date__lte=dates[-1],
+        )
+        .with_data_type()  # type: ignore
+        .with_name()
+        .order_by('date')
+    )
+    results: list[tuple[Any, str]] = []
+
+    if test_run.vectorized:
+        monitor_function_input = generate_vectorized_function_input(tag_names, tag_values, dates)
+        try:
+            values = run_vectorized_monitor_function(callable_monitor_function, monitor_function_input, len(dates))
+            results = [(value, '') for value in values]
+        except Exception as e:
+            if len(dates) > 1:
+                # evaluate hour by hour to report the failing hours
+                return [
+                    test_run_value
+                    for date in dates
+                    for test_run_value in evaluate_monitor_function_test_run_page(
+                        test_run, callable_monitor_function, tag_names, [date]
+                    )
+                ]
+            results = [(None, repr(e))]
+    else:
+        tag_values_by_date = {
+            date: list(grouped_tag_values)
+            for date, grouped_tag_values in itertools.groupby(tag_values, lambda o: o.date)  # type: ignore
+        }
+        for date in dates:
+            monitor_function_input = generate_function_input(tag_names, tag_values_by_date.get(date, []))
+            try:
+                results.append((callable_monitor_function(monitor_function_input), ''))
+            except Exception as e:
+                results.append((None, repr(e)))
+
+    return [
+        create_monitor_function_test_run_value(test_run, date, value, error)
+        for date, (value, error) in zip(dates, results)
+    ]
+
+
+def save_monitor_function_test_run_page(
+    test_run: MonitorFunctionTestRun, test_run_values: list[MonitorFunctionTestRunValue], cpu_time: float
+) -> bool:
+    """
+    Store values of a page and the progress of the test run. Returns False when the test run has been cancelled.
+    """
+    with transaction.atomic():
+        updated = MonitorFunctionTestRun.objects.filter(
+            pk=test_run.pk, status=MonitorFunctionTestRun.Status.RUNNING
+        ).update(calculated_hours=F('calculated_hours') + len(test_run_values), cpu_time=cpu_time)
+        if not updated:
+            return False
+
+        MonitorFunctionTestRunValue.objects.bulk_create(test_run_values)
+
+    test_run.calculated_hours += len(test_run_values)
+    test_run.cpu_time = cpu_time
+    return True
+
+
+def finish_monitor_function_test_run(
+    test_run: MonitorFunctionTestRun, status: MonitorFunctionTestRun.Status, error: str = ''
+) -> None:
+    finished = MonitorFunctionTestRun.objects.filter(
+        pk=test_run.pk, status=MonitorFunctionTestRun.Status.RUNNING
+    ).update(status=status, error=error)
+
+    if finished:
+        test_run.status = status
+        test_run.error = error
+        logger.info(f"MonitorFunctionTestRun(pk={test_run.pk}) has finished with status {status}.")
+
+
+def execute_monitor_function_test_run(test_run: MonitorFunctionTestRun) -> None:
+    """
+    Evaluate the monitor function of the test run in pages of hours. Values and errors of every page
+    are stored as soon as the page is evaluated, so the progress can be polled. The run stops once
+    it's cancelled or once it spent more than MONITOR_FUNCTION_TEST_RUN_CPU_TIME_LIMIT seconds of CPU time.
+    """
+    logger.info(f"Executing MonitorFunctionTestRun(pk={test_run.pk}).")
+
+    started = MonitorFunctionTestRun.objects.filter(
+        pk=test_run.pk, status=MonitorFunctionTestRun.Status.PENDING
+    ).update(status=MonitorFunctionTestRun.Status.RUNNING)
+    if not started:
+        logger.info(f"MonitorFunctionTestRun(pk={test_run.pk}) is not pending anymore.")
+        return
+    test_run.status = MonitorFunctionTestRun.Status.RUNNING
+
+    try:
+        callable_monitor_function = compile_monitor_function(test_run.monitor_function_source)
+    except ValidationError as e:
+        finish_monitor_function_test_run(test_run, MonitorFunctionTestRun.Status.FAILED, ' '.join(e.messages))
+        return
+
+    tag_names = list(Tag.objects.filter(vessel=test_run.monitor_function.vessel).values_list('name', flat=True))
+    page_hours = settings.MONITOR_FUNCTION_TEST_RUN_PAGE_HOURS
+    cpu_time_limit_seconds = settings.MONITOR_FUNCTION_TEST_RUN_CPU_TIME_LIMIT
+    cpu_start = time.process_time()
+    page_start = test_run.start_date
+
+    try:
+        with cpu_time_limit(cpu_time_limit_seconds):
+            while page_start <= test_run.end_date:
+                page_end = min(page_start + timedelta(hours=page_hours - 1), test_run.end_date)
+                dates = get_hourly_dates(page_start, page_end)
+                test_run_values = evaluate_monitor_function_test_run_page(
+                    test_run, callable_monitor_function, tag_names, dates
+                )
+
+                cpu_time = time.process_time() - cpu_start
+                if not save_monitor_function_test_run_page(test_run, test_run_values, cpu_time):
+                    logger.info(f"MonitorFunctionTestRun(pk={test_run.pk}) has been cancelled.")
+                    return
+                if cpu_time > cpu_time_limit_seconds:
+                    raise CPUTimeLimitExceeded()
+
+                page_start = page_end + timedelta(hours=1)
+    except CPUTimeLimitExceeded:
+        finish_monitor_function_test_run(
+            test_run,
+            MonitorFunctionTestRun.Status.FAILED,
+            f"Test run exceeded the CPU time limit of {cpu_time_limit_seconds} seconds.",
+        )
+        return
+    except Exception as e:
+        logger.exception(f"Unable to execute MonitorFunctionTestRun(pk={test_run.pk}).")
+        finish_monitor_function_test_run(test_run, MonitorFunctionTestRun.Status.FAILED, repr(e))
+        return
+
+    finish_monitor_function_test_run(test_run, MonitorFunctionTestRun.Status.SUCCEEDED)
+
+
+def get_monitor_function_test_run_progress(test_run: MonitorFunctionTestRun, offset: int, limit: int) -> dict:
+    """
+    Return the progress of the test run with a page of its values ordered by date.
+    """
+    end = offset + limit
+    values = MonitorFunctionTestRunValue.objects.filter(test_run=test_run).order_by('date')[offset:end]
+
+    return {
+        'status': test_run.status,
+        'calculated_hours': test_run.calculated_hours,
+        'total_hours': test_run.total_hours,
+        'cpu_time': test_run.cpu_time,
+        'error': test_run.error,
+        'values': [{'date': value.date.isoformat(), 'value': value.value, 'error': value.error} for value in values],
+    }
@@ -2,8 +2,12 @@ import logging
 from datetime import datetime
 
 from apps.app.celery import app
-from apps.monitors.models import MonitorFunction
-from apps.monitors.services import sync_all_monitor_function_values, sync_monitor_function_values
+from apps.monitors.models import MonitorFunction, MonitorFunctionTestRun
+from apps.monitors.services import (
+    execute_monitor_function_test_run,
+    sync_all_monitor_function_values,
+    sync_monitor_function_values,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -81,3 +85,16 @@ def sync_overlapping_monitor_functions_task(vessel_id: int, start: str, end: str
         )
 
         logger.info(f'Scheduled task to sync monitor function values for MonitorFunction(pk={monitor_function.pk})')
+
+
+@app.task
+def run_monitor_function_test_task(test_run_id: int) -> None:
+    logger.info(f"Running MonitorFunctionTestRun(pk={test_run_id}) in the background.")
+
+    try:
+        test_run = MonitorFunctionTestRun.objects.select_related('monitor_function__vessel').get(pk=test_run_id)
+    except MonitorFunctionTestRun.DoesNotExist:
+        logger.exception(f"Unable to run MonitorFunctionTestRun(pk={test_run_id}). Test run does not exist.")
+        return
+
+    execute_monitor_function_test_run(test_run)
@@ -356,3 +356,58 @@ class TestMonitorElementDatasetListApi:
 
         assert response.status_code == 403
         assert response.data == {"detail": 'You do not have permission to perform this action.'}
+
+
+@pytest.mark.django_db
+class TestMonitorElementValuesExportApi:
+    def test_should_export_monitor_element_values(self):
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        tenant_user = TenantUserRelationFactory()
+        monitor = MonitorFactory(
+            tenant=tenant_user.tenant, start_date=now - timedelta(days=1), end_date=now + timedelta(days=1)
+        )
+        monitor_element = MonitorElementFactory(monitor=monitor)
+        first_value = MonitorFunctionValueFactory(
+            monitor_function=monitor_element.monitor_function, date=now - timedelta(hours=1), value=1.5
+        )
+        second_value = MonitorFunctionValueFactory(
+            monitor_function=monitor_element.monitor_function, date=now, value=2.5
+        )
+        MonitorFunctionValueFactory(monitor_function=monitor_element.monitor_function, date=now - timedelta(days=2))
+        MonitorFunctionValueFactory(date=now)
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+        url = reverse(
+            'monitors:monitor_element_values_export',
+            kwargs={"tenant_id": tenant_user.tenant_id, "monitor_id": monitor.pk, "element_id": monitor_element.pk},
+        )
+
+        response = api_client.get(url, {'file_format': 'csv'})
+
+        assert response.status_code == 200
+        assert response['Content-Disposition'] == f'attachment; filename={monitor_element.name}-values.csv'
+        assert b''.join(response.streaming_content).decode().splitlines() == [
+            'date,value',
+            f'{first_value.date},1.5',
+            f'{second_value.date},2.5',
+        ]
+
+    def test_should_be_not_found_for_draft_monitor_element(self):
+        tenant_user = TenantUserRelationFactory()
+        monitor_element = MonitorElementFactory(monitor__tenant=tenant_user.tenant, draft=True)
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+        url = reverse(
+            'monitors:monitor_element_values_export',
+            kwargs={
+                "tenant_id": tenant_user.tenant_id,
+                "monitor_id": monitor_element.monitor_id,
+                "element_id": monitor_element.pk,
+            },
+        )
+
+        response = api_client.get(url)
+
+        assert response.status_code == 404
@@ -0,0 +1,32 @@
+from datetime import timedelta
+
+import pytest
+from django.utils import timezone
+
+from apps.kims.factories import VesselFactory
+from apps.monitors.factories import MONITOR_FUNCTION_SOURCE
+from apps.monitors.forms import MonitorFunctionForm
+
+
+@pytest.mark.django_db
+class TestMonitorFunctionForm:
+    @pytest.mark.parametrize('start_days_ago,is_valid', ((10, False), (3, True)))
+    def test_should_validate_start_date_of_downsampled_vessel(self, start_days_ago: int, is_valid: bool):
+        now = timezone.now().replace(minute=0, second=0, microsecond=0)
+        vessel = VesselFactory(tag_values_downsampled_until=now - timedelta(days=5))
+        start_date = now - timedelta(days=start_days_ago)
+
+        form = MonitorFunctionForm(
+            data={
+                'name': 'Monitor function',
+                'draft': False,
+                'type': '',
+                'monitor_function_source': MONITOR_FUNCTION_SOURCE,
+                'vessel': vessel.pk,
+                'start_date': start_date.strftime('%Y-%m-%d %H:%M:%S'),
+                'vectorized': False,
+            }
+        )
+
+        assert form.is_valid() is is_valid
+        assert bool(form.errors.get('start_date')) is not is_valid
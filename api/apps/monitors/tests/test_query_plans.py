@@ -0,0 +1,87 @@
+import datetime
+from typing import Any, Callable
+
+import pytest
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from apps.kims.factories import TagFactory, VesselFactory
+from apps.kims.models import TagValue
+from apps.monitors.apis import MonitorElementDatasetListApi
+from apps.monitors.factories import MonitorElementFactory, MonitorFunctionFactory
+from apps.monitors.models import MonitorFunction, MonitorFunctionType, MonitorFunctionValue
+from apps.wells.services.api import get_well_planner_measurement_daily_dataset
+
+DAYS = 30
+
+ExplainTableScans = Callable[[QuerySet, str], list[dict[str, Any]]]
+
+
+def create_monitor_function_values(monitor_function: MonitorFunction, start: datetime.datetime) -> None:
+    MonitorFunctionValue.objects.bulk_create(
+        MonitorFunctionValue(monitor_function=monitor_function, date=start + datetime.timedelta(hours=hour), value=1)
+        for hour in range(DAYS * 24)
+    )
+
+
+def assert_date_range_index_scans(scans: list[dict[str, Any]]) -> None:
+    assert scans
+    for scan in scans:
+        assert scan['Node Type'] in ('Index Scan', 'Index Only Scan', 'Bitmap Heap Scan')
+        assert 'date' in scan.get('Index Cond', scan.get('Recheck Cond', ''))
+
+
+@pytest.mark.django_db
+class TestQueryPlans:
+    @pytest.fixture
+    def start(self) -> datetime.datetime:
+        return timezone.now().replace(hour=0, minute=0, second=0, microsecond=0) - datetime.timedelta(days=DAYS)
+
+    def test_monitor_element_dataset_should_use_index(
+        self, start: datetime.datetime, explain_table_scans: ExplainTableScans
+    ):
+        monitor_element = MonitorElementFactory(
+            monitor__start_date=start, monitor__end_date=start + datetime.timedelta(days=DAYS)
+        )
+        create_monitor_function_values(monitor_element.monitor_function, start)
+        create_monitor_function_values(MonitorFunctionFactory(), start)
+        view = MonitorElementDatasetListApi()
+        view.monitor_element = monitor_element
+
+        scans = explain_table_scans(view.get_daily_results(), MonitorFunctionValue._meta.db_table)
+
+        assert_date_range_index_scans(scans)
+
+    def test_well_planner_measurement_daily_dataset_should_use_index(
+        self, start: datetime.datetime, explain_table_scans: ExplainTableScans
+    ):
+        monitor_function = MonitorFunctionFactory(type=MonitorFunctionType.CO2_EMISSION)
+        create_monitor_function_values(monitor_function, start)
+        create_monitor_function_values(MonitorFunctionFactory(), start)
+
+        queryset = get_well_planner_measurement_daily_dataset(
+            plan_start_date=start,
+            plan_end_date=start + datetime.timedelta(days=DAYS - 1),
+            monitor_function_type=MonitorFunctionType.CO2_EMISSION,
+            vessel_id=monitor_function.vessel_id,
+        )
+        scans = explain_table_scans(queryset, MonitorFunctionValue._meta.db_table)
+
+        assert_date_range_index_scans(scans)
+        assert len(list(queryset)) == DAYS
+
+    def test_tag_value_range_should_use_index(self, start: datetime.datetime, explain_table_scans: ExplainTableScans):
+        vessel = VesselFactory()
+        tags = TagFactory.create_batch(5, vessel=vessel)
+        TagValue.objects.bulk_create(
+            TagValue(tag=tag, date=start + datetime.timedelta(hours=hour), mean='1', average='2')
+            for tag in [*tags, TagFactory()]
+            for hour in range(DAYS * 24)
+        )
+
+        queryset = TagValue.objects.filter(
+            tag__in=tags, date__gte=start, date__lt=start + datetime.timedelta(days=1)
+        ).values_list('tag', 'date', 'mean', 'average')
+        scans = explain_table_scans(queryset, TagValue._meta.db_table)
+
+        assert_date_range_index_scans(scans)
@@ -1,19 +1,30 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import pytest
 from django.core.exceptions import ValidationError
+from django.db import DatabaseError
 from django.utils import timezone
+from pytest_mock import MockerFixture
 
 from apps.kims.factories import TagFactory, TagValueFactory, VesselFactory
 from apps.kims.models import Vessel
+from apps.monitors import services
 from apps.monitors.factories import MonitorFunctionFactory, MonitorFunctionValueFactory
-from apps.monitors.models import MonitorFunctionValue
+from apps.monitors.models import MonitorFunctionTestRun, MonitorFunctionValue
 from apps.monitors.services import (
     MonitorFunctionTestResult,
     TagDict,
     TagNotFoundException,
+    TagSeries,
     _restricted_getitem,
+    calculate_monitor_function_values,
+    cancel_monitor_function_test_run,
     compile_monitor_function,
+    compile_monitor_function_code,
+    create_monitor_function_test_run,
+    execute_monitor_function_test_run,
+    get_monitor_function_test_run_progress,
     run_monitor_function_test,
     sync_all_monitor_function_values,
     sync_monitor_function_values,
@@ -32,6 +43,19 @@ def monitor(tags):
     return tags['tag-1']['mean']
 """
 
+VECTORIZED_RETURN_TAG_1_FUNCTION = """
+def monitor(tags):
+    return tags['tag-1']['mean']
+"""
+
+VECTORIZED_VALID_FUNCTION = """
+def monitor(tags):
+    return [
+        0 if mean_1 is None or mean_2 is None else (mean_1 + mean_2) * 2
+        for mean_1, mean_2 in zip(tags['tag-1']['mean'], tags['tag-2']['mean'])
+    ]
+"""
+
 INVALID_FUNCTION_TAG_NOT_FOUND = """
 def monitor(tags):
     return tags['non-existing-tag']['mean']
@@ -81,6 +105,9 @@ class TestRestrictedGetItem:
 
         assert value == 1000.0
 
+    def test_should_get_item_from_tag_series(self):
+        assert _restricted_getitem(TagSeries([1.0, 2.0]), 1) == 2.0
+
     @pytest.mark.parametrize('obj', ({'some-tag': 1000.0}, []))
     def test_should_raise_name_error_for_others(self, obj: dict | list):
         with pytest.raises(NameError, match='Unknown "some-tag" property used'):
@@ -119,6 +146,43 @@ class TestCompileMonitorFunction:
         assert ex.value.messages == ["'monitor' function not found. Make sure to define a function called 'monitor'."]
 
 
+@pytest.fixture
+def empty_monitor_function_code_cache():
+    compile_monitor_function_code.cache_clear()
+    yield
+    compile_monitor_function_code.cache_clear()
+
+
+@pytest.mark.usefixtures('empty_monitor_function_code_cache')
+class TestCompileMonitorFunctionCode:
+    def test_should_compile_source_once(self, mocker: MockerFixture):
+        compile_restricted_spy = mocker.spy(services, 'compile_restricted')
+
+        compile_monitor_function(RETURN_TAG_1_FUNCTION)
+        compile_monitor_function(RETURN_TAG_1_FUNCTION)
+
+        assert compile_restricted_spy.call_count == 1
+        cache_info = compile_monitor_function_code.cache_info()
+        assert (cache_info.hits, cache_info.misses) == (1, 1)
+
+    def test_should_invalidate_edited_source(self):
+        tag_dict = TagDict({'tag-1': TagDict(mean=1000.0)})
+
+        assert compile_monitor_function(RETURN_TAG_1_FUNCTION)(tag_dict) == 1000.0
+
+        edited_function = compile_monitor_function(RETURN_TAG_1_FUNCTION.replace("['mean']", "['mean'] * 2"))
+
+        assert edited_function(tag_dict) == 2000.0
+        assert compile_monitor_function_code.cache_info().misses == 2
+
+    def test_should_compile_from_concurrent_threads(self):
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            byte_codes = list(executor.map(compile_monitor_function_code, [VALID_FUNCTION, RETURN_TAG_1_FUNCTION] * 50))
+
+        assert byte_codes[::2] == [compile_monitor_function_code(VALID_FUNCTION)] * 50
+        assert byte_codes[1::2] == [compile_monitor_function_code(RETURN_TAG_1_FUNCTION)] * 50
+
+
 @pytest.mark.django_db
 class TestRunMonitorFunctionTest:
     @pytest.fixture
@@ -155,6 +219,19 @@ class TestRunMonitorFunctionTest:
             == expected_result
         )
 
+    def test_should_run_vectorized_monitor_function_test(self, vessel: Vessel, last_sync: datetime):
+        monitor_function = compile_monitor_function(VECTORIZED_VALID_FUNCTION)
+
+        result = run_monitor_function_test(
+            callable_monitor_function=monitor_function, vessel=vessel, hours=3, vectorized=True
+        )
+
+        assert [row[:2] for row in result['rows']] == [
+            [last_sync, 6.0],
+            [last_sync - timedelta(hours=2), 0],
+            [last_sync - timedelta(hours=3), 66.0],
+        ]
+
     def test_should_raise_validation_error_for_any_exception(self, vessel: Vessel):
         callable_monitor_function = compile_monitor_function(INVALID_FUNCTION_RAISE_EXCEPTION)
 
@@ -305,6 +382,118 @@ class TestSyncMonitorFunctionValues:
                 end_date=end_date,
             )
 
+    def test_should_compile_monitor_function_once_per_backfill(
+        self, vessel: Vessel, last_sync: datetime, mocker: MockerFixture, empty_monitor_function_code_cache
+    ):
+        compile_restricted_spy = mocker.spy(services, 'compile_restricted')
+        monitor_function = MonitorFunctionFactory(
+            monitor_function_source=RETURN_TAG_1_FUNCTION, start_date=last_sync - timedelta(hours=4), vessel=vessel
+        )
+
+        sync_monitor_function_values(
+            monitor_function=monitor_function, start_date=last_sync - timedelta(hours=4), end_date=last_sync
+        )
+        sync_monitor_function_values(
+            monitor_function=monitor_function, start_date=last_sync - timedelta(hours=4), end_date=last_sync
+        )
+
+        assert MonitorFunctionValue.objects.filter(monitor_function=monitor_function).count() == 5
+        assert compile_restricted_spy.call_count == 1
+
+    def test_should_calculate_same_values_in_vectorized_mode(self, vessel: Vessel, last_sync: datetime):
+        TagValueFactory(tag__vessel=vessel, tag__name='tag-2', date=last_sync - timedelta(hours=3), mean='2.0')
+        start_date = last_sync - timedelta(hours=5)
+        tag_names = ['tag-1', 'tag-2']
+        per_hour_function = MonitorFunctionFactory(
+            monitor_function_source=VALID_FUNCTION, start_date=start_date, vessel=vessel
+        )
+        vectorized_function = MonitorFunctionFactory(
+            monitor_function_source=VECTORIZED_VALID_FUNCTION, start_date=start_date, vessel=vessel, vectorized=True
+        )
+
+        per_hour_values = list(
+            calculate_monitor_function_values(
+                per_hour_function, start_date, last_sync, compile_monitor_function(VALID_FUNCTION), tag_names
+            )
+        )
+        vectorized_values = list(
+            calculate_monitor_function_values(
+                vectorized_function,
+                start_date,
+                last_sync,
+                compile_monitor_function(VECTORIZED_VALID_FUNCTION),
+                tag_names,
+            )
+        )
+
+        assert per_hour_values == [
+            (start_date, 0),
+            (last_sync - timedelta(hours=4), 0),
+            (last_sync - timedelta(hours=3), 226.0),
+            (last_sync - timedelta(hours=2), 0),
+            (last_sync - timedelta(hours=1), 0),
+            (last_sync, 0),
+        ]
+        assert vectorized_values == per_hour_values
+
+    def test_should_calculate_vectorized_values_in_windows(
+        self, vessel: Vessel, last_sync: datetime, mocker: MockerFixture
+    ):
+        mocker.patch.object(services, 'VECTORIZED_WINDOW_HOURS', 2)
+        monitor_function = MonitorFunctionFactory(
+            monitor_function_source=VECTORIZED_RETURN_TAG_1_FUNCTION,
+            start_date=last_sync - timedelta(hours=4),
+            vessel=vessel,
+            vectorized=True,
+        )
+
+        sync_monitor_function_values(
+            monitor_function=monitor_function, start_date=last_sync - timedelta(hours=4), end_date=last_sync
+        )
+
+        assert list(
+            MonitorFunctionValue.objects.filter(monitor_function=monitor_function)
+            .order_by('date')
+            .values_list('value', flat=True)
+        ) == [1111.0, 111.0, 11.0, 0, 1.0]
+
+    def test_should_fall_back_to_hourly_values_when_vectorized_function_fails(
+        self, vessel: Vessel, last_sync: datetime
+    ):
+        monitor_function = MonitorFunctionFactory(
+            monitor_function_source="""
+def monitor(tags):
+    return [1 / mean for mean in tags['tag-1']['mean']]
+""",
+            start_date=last_sync - timedelta(hours=3),
+            vessel=vessel,
+            vectorized=True,
+        )
+
+        sync_monitor_function_values(
+            monitor_function=monitor_function, start_date=last_sync - timedelta(hours=3), end_date=last_sync
+        )
+
+        assert list(
+            MonitorFunctionValue.objects.filter(monitor_function=monitor_function)
+            .order_by('date')
+            .values_list('value', flat=True)
+        ) == [1 / 111.0, 1 / 11.0, 0, 1.0]
+
+    def test_should_raise_value_error_for_downsampled_period(self, vessel: Vessel, last_sync: datetime):
+        vessel.tag_values_downsampled_until = last_sync - timedelta(hours=2)
+        vessel.save()
+        monitor_function = MonitorFunctionFactory(
+            monitor_function_source=RETURN_TAG_1_FUNCTION, start_date=last_sync - timedelta(hours=4), vessel=vessel
+        )
+
+        with pytest.raises(ValueError, match='have been downsampled'):
+            sync_monitor_function_values(
+                monitor_function=monitor_function, start_date=last_sync - timedelta(hours=3), end_date=last_sync
+            )
+
+        assert not MonitorFunctionValue.objects.filter(monitor_function=monitor_function).exists()
+
 
 @pytest.mark.django_db
 class TestSyncAllMonitorFunctionValues:
@@ -330,7 +519,222 @@ class TestSyncAllMonitorFunctionValues:
         assert monitor_function_value_2.value == 0
         assert monitor_function_value_2.date == last_sync
 
+    def test_should_keep_values_of_downsampled_period(self, last_sync: datetime):
+        monitor_function = MonitorFunctionFactory(
+            start_date=last_sync - timedelta(hours=3),
+            vessel__tags_synced_at=last_sync + timedelta(hours=1),
+            vessel__tag_values_downsampled_until=last_sync - timedelta(hours=1),
+        )
+        MonitorFunctionValueFactory(monitor_function=monitor_function, date=last_sync - timedelta(hours=2), value=999)
+
+        assert sync_all_monitor_function_values(monitor_function)
+
+        assert list(
+            MonitorFunctionValue.objects.filter(monitor_function=monitor_function)
+            .order_by('date')
+            .values_list('date', 'value')
+        ) == [
+            (last_sync - timedelta(hours=2), 999),
+            (last_sync - timedelta(hours=1), 0),
+            (last_sync, 0),
+        ]
+
     def test_should_not_calculate_if_no_tags(self, last_sync: datetime):
         monitor_function = MonitorFunctionFactory(start_date=last_sync, vessel__tags_synced_at=None)
 
         assert sync_all_monitor_function_values(monitor_function) is False
+
+
+@pytest.mark.django_db
+class TestMonitorFunctionTestRun:
+    @pytest.fixture
+    def vessel(self, last_sync: datetime) -> Vessel:
+        vessel = VesselFactory(tags_synced_at=last_sync + timedelta(hours=1))
+        tag = TagFactory(name='tag-1', vessel=vessel)
+        TagValueFactory(tag=tag, date=last_sync - timedelta(hours=4), mean='4.0')
+        TagValueFactory(tag=tag, date=last_sync - timedelta(hours=3), mean='3.0')
+        TagValueFactory(tag=tag, date=last_sync - timedelta(hours=1), mean='1.0')
+        TagValueFactory(tag=tag, date=last_sync, mean='0.0')
+        return vessel
+
+    @pytest.fixture(autouse=True)
+    def page_hours(self, settings):
+        settings.MONITOR_FUNCTION_TEST_RUN_PAGE_HOURS = 2
+
+    def create_test_run(
+        self, vessel: Vessel, last_sync: datetime, monitor_function_source: str, vectorized: bool = False
+    ) -> MonitorFunctionTestRun:
+        monitor_function = MonitorFunctionFactory(
+            vessel=vessel,
+            start_date=last_sync - timedelta(hours=4),
+            monitor_function_source=monitor_function_source,
+            vectorized=vectorized,
+        )
+        return create_monitor_function_test_run(monitor_function=monitor_function, user=None)
+
+    def test_should_start_test_run_in_background(
+        self, vessel: Vessel, last_sync: datetime, mocker: MockerFixture, django_capture_on_commit_callbacks
+    ):
+        mock_task = mocker.patch('apps.monitors.tasks.run_monitor_function_test_task.delay')
+
+        with django_capture_on_commit_callbacks(execute=True):
+            test_run = self.create_test_run(vessel, last_sync, RETURN_TAG_1_FUNCTION)
+
+        assert test_run.status == MonitorFunctionTestRun.Status.PENDING
+        assert (test_run.start_date, test_run.end_date, test_run.total_hours) == (
+            last_sync - timedelta(hours=4),
+            last_sync,
+            5,
+        )
+        mock_task.assert_called_once_with(test_run.pk)
+
+    def test_should_not_test_unsynced_vessel(self):
+        monitor_function = MonitorFunctionFactory(vessel__tags_synced_at=None)
+
+        with pytest.raises(ValueError, match='Vessel tags have not been synced yet.'):
+            create_monitor_function_test_run(monitor_function=monitor_function, user=None)
+
+    @pytest.mark.parametrize(
+        'monitor_function_source,vectorized',
+        (
+            (
+                """
+def monitor(tags):
+    return 12 / tags['tag-1']['mean']
+""",
+                False,
+            ),
+            (
+                """
+def monitor(tags):
+    return [12 / mean for mean in tags['tag-1']['mean']]
+""",
+                True,
+            ),
+        ),
+    )
+    def test_should_store_values_and_errors_in_pages(
+        self, vessel: Vessel, last_sync: datetime, monitor_function_source: str, vectorized: bool
+    ):
+        test_run = self.create_test_run(vessel, last_sync, monitor_function_source, vectorized)
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.SUCCEEDED
+        assert test_run.calculated_hours == 5
+        progress = get_monitor_function_test_run_progress(test_run, offset=1, limit=3)
+        assert [(value['value'], value['error'][:9]) for value in progress['values']] == [
+            (4.0, ''),
+            (None, 'TypeError'),
+            (12.0, ''),
+        ]
+        assert test_run.values.get(date=last_sync).error.startswith('ZeroDivisionError')
+
+    def test_should_fail_invalid_monitor_function(self, vessel: Vessel, last_sync: datetime):
+        test_run = self.create_test_run(vessel, last_sync, INVALID_FUNCTION_NAME)
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.FAILED
+        assert test_run.error == "'monitor' function not found. Make sure to define a function called 'monitor'."
+
+    def test_should_stop_cancelled_test_run(self, vessel: Vessel, last_sync: datetime, mocker: MockerFixture):
+        test_run = self.create_test_run(vessel, last_sync, RETURN_TAG_1_FUNCTION)
+        evaluate_page = services.evaluate_monitor_function_test_run_page
+
+        def evaluate_and_cancel(*args):
+            values = evaluate_page(*args)
+            cancel_monitor_function_test_run(test_run)
+            return values
+
+        mocker.patch.object(services, 'evaluate_monitor_function_test_run_page', side_effect=evaluate_and_cancel)
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.CANCELLED
+        assert test_run.calculated_hours == 0
+        assert test_run.values.count() == 0
+
+    def test_should_not_execute_cancelled_test_run(self, vessel: Vessel, last_sync: datetime):
+        test_run = self.create_test_run(vessel, last_sync, RETURN_TAG_1_FUNCTION)
+        cancel_monitor_function_test_run(test_run)
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.CANCELLED
+        assert test_run.values.count() == 0
+
+    def test_should_store_error_of_overflowing_value(self, vessel: Vessel, last_sync: datetime):
+        test_run = self.create_test_run(
+            vessel,
+            last_sync,
+            """
+def monitor(tags):
+    return 10 ** 400
+""",
+        )
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.SUCCEEDED
+        assert test_run.values.count() == 5
+        assert all(value.value is None and value.error.startswith('Expected number') for value in test_run.values.all())
+
+    def test_should_fail_test_run_on_unexpected_error(self, vessel: Vessel, last_sync: datetime, mocker: MockerFixture):
+        test_run = self.create_test_run(vessel, last_sync, RETURN_TAG_1_FUNCTION)
+        mocker.patch.object(
+            services, 'save_monitor_function_test_run_page', side_effect=DatabaseError('Connection lost')
+        )
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.FAILED
+        assert test_run.error == "DatabaseError('Connection lost')"
+
+    def test_should_fail_test_run_exceeding_cpu_time_limit(self, vessel: Vessel, last_sync: datetime, settings):
+        settings.MONITOR_FUNCTION_TEST_RUN_CPU_TIME_LIMIT = 1
+        test_run = self.create_test_run(
+            vessel,
+            last_sync,
+            """
+def monitor(tags):
+    while True:
+        try:
+            pass
+        except Exception:
+            pass
+""",
+        )
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.FAILED
+        assert test_run.error == 'Test run exceeded the CPU time limit of 1 seconds.'
+
+    def test_should_fail_test_run_swallowing_cpu_time_limit(self, vessel: Vessel, last_sync: datetime, settings):
+        settings.MONITOR_FUNCTION_TEST_RUN_CPU_TIME_LIMIT = 1
+        test_run = self.create_test_run(
+            vessel,
+            last_sync,
+            """
+def monitor(tags):
+    while True:
+        try:
+            sum(range(1000))
+        except:
+            pass
+""",
+        )
+
+        execute_monitor_function_test_run(test_run)
+
+        test_run.refresh_from_db()
+        assert test_run.status == MonitorFunctionTestRun.Status.FAILED
+        assert test_run.error == 'Test run exceeded the CPU time limit of 1 seconds.'
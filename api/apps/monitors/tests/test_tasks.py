@@ -10,7 +10,9 @@ from pytest_mock import MockerFixture
 from apps.kims.factories import VesselFactory
 from apps.kims.models import Vessel
 from apps.monitors.factories import MonitorFunctionFactory
+from apps.monitors.models import MonitorFunctionTestRun
 from apps.monitors.tasks import (
+    run_monitor_function_test_task,
     sync_all_monitor_function_values_task,
     sync_monitor_function_values_task,
     sync_overlapping_monitor_functions_task,
@@ -130,3 +132,22 @@ class TestSyncOverlappingMonitorFunctionsTask:
             ),
             call(monitor_function_3.pk, monitor_function_3.start_date.isoformat(), end.isoformat()),
         ]
+
+
+@pytest.mark.django_db
+class TestRunMonitorFunctionTestTask:
+    def test_should_execute_test_run(self, mocker: MockerFixture):
+        mock_execute = mocker.patch("apps.monitors.tasks.execute_monitor_function_test_run")
+        monitor_function = MonitorFunctionFactory(vessel__tags_synced_at=timezone.now())
+        test_run = MonitorFunctionTestRun.objects.create(
+            monitor_function=monitor_function,
+            monitor_function_source=monitor_function.monitor_function_source,
+            start_date=monitor_function.start_date,
+            end_date=monitor_function.start_date,
+            total_hours=1,
+        )
+
+        result = run_monitor_function_test_task.apply(args=(test_run.pk,))
+
+        assert result.state == states.SUCCESS
+        mock_execute.assert_called_once_with(test_run)
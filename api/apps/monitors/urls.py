@@ -12,4 +12,9 @@ urlpatterns = [
         apis.MonitorElementDatasetListApi.as_view(),
         name='monitor_element_dataset_list',
     ),
+    path(
+        'monitors/<int:monitor_id>/elements/<int:element_id>/values/export/',
+        apis.MonitorElementValuesExportApi.as_view(),
+        name='monitor_element_values_export',
+    ),
 ]
@@ -1,5 +1,6 @@
 from typing import cast
 
+from django.conf import settings
 from django.db import models
 from drf_spectacular.utils import extend_schema
 from rest_framework.generics import ListAPIView, get_object_or_404
@@ -7,10 +8,20 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from apps.core.routers import use_primary
 from apps.notifications.models import Notification
-from apps.notifications.serializers import NotificationListSerializer, UnreadNotificationsSerializer
-from apps.notifications.services import read_notification, read_notifications
-from apps.tenants.mixins import TenantMixin
+from apps.notifications.serializers import (
+    NotificationListSerializer,
+    NotificationPollSerializer,
+    UnreadNotificationsSerializer,
+)
+from apps.notifications.services import (
+    get_unread_notification_count,
+    read_notification,
+    read_notifications,
+    wait_for_notifications,
+)
+from apps.tenants.mixins import TenantMixin, TenantUserMixin
 from apps.tenants.models import User
 from apps.tenants.permissions import IsTenantUser
 
@@ -49,14 +60,38 @@ class UnreadNotificationsApi(TenantMixin, APIView):
         responses={200: UnreadNotificationsSerializer},
     )
     def get(self, request: Request, *args: str, **kwargs: str) -> Response:
-        count = Notification.objects.filter(
-            tenant_user__tenant=self.tenant,
-            tenant_user__user=cast(User, self.request.user),
-            read=False,
-        ).count()
+        count = get_unread_notification_count(user=cast(User, self.request.user), tenant=self.tenant)
         return Response(UnreadNotificationsSerializer(dict(count=count)).data)
 
 
+class NotificationPollApi(TenantUserMixin, APIView):
+    permission_classes = [IsTenantUser]
+
+    @extend_schema(
+        summary="Wait for new notifications",
+        description="Return notifications newer than last_id. "
+        "If there are none, the request is held until a notification arrives or the poll timeout expires.",
+        parameters=[NotificationPollSerializer],
+        responses={200: NotificationListSerializer(many=True)},
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> Response:
+        query_serializer = NotificationPollSerializer(data=request.GET)
+        query_serializer.is_valid(raise_exception=True)
+        # notifications announced by pub/sub may not be replicated yet
+        use_primary()
+
+        notifications = Notification.objects.filter(
+            tenant_user=self.tenant_user, pk__gt=query_serializer.validated_data['last_id']
+        ).order_by('-created_at')
+
+        wait_for_notifications(
+            tenant_user_id=self.tenant_user.pk,
+            timeout=settings.NOTIFICATIONS_POLL_TIMEOUT,
+            has_notifications=notifications.exists,
+        )
+        return Response(NotificationListSerializer(notifications, many=True).data)
+
+
 class ReadNotificationApi(TenantMixin, APIView):
     permission_classes = [IsTenantUser]
 
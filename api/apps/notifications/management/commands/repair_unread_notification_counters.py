@@ -0,0 +1,13 @@
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from apps.notifications.services import repair_unread_notification_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute unread notification counters from notifications'
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        repaired = repair_unread_notification_counters()
+        self.stdout.write(f'Repaired {repaired} unread notification counters')
@@ -0,0 +1,52 @@
+# Generated by Django 4.0.2 on 2026-10-19 10:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def populate_unread_notification_counters(apps, *args):
+    NotificationModel = apps.get_model('notifications', 'Notification')
+    UnreadNotificationCounterModel = apps.get_model('notifications', 'UnreadNotificationCounter')
+
+    unread_counts = (
+        NotificationModel.objects.filter(read=False)
+        .order_by()
+        .values('tenant_user')
+        .annotate(count=Count('pk'))
+        .values_list('tenant_user', 'count')
+    )
+    UnreadNotificationCounterModel.objects.bulk_create(
+        [
+            UnreadNotificationCounterModel(tenant_user_id=tenant_user_id, count=count)
+            for tenant_user_id, count in unread_counts
+        ]
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tenants', '0009_alter_user_options_user_company_user_role_and_more'),
+        ('notifications', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadNotificationCounter',
+            fields=[
+                (
+                    'tenant_user',
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name='unread_notification_counter',
+                        serialize=False,
+                        to='tenants.tenantuserrelation',
+                    ),
+                ),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(populate_unread_notification_counters, migrations.RunPython.noop),
+    ]
@@ -9,5 +9,25 @@ class Notification(TimestampedModel):
     url = models.CharField(max_length=255)
     read = models.BooleanField(default=False)
 
+    # read value stored in the database before saving, set by the pre_save signal
+    _stored_read: bool | None
+
     def __str__(self):
         return f'Notification: {self.pk}'
+
+
+class UnreadNotificationCounter(models.Model):
+    """
+    Number of unread notifications of a tenant user, kept in sync by notification services and signals.
+    """
+
+    tenant_user = models.OneToOneField(
+        'tenants.TenantUserRelation',
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='unread_notification_counter',
+    )
+    count = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'Unread notification counter: {self.pk}'
@@ -11,3 +11,7 @@ class NotificationListSerializer(serializers.ModelSerializer):
 
 class UnreadNotificationsSerializer(serializers.Serializer):
     count = serializers.IntegerField()
+
+
+class NotificationPollSerializer(serializers.Serializer):
+    last_id = serializers.IntegerField(min_value=0, default=0)
@@ -1,29 +1,183 @@
 import logging
+import time
+from typing import Callable, Iterable
 
-from apps.notifications.models import Notification
-from apps.tenants.models import Tenant, User
+from django.db import connection, transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from redis.exceptions import RedisError
+
+from apps.core.redis import get_redis_client
+from apps.notifications.models import Notification, UnreadNotificationCounter
+from apps.tenants.models import Tenant, TenantUserRelation, User
 
 logger = logging.getLogger(__name__)
 
 
+def change_unread_notification_count(*, tenant_user_id: int, delta: int) -> None:
+    counters = UnreadNotificationCounter.objects.filter(tenant_user_id=tenant_user_id)
+
+    if not counters.update(count=F('count') + delta):
+        UnreadNotificationCounter.objects.get_or_create(tenant_user_id=tenant_user_id)
+        counters.update(count=F('count') + delta)
+
+
+def get_unread_notification_count(*, user: User, tenant: Tenant) -> int:
+    count = (
+        UnreadNotificationCounter.objects.filter(tenant_user__tenant=tenant, tenant_user__user=user)
+        .values_list('count', flat=True)
+        .first()
+    )
+    return count or 0
+
+
+@transaction.atomic
 def read_notifications(*, user: User, tenant: Tenant) -> int:
     logger.info(f'User(pk={user.pk}) is reading all notifications')
     num_read = Notification.objects.filter(
         tenant_user__tenant=tenant,
         tenant_user__user=user,
         read=False,
-    ).update(read=True)
+    ).update(read=True, updated_at=timezone.now())
+
+    if num_read:
+        UnreadNotificationCounter.objects.filter(tenant_user__tenant=tenant, tenant_user__user=user).update(
+            count=F('count') - num_read
+        )
+
     logger.info(f'{num_read} notifications marked as read')
     return num_read
 
 
+@transaction.atomic
 def read_notification(*, user: User, notification: Notification) -> bool:
     logger.info(f'User(pk={user.pk}) is reading Notification(pk={notification.pk})')
     if notification.read:
         logger.info('Notification is already read')
         return False
 
+    updated = Notification.objects.filter(pk=notification.pk, read=False).update(read=True, updated_at=timezone.now())
     notification.read = True
-    notification.save()
+
+    if not updated:
+        logger.info('Notification is already read')
+        return False
+
+    change_unread_notification_count(tenant_user_id=notification.tenant_user_id, delta=-1)
     logger.info('Notification marked as read')
     return True
+
+
+def repair_unread_notification_counters() -> int:
+    """
+    Recompute unread notification counters from the notification table. Returns the number of repaired counters.
+    """
+    unread_tenant_user_ids = Notification.objects.filter(read=False).values_list('tenant_user', flat=True).distinct()
+    UnreadNotificationCounter.objects.bulk_create(
+        [UnreadNotificationCounter(tenant_user_id=tenant_user_id) for tenant_user_id in unread_tenant_user_ids],
+        ignore_conflicts=True,
+    )
+
+    unread_count = Coalesce(
+        Subquery(
+            Notification.objects.filter(tenant_user=OuterRef('tenant_user'), read=False)
+            .order_by()
+            .values('tenant_user')
+            .annotate(count=Count('pk'))
+            .values('count')
+        ),
+        0,
+    )
+    stale_counters = list(
+        UnreadNotificationCounter.objects.annotate(unread_count=unread_count)
+        .exclude(count=F('unread_count'))
+        .values_list('tenant_user_id', 'count', 'unread_count')
+    )
+
+    for tenant_user_id, count, actual_count in stale_counters:
+        logger.info(f'Repairing UnreadNotificationCounter(pk={tenant_user_id}). Count {count} set to {actual_count}.')
+
+    UnreadNotificationCounter.objects.filter(
+        tenant_user_id__in=[tenant_user_id for tenant_user_id, *_ in stale_counters]
+    ).update(count=unread_count)
+    return len(stale_counters)
+
+
+@transaction.atomic
+def create_notifications(
+    *,
+    tenant: Tenant | None = None,
+    tenant_users: Iterable[TenantUserRelation] | None = None,
+    title: str,
+    url: str,
+) -> list[Notification]:
+    """
+    Create the same notification for all users of the tenant or for the given tenant users.
+    Notifications are inserted in bulk, so post_save signals are not sent and unread counters are updated here.
+    """
+    if (tenant is None) == (tenant_users is None):
+        raise ValueError('Either tenant or tenant_users must be provided.')
+
+    if tenant is not None:
+        tenant_user_ids = list(TenantUserRelation.objects.filter(tenant=tenant).values_list('pk', flat=True))
+    else:
+        tenant_user_ids = list(dict.fromkeys(tenant_user.pk for tenant_user in tenant_users))  # type: ignore
+
+    logger.info(f'Creating notification "{title}" for {len(tenant_user_ids)} tenant users')
+    if not tenant_user_ids:
+        return []
+
+    notifications = Notification.objects.bulk_create(
+        [Notification(tenant_user_id=tenant_user_id, title=title, url=url) for tenant_user_id in tenant_user_ids]
+    )
+
+    UnreadNotificationCounter.objects.bulk_create(
+        [UnreadNotificationCounter(tenant_user_id=tenant_user_id) for tenant_user_id in tenant_user_ids],
+        ignore_conflicts=True,
+    )
+    UnreadNotificationCounter.objects.filter(tenant_user_id__in=tenant_user_ids).update(count=F('count') + 1)
+
+    transaction.on_commit(lambda: publish_new_notifications(tenant_user_ids))
+    logger.info(f'{len(notifications)} notifications created')
+    return notifications
+
+
+def notifications_channel(tenant_user_id: int) -> str:
+    return f'notifications/{tenant_user_id}'
+
+
+def publish_new_notifications(tenant_user_ids: Iterable[int]) -> None:
+    try:
+        with get_redis_client().pipeline(transaction=False) as pipeline:
+            for tenant_user_id in tenant_user_ids:
+                pipeline.publish(notifications_channel(tenant_user_id), 'new')
+            pipeline.execute()
+    except RedisError as e:
+        logger.warning('Unable to publish new notifications.', exc_info=e)
+
+
+def wait_for_notifications(*, tenant_user_id: int, timeout: float, has_notifications: Callable[[], bool]) -> bool:
+    """
+    Block until a new notification is published for the tenant user or the timeout expires.
+    has_notifications is checked after subscribing, so notifications created in the meantime are not missed.
+    """
+    pubsub = get_redis_client().pubsub(ignore_subscribe_messages=True)
+    pubsub.subscribe(notifications_channel(tenant_user_id))
+
+    try:
+        if has_notifications():
+            return True
+
+        # don't hold an idle database connection while waiting
+        if not connection.in_atomic_block:
+            connection.close()
+
+        deadline = time.monotonic() + timeout
+        while (remaining := deadline - time.monotonic()) > 0:
+            if pubsub.get_message(timeout=remaining):
+                return True
+
+        return False
+    finally:
+        pubsub.close()
@@ -0,0 +1,35 @@
+from typing import Type
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from apps.notifications.models import Notification
+from apps.notifications.services import change_unread_notification_count, publish_new_notifications
+
+
+@receiver(pre_save, sender=Notification)
+def pre_save_notification(sender: Type[Notification], instance: Notification, **kwargs: dict) -> None:
+    if instance._state.adding:
+        instance._stored_read = None
+    else:
+        instance._stored_read = Notification.objects.filter(pk=instance.pk).values_list('read', flat=True).first()
+
+
+@receiver(post_save, sender=Notification)
+def post_save_notification(sender: Type[Notification], instance: Notification, created: bool, **kwargs: dict) -> None:
+    if created:
+        if not instance.read:
+            change_unread_notification_count(tenant_user_id=instance.tenant_user_id, delta=1)
+            transaction.on_commit(lambda: publish_new_notifications([instance.tenant_user_id]))
+        return
+
+    stored_read = getattr(instance, '_stored_read', None)
+    if stored_read is not None and stored_read != instance.read:
+        change_unread_notification_count(tenant_user_id=instance.tenant_user_id, delta=-1 if instance.read else 1)
+
+
+@receiver(post_delete, sender=Notification)
+def post_delete_notification(sender: Type[Notification], instance: Notification, **kwargs: dict) -> None:
+    if not instance.read:
+        change_unread_notification_count(tenant_user_id=instance.tenant_user_id, delta=-1)
@@ -1,4 +1,6 @@
 import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework.test import APIClient
 
@@ -100,6 +102,20 @@ class TestUnreadNotificationsApi:
             'count': 1,
         }
 
+    def test_should_not_count_notifications(self, assert_query_budget):
+        api_client = APIClient()
+        tenant_user = TenantUserRelationFactory()
+        NotificationFactory.create_batch(5, tenant_user=tenant_user)
+        url = reverse('notifications:unread_notifications', kwargs={"tenant_id": tenant_user.tenant.pk})
+        api_client.force_authenticate(user=tenant_user.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = api_client.get(url)
+
+        assert response.data == {'count': 5}
+        assert not any('"notifications_notification"' in query['sql'] for query in queries.captured_queries)
+        assert_query_budget(response, 5)
+
     def test_should_be_forbidden_for_anonymous_user(self):
         api_client = APIClient()
         tenant = TenantFactory()
@@ -121,6 +137,47 @@ class TestUnreadNotificationsApi:
         assert response.data == {"detail": 'You do not have permission to perform this action.'}
 
 
+@pytest.mark.django_db
+class TestNotificationPollApi:
+    def test_should_return_new_notifications_immediately(self, settings):
+        settings.NOTIFICATIONS_POLL_TIMEOUT = 10
+        api_client = APIClient()
+        tenant_user = TenantUserRelationFactory()
+        old_notification = NotificationFactory(tenant_user=tenant_user)
+        new_notification = NotificationFactory(tenant_user=tenant_user)
+        NotificationFactory()
+        url = reverse('notifications:notification_poll', kwargs={"tenant_id": tenant_user.tenant.pk})
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(url, {'last_id': old_notification.pk})
+
+        assert response.status_code == 200
+        assert response.data == NotificationListSerializer([new_notification], many=True).data
+
+    def test_should_return_empty_list_after_timeout(self, settings):
+        settings.NOTIFICATIONS_POLL_TIMEOUT = 0.1
+        api_client = APIClient()
+        tenant_user = TenantUserRelationFactory()
+        notification = NotificationFactory(tenant_user=tenant_user)
+        url = reverse('notifications:notification_poll', kwargs={"tenant_id": tenant_user.tenant.pk})
+        api_client.force_authenticate(user=tenant_user.user)
+
+        response = api_client.get(url, {'last_id': notification.pk})
+
+        assert response.status_code == 200
+        assert response.data == []
+
+    def test_should_be_forbidden_for_non_tenant_user(self):
+        api_client = APIClient()
+        tenant = TenantFactory()
+        url = reverse('notifications:notification_poll', kwargs={"tenant_id": tenant.pk})
+        api_client.force_authenticate(UserFactory())
+
+        response = api_client.get(url)
+
+        assert response.status_code == 403
+
+
 @pytest.mark.django_db
 class TestReadNotificationApi:
     def test_should_read_notification(self):
@@ -1,8 +1,28 @@
+import threading
+import time
+
 import pytest
+from django.core.management import call_command
+from pytest_mock import MockerFixture
 
 from apps.notifications.factories import NotificationFactory
-from apps.notifications.services import read_notification, read_notifications
-from apps.tenants.factories import TenantUserRelationFactory
+from apps.notifications.models import Notification, UnreadNotificationCounter
+from apps.notifications.services import (
+    create_notifications,
+    get_unread_notification_count,
+    publish_new_notifications,
+    read_notification,
+    read_notifications,
+    repair_unread_notification_counters,
+    wait_for_notifications,
+)
+from apps.tenants.factories import TenantFactory, TenantUserRelationFactory
+from apps.tenants.models import TenantUserRelation
+
+
+def assert_counter_matches_notifications(tenant_user: TenantUserRelation) -> None:
+    unread_count = Notification.objects.filter(tenant_user=tenant_user, read=False).count()
+    assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == unread_count
 
 
 @pytest.mark.django_db
@@ -45,3 +65,151 @@ class TestReadNotification:
 
         notification.refresh_from_db()
         assert notification.read is True
+
+
+@pytest.mark.django_db
+class TestUnreadNotificationCounter:
+    def test_should_match_notifications_after_mixed_operations(self):
+        tenant_user = TenantUserRelationFactory()
+        other_tenant_user = TenantUserRelationFactory(user=tenant_user.user)
+        first, second, third = NotificationFactory.create_batch(3, tenant_user=tenant_user)
+        NotificationFactory(tenant_user=tenant_user, read=True)
+        NotificationFactory.create_batch(2, tenant_user=other_tenant_user)
+
+        assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == 3
+        assert get_unread_notification_count(user=tenant_user.user, tenant=other_tenant_user.tenant) == 2
+
+        read_notification(user=tenant_user.user, notification=first)
+        read_notification(user=tenant_user.user, notification=Notification.objects.get(pk=first.pk))
+        assert_counter_matches_notifications(tenant_user)
+
+        third.delete()
+        assert_counter_matches_notifications(tenant_user)
+
+        NotificationFactory(tenant_user=tenant_user)
+        read_notifications(user=tenant_user.user, tenant=tenant_user.tenant)
+        assert_counter_matches_notifications(tenant_user)
+        assert_counter_matches_notifications(other_tenant_user)
+
+        NotificationFactory(tenant_user=tenant_user)
+        assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == 1
+
+    def test_should_follow_read_changes_of_saved_notifications(self):
+        tenant_user = TenantUserRelationFactory()
+        notification = NotificationFactory(tenant_user=tenant_user)
+
+        notification.read = True
+        notification.save()
+        assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == 0
+
+        notification.save()
+        assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == 0
+
+        notification.read = False
+        notification.save()
+        assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == 1
+
+        read_notification(user=tenant_user.user, notification=notification)
+        notification.save()
+        assert_counter_matches_notifications(tenant_user)
+
+    def test_should_return_zero_without_notifications(self):
+        tenant_user = TenantUserRelationFactory()
+
+        assert get_unread_notification_count(user=tenant_user.user, tenant=tenant_user.tenant) == 0
+
+    def test_repair_unread_notification_counters(self):
+        tenant_user, stale_tenant_user, missing_tenant_user = TenantUserRelationFactory.create_batch(3)
+        NotificationFactory(tenant_user=tenant_user)
+        NotificationFactory.create_batch(2, tenant_user=stale_tenant_user)
+        NotificationFactory(tenant_user=missing_tenant_user)
+        UnreadNotificationCounter.objects.filter(tenant_user=stale_tenant_user).update(count=10)
+        UnreadNotificationCounter.objects.filter(tenant_user=missing_tenant_user).delete()
+
+        assert repair_unread_notification_counters() == 2
+
+        assert_counter_matches_notifications(tenant_user)
+        assert_counter_matches_notifications(stale_tenant_user)
+        assert_counter_matches_notifications(missing_tenant_user)
+
+    def test_repair_unread_notification_counters_command(self, capsys):
+        tenant_user = TenantUserRelationFactory()
+        NotificationFactory(tenant_user=tenant_user)
+        UnreadNotificationCounter.objects.filter(tenant_user=tenant_user).update(count=0)
+
+        call_command('repair_unread_notification_counters')
+
+        assert_counter_matches_notifications(tenant_user)
+        assert capsys.readouterr().out == 'Repaired 1 unread notification counters\n'
+
+
+@pytest.mark.django_db
+class TestCreateNotifications:
+    def test_should_notify_all_tenant_users(
+        self, mocker: MockerFixture, django_assert_num_queries, django_capture_on_commit_callbacks
+    ):
+        publish_new_notifications_mock = mocker.patch('apps.notifications.services.publish_new_notifications')
+        tenant = TenantFactory()
+        tenant_users = TenantUserRelationFactory.create_batch(3, tenant=tenant)
+        NotificationFactory(tenant_user=tenant_users[0])
+        other_tenant_user = TenantUserRelationFactory()
+
+        # tenant users, notifications, counters and counter update within a savepoint
+        with django_capture_on_commit_callbacks(execute=True), django_assert_num_queries(6):
+            notifications = create_notifications(tenant=tenant, title='Plan calculated', url='/plans/1/')
+
+        assert len(notifications) == 3
+        assert {notification.tenant_user_id for notification in notifications} == {
+            tenant_user.pk for tenant_user in tenant_users
+        }
+        assert Notification.objects.filter(title='Plan calculated', url='/plans/1/').count() == 3
+        assert not Notification.objects.filter(tenant_user=other_tenant_user).exists()
+        for tenant_user in tenant_users:
+            assert_counter_matches_notifications(tenant_user)
+        publish_new_notifications_mock.assert_called_once()
+        assert sorted(publish_new_notifications_mock.call_args.args[0]) == [
+            tenant_user.pk for tenant_user in tenant_users
+        ]
+
+    def test_should_notify_tenant_users(self):
+        tenant_users = TenantUserRelationFactory.create_batch(2)
+        other_tenant_user = TenantUserRelationFactory(tenant=tenant_users[0].tenant)
+
+        notifications = create_notifications(
+            tenant_users=[*tenant_users, tenant_users[0]], title='Study synced', url='/studies/'
+        )
+
+        assert len(notifications) == 2
+        assert get_unread_notification_count(user=tenant_users[0].user, tenant=tenant_users[0].tenant) == 1
+        assert get_unread_notification_count(user=tenant_users[1].user, tenant=tenant_users[1].tenant) == 1
+        assert get_unread_notification_count(user=other_tenant_user.user, tenant=other_tenant_user.tenant) == 0
+
+    def test_should_require_single_recipient_source(self):
+        with pytest.raises(ValueError):
+            create_notifications(title='Plan calculated', url='/plans/1/')
+
+        with pytest.raises(ValueError):
+            create_notifications(tenant=TenantFactory(), tenant_users=[], title='Plan calculated', url='/plans/1/')
+
+
+@pytest.mark.django_db
+class TestWaitForNotifications:
+    def test_should_wake_up_on_published_notification(self):
+        publisher = threading.Timer(0.1, publish_new_notifications, args=([1],))
+        publisher.start()
+        start = time.monotonic()
+
+        assert wait_for_notifications(tenant_user_id=1, timeout=5, has_notifications=lambda: False) is True
+        assert time.monotonic() - start < 5
+
+    def test_should_ignore_other_tenant_users(self):
+        publisher = threading.Timer(0.05, publish_new_notifications, args=([2],))
+        publisher.start()
+
+        assert wait_for_notifications(tenant_user_id=1, timeout=0.2, has_notifications=lambda: False) is False
+
+    def test_should_not_wait_for_existing_notifications(self):
+        start = time.monotonic()
+
+        assert wait_for_notifications(tenant_user_id=1, timeout=5, has_notifications=lambda: True) is True
+        assert time.monotonic() - start < 5
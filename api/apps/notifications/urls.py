@@ -8,5 +8,6 @@ urlpatterns = [
     path('notifications/', apis.NotificationListApi.as_view(), name='notification_list'),
     path('notifications/read/', apis.ReadNotificationsApi.as_view(), name='read_notifications'),
     path('notifications/unread/', apis.UnreadNotificationsApi.as_view(), name='unread_notifications'),
+    path('notifications/poll/', apis.NotificationPollApi.as_view(), name='notification_poll'),
     path('notifications/<int:notification_id>/read/', apis.ReadNotificationApi.as_view(), name='read_notification'),
 ]
@@ -49,3 +49,20 @@ class DeleteAccountRequest(TimestampedModel):
 
     def __str__(self):
         return f"DeleteAccountRequest: {self.user}"
+
+
+class PrivacyPolicyChangedEmail(TimestampedModel):
+    """
+    Privacy policy changed email delivered to a user, so that a repeated delivery skips the user.
+    """
+
+    policy = models.ForeignKey('privacy.PrivacyPolicy', on_delete=models.CASCADE, related_name='+')
+    user = models.ForeignKey('tenants.User', on_delete=models.CASCADE, related_name='+')
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['policy', 'user'], name='unique_privacy_policy_changed_email'),
+        ]
+
+    def __str__(self):
+        return f"PrivacyPolicyChangedEmail: {self.user_id} {self.policy_id}"
@@ -1,50 +1,106 @@
 import logging
 from datetime import timedelta
+from smtplib import SMTPConnectError, SMTPException, SMTPServerDisconnected
 
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMultiAlternatives, get_connection, send_mail
 from django.db import transaction
+from django.db.models import CharField, QuerySet, Value
+from django.db.models.functions import Cast, Concat
 from django.forms import ValidationError
 from django.template.loader import render_to_string
 from django.utils import timezone
 
 from apps.core.dashboard import DashboardRoutes
 from apps.core.reverse import dashboard_reverse
-from apps.privacy.models import DeleteAccountRequest, PrivacyPolicy, PrivacyPolicyConsent
+from apps.notifications.models import Notification, UnreadNotificationCounter
+from apps.privacy.models import (
+    DeleteAccountRequest,
+    PrivacyPolicy,
+    PrivacyPolicyChangedEmail,
+    PrivacyPolicyConsent,
+)
 from apps.tenants.models import TenantUserRelation, User
 
 logger = logging.getLogger(__name__)
 
+# errors of the mail connection, worth retrying, other errors only concern the email of a single recipient
+MAIL_CONNECTION_ERRORS = (SMTPServerDisconnected, SMTPConnectError, ConnectionError, TimeoutError)
 
-def send_privacy_changed_email(policy: PrivacyPolicy) -> None:
-    logger.info(f"Sending privacy policy changed email for PrivacyPolicy(pk={policy.pk}).")
-
-    if not policy.is_active:
-        raise ValueError("Unable to send privacy email changed. Inactive policy.")
 
-    recipient_qs = list(
+def get_privacy_changed_email_recipients(policy: PrivacyPolicy) -> QuerySet[TenantUserRelation]:
+    """
+    One tenant relation of every active user who has not received the email about the policy yet.
+    """
+    return (
         TenantUserRelation.objects.filter(user__is_active=True, tenant__is_active=True)
+        .exclude(user__in=PrivacyPolicyChangedEmail.objects.filter(policy=policy).values('user'))
         .select_related('user', 'tenant')
-        .distinct('user')
+        .order_by('user_id')
+        .distinct('user_id')
     )
 
+
+def send_privacy_changed_email_chunk(policy: PrivacyPolicy, recipients: list[TenantUserRelation]) -> int:
+    """
+    Send the emails over a single mail connection and record every delivered email.
+    Emails refused by the mail server are logged and skipped, connection errors are raised.
+    """
     subject = render_to_string('emails/privacy_policy_changed_subject.txt')
+    delivered_emails = []
+
+    try:
+        with get_connection() as connection:
+            for recipient in recipients:
+                body = render_to_string(
+                    'emails/privacy_policy_changed_body.html',
+                    {"url": dashboard_reverse(tenant=recipient.tenant, page=DashboardRoutes.index)},
+                )
+                email = EmailMultiAlternatives(
+                    subject=subject,
+                    body='',
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[recipient.user.email],
+                    connection=connection,
+                )
+                email.attach_alternative(body, 'text/html')
+                try:
+                    email.send()
+                except MAIL_CONNECTION_ERRORS:
+                    raise
+                except SMTPException:
+                    logger.exception(f"Unable to send privacy policy changed email to User(pk={recipient.user_id}).")
+                    continue
+
+                delivered_emails.append(PrivacyPolicyChangedEmail(policy=policy, user_id=recipient.user_id))
+    finally:
+        PrivacyPolicyChangedEmail.objects.bulk_create(delivered_emails, ignore_conflicts=True)
+
+    return len(delivered_emails)
+
+
+def send_privacy_changed_email(policy: PrivacyPolicy, chunk_size: int | None = None) -> int:
+    """
+    Send the privacy policy changed email to all active users who have not received it yet.
+    Returns the number of sent emails.
+    """
+    logger.info(f"Sending privacy policy changed email for PrivacyPolicy(pk={policy.pk}).")
 
-    for recipient in recipient_qs:
-        body = render_to_string(
-            'emails/privacy_policy_changed_body.html',
-            {"url": dashboard_reverse(tenant=recipient.tenant, page=DashboardRoutes.index)},
-        )
+    if not policy.is_active:
+        raise ValueError("Unable to send privacy email changed. Inactive policy.")
 
-        send_mail(
-            subject=subject,
-            message='',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[recipient.user.email],
-            html_message=body,
-        )
+    chunk_size = chunk_size or settings.PRIVACY_POLICY_EMAIL_CHUNK_SIZE
+    recipients = get_privacy_changed_email_recipients(policy)
+    sent = 0
+    last_user_id = 0
+
+    while chunk := list(recipients.filter(user_id__gt=last_user_id)[:chunk_size]):
+        sent += send_privacy_changed_email_chunk(policy, chunk)
+        last_user_id = chunk[-1].user_id
+        logger.info(f"Sent {sent} privacy policy changed emails for PrivacyPolicy(pk={policy.pk}).")
 
     logger.info(f"Privacy policy changed emails for PrivacyPolicy(pk={policy.pk}) has been sent.")
+    return sent
 
 
 def send_delete_account_request_email(delete_account_request: DeleteAccountRequest) -> None:
@@ -66,6 +122,27 @@ def send_delete_account_request_email(delete_account_request: DeleteAccountReque
     logger.info(f"Delete account request email sent to User(pk={delete_account_request.user.pk}.")
 
 
+def send_account_deleted_emails(recipients: list[tuple[int, str]]) -> None:
+    """
+    Send the account deleted email to (user id, original email) pairs over a single mail connection.
+    """
+    subject = render_to_string('emails/account_deleted_subject.txt')
+    body = render_to_string('emails/account_deleted_body.html')
+
+    with get_connection() as connection:
+        for user_id, email in recipients:
+            logger.info(f"Sending account deleted email to User(pk={user_id}).")
+            message = EmailMultiAlternatives(
+                subject=subject,
+                body='',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email],
+                connection=connection,
+            )
+            message.attach_alternative(body, 'text/html')
+            message.send()
+
+
 def send_account_deleted_email(user: User, email: str) -> None:
     logger.info(f"Sending account deleted email to User(pk={user.pk}.")
 
@@ -129,7 +206,9 @@ def activate_policy(policy: PrivacyPolicy) -> PrivacyPolicy:
     policy.is_active = True
     policy.save()
 
-    send_privacy_changed_email(policy)
+    from apps.privacy.tasks import send_privacy_changed_email_task
+
+    transaction.on_commit(lambda: send_privacy_changed_email_task.delay(policy.pk))
 
     logger.info(f"PrivacyPolicy(pk={policy.pk}) has been activated.")
     return policy
@@ -167,7 +246,98 @@ def delete_account(delete_account_request: DeleteAccountRequest) -> DeleteAccoun
     delete_account_request.is_active = False
     delete_account_request.save()
 
-    TenantUserRelation.objects.filter(user=user).delete()
+    delete_tenant_user_relations([user.pk])
 
     send_account_deleted_email(user, user_email)
     return delete_account_request
+
+
+def delete_tenant_user_relations(user_ids: list[int]) -> None:
+    """
+    Delete tenant relations of the users together with their notifications, which protect the relations.
+    """
+    Notification.objects.filter(tenant_user__user_id__in=user_ids).delete()
+    UnreadNotificationCounter.objects.filter(tenant_user__user_id__in=user_ids).delete()
+    TenantUserRelation.objects.filter(user_id__in=user_ids).delete()
+
+
+def execute_delete_account_requests(delete_account_requests: list[DeleteAccountRequest]) -> None:
+    user_ids = [request.user.pk for request in delete_account_requests]
+    deleted_email = Concat(Value('deleted-user-'), Cast('pk', output_field=CharField()), Value('@example.com'))
+    User.objects.filter(pk__in=user_ids).update(
+        is_active=False,
+        first_name='',
+        last_name='',
+        phone_number='',
+        email=deleted_email,
+        username=deleted_email,
+    )
+    DeleteAccountRequest.objects.filter(pk__in=[request.pk for request in delete_account_requests]).update(
+        is_active=False, updated_at=timezone.now()
+    )
+    delete_tenant_user_relations(user_ids)
+
+
+def execute_delete_account_requests_chunk(chunk_size: int, after_pk: int = 0) -> tuple[int, int | None]:
+    """
+    Execute a chunk of due delete account requests with set-based statements. Requests locked by
+    a concurrent run are skipped. When the chunk fails, its requests are executed one by one,
+    each in its own savepoint, so a failing request doesn't block the others.
+    Returns the number of executed requests and the pk of the last request of the chunk, None when no request is due.
+    """
+    from apps.privacy.tasks import send_account_deleted_emails_task
+
+    with transaction.atomic():
+        delete_account_requests = list(
+            DeleteAccountRequest.objects.filter(is_active=True, execute_at__lte=timezone.now(), pk__gt=after_pk)
+            .select_related('user')
+            .select_for_update(skip_locked=True, of=('self',))
+            .order_by('pk')[:chunk_size]
+        )
+        if not delete_account_requests:
+            return 0, None
+
+        user_ids = [request.user.pk for request in delete_account_requests]
+        logger.info(f"Executing DeleteAccountRequests for Users(pk__in={user_ids}).")
+
+        try:
+            with transaction.atomic():
+                execute_delete_account_requests(delete_account_requests)
+            executed_requests = delete_account_requests
+        except Exception:
+            logger.exception(
+                f"Unable to execute DeleteAccountRequests for Users(pk__in={user_ids}). Executing one by one."
+            )
+            executed_requests = []
+            for delete_account_request in delete_account_requests:
+                try:
+                    with transaction.atomic():
+                        execute_delete_account_requests([delete_account_request])
+                except Exception:
+                    logger.exception(f"Unable to execute DeleteAccountRequest(pk={delete_account_request.pk}).")
+                else:
+                    executed_requests.append(delete_account_request)
+
+        recipients = [(request.user.pk, request.user.email) for request in executed_requests]
+        if recipients:
+            transaction.on_commit(lambda: send_account_deleted_emails_task.delay(recipients))
+
+    return len(executed_requests), delete_account_requests[-1].pk
+
+
+def execute_due_delete_account_requests(chunk_size: int | None = None) -> int:
+    """
+    Execute all due delete account requests in chunks. Safe to run concurrently.
+    Returns the number of executed requests.
+    """
+    chunk_size = chunk_size or settings.DELETE_ACCOUNT_REQUESTS_CHUNK_SIZE
+    executed = 0
+
+    last_pk: int | None = 0
+
+    while last_pk is not None:
+        executed_chunk, last_pk = execute_delete_account_requests_chunk(chunk_size, after_pk=last_pk)
+        executed += executed_chunk
+
+    logger.info(f"Executed {executed} delete account requests.")
+    return executed
@@ -1,8 +1,18 @@
-from django.utils import timezone
+import logging
+
+from celery import Task
 
 from apps.app.celery import app
-from apps.privacy.models import DeleteAccountRequest
-from apps.privacy.services import delete_account
+from apps.privacy.models import DeleteAccountRequest, PrivacyPolicy
+from apps.privacy.services import (
+    MAIL_CONNECTION_ERRORS,
+    delete_account,
+    execute_due_delete_account_requests,
+    send_account_deleted_emails,
+    send_privacy_changed_email,
+)
+
+logger = logging.getLogger(__name__)
 
 
 @app.task
@@ -10,10 +20,7 @@ def execute_delete_account_requests() -> None:
     """
     Execute all pending delete account requests
     """
-    delete_account_requests = DeleteAccountRequest.objects.filter(is_active=True, execute_at__lte=timezone.now())
-
-    for request in delete_account_requests:
-        execute_delete_account_request.delay(request.pk)
+    execute_due_delete_account_requests()
 
 
 @app.task
@@ -23,3 +30,31 @@ def execute_delete_account_request(delete_account_request_id: int) -> None:
     """
     delete_account_request = DeleteAccountRequest.objects.get(pk=delete_account_request_id)
     delete_account(delete_account_request)
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=5 * 60)
+def send_privacy_changed_email_task(self: Task, policy_id: int) -> None:
+    """
+    Send the privacy policy changed email. Connection errors are retried, a retry continues with users
+    who have not received the email yet.
+    """
+    policy = PrivacyPolicy.objects.get(pk=policy_id)
+
+    if not policy.is_active:
+        logger.info(f"Skipping privacy policy changed emails for PrivacyPolicy(pk={policy.pk}). Policy inactive.")
+        return
+
+    try:
+        send_privacy_changed_email(policy)
+    except MAIL_CONNECTION_ERRORS as e:
+        logger.exception(f"Unable to send privacy policy changed emails for PrivacyPolicy(pk={policy.pk}).")
+        raise self.retry(exc=e)
+
+
+@app.task(bind=True, max_retries=3, default_retry_delay=5 * 60)
+def send_account_deleted_emails_task(self: Task, recipients: list[tuple[int, str]]) -> None:
+    try:
+        send_account_deleted_emails(recipients)
+    except Exception as e:
+        logger.exception("Unable to send account deleted emails.")
+        raise self.retry(exc=e)
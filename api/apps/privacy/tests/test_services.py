@@ -1,17 +1,35 @@
+import threading
+from datetime import timedelta
+from smtplib import SMTPRecipientsRefused, SMTPServerDisconnected
+
 import pytest
 from django.core import mail
 from django.core.exceptions import ValidationError
+from django.core.mail import EmailMultiAlternatives
+from django.db import connection, transaction
 from django.utils import timezone
+from pytest_mock import MockerFixture
 
+from apps.notifications.factories import NotificationFactory
+from apps.notifications.models import Notification, UnreadNotificationCounter
+from apps.privacy import services
 from apps.privacy.factories import DeleteAccountRequestFactory, PrivacyPolicyConsentFactory, PrivacyPolicyFactory
-from apps.privacy.models import PrivacyPolicy, PrivacyPolicyConsent
+from apps.privacy.models import (
+    DeleteAccountRequest,
+    PrivacyPolicy,
+    PrivacyPolicyChangedEmail,
+    PrivacyPolicyConsent,
+)
 from apps.privacy.services import (
     accept_active_policy,
     activate_policy,
     create_delete_account_request,
     delete_account,
+    execute_due_delete_account_requests,
     is_user_consent_valid,
+    send_privacy_changed_email,
 )
+from apps.privacy.tasks import send_account_deleted_emails_task, send_privacy_changed_email_task
 from apps.tenants.factories import TenantUserRelationFactory, UserFactory
 from apps.tenants.models import TenantUserRelation
 
@@ -96,27 +114,24 @@ class TestAcceptActivePolicy:
 
 @pytest.mark.django_db
 class TestActivatePolicy:
-    def test_should_activate_policy(self):
+    def test_should_activate_policy(self, mocker: MockerFixture, django_capture_on_commit_callbacks):
+        mock_send_privacy_changed_email_task = mocker.patch.object(send_privacy_changed_email_task, 'delay')
         active_policy = PrivacyPolicyFactory()
         new_policy = PrivacyPolicyFactory(is_active=False)
 
-        user = UserFactory()
-        tenant_active_user_1, _ = TenantUserRelationFactory.create_batch(2, user=user)
-        TenantUserRelationFactory(tenant__is_active=False)
-        TenantUserRelationFactory(user__is_active=False)
+        with django_capture_on_commit_callbacks(execute=True):
+            new_active_policy = activate_policy(new_policy)
+
+            assert mock_send_privacy_changed_email_task.call_count == 0
 
-        new_active_policy = activate_policy(new_policy)
         assert new_active_policy.is_active is True
         assert new_active_policy.pk == new_policy.pk
 
         active_policy.refresh_from_db()
         assert active_policy.is_active is False
 
-        assert len(mail.outbox) == 1
-        email = mail.outbox[0]
-
-        assert email.subject == "Privacy policy has changed."
-        assert email.to == [tenant_active_user_1.user.email]
+        assert len(mail.outbox) == 0
+        mock_send_privacy_changed_email_task.assert_called_once_with(new_policy.pk)
 
     def should_raise_validation_error_for_active_policy(self):
         active_policy = PrivacyPolicyFactory()
@@ -125,6 +140,77 @@ class TestActivatePolicy:
             activate_policy(active_policy)
 
 
+@pytest.mark.django_db
+class TestSendPrivacyChangedEmail:
+    def test_should_send_privacy_changed_email(self, settings):
+        settings.PRIVACY_POLICY_EMAIL_CHUNK_SIZE = 2
+        policy = PrivacyPolicyFactory()
+        user = UserFactory()
+        TenantUserRelationFactory.create_batch(2, user=user)
+        other_tenant_users = TenantUserRelationFactory.create_batch(3)
+        TenantUserRelationFactory(tenant__is_active=False)
+        TenantUserRelationFactory(user__is_active=False)
+
+        sent = send_privacy_changed_email(policy)
+
+        assert sent == 4
+        assert len(mail.outbox) == 4
+        assert mail.outbox[0].subject == "Privacy policy has changed."
+        assert sorted(email.to[0] for email in mail.outbox) == sorted(
+            [user.email, *(tenant_user.user.email for tenant_user in other_tenant_users)]
+        )
+        assert PrivacyPolicyChangedEmail.objects.filter(policy=policy).count() == 4
+
+    def test_should_not_resend_privacy_changed_email(self):
+        policy = PrivacyPolicyFactory()
+        TenantUserRelationFactory.create_batch(2)
+
+        send_privacy_changed_email(policy)
+        sent = send_privacy_changed_email(policy)
+
+        assert sent == 0
+        assert len(mail.outbox) == 2
+
+    def test_should_track_emails_sent_before_failure(self, mocker: MockerFixture):
+        policy = PrivacyPolicyFactory()
+        TenantUserRelationFactory.create_batch(3)
+        mocker.patch.object(EmailMultiAlternatives, 'send', side_effect=[1, SMTPServerDisconnected()])
+
+        with pytest.raises(SMTPServerDisconnected):
+            send_privacy_changed_email(policy, chunk_size=10)
+
+        assert PrivacyPolicyChangedEmail.objects.filter(policy=policy).count() == 1
+
+        mocker.stopall()
+        sent = send_privacy_changed_email(policy)
+
+        assert sent == 2
+        assert PrivacyPolicyChangedEmail.objects.filter(policy=policy).count() == 3
+        assert len(mail.outbox) == 2
+
+    def test_should_skip_refused_recipient(self, mocker: MockerFixture):
+        policy = PrivacyPolicyFactory()
+        refused_tenant_user, *tenant_users = TenantUserRelationFactory.create_batch(3)
+        mocker.patch.object(
+            EmailMultiAlternatives,
+            'send',
+            side_effect=[SMTPRecipientsRefused({refused_tenant_user.user.email: ()}), 1, 1],
+        )
+
+        sent = send_privacy_changed_email(policy, chunk_size=2)
+
+        assert sent == 2
+        assert sorted(
+            PrivacyPolicyChangedEmail.objects.filter(policy=policy).values_list('user_id', flat=True)
+        ) == sorted(tenant_user.user_id for tenant_user in tenant_users)
+
+    def test_should_raise_value_error_for_inactive_policy(self):
+        policy = PrivacyPolicyFactory(is_active=False)
+
+        with pytest.raises(ValueError):
+            send_privacy_changed_email(policy)
+
+
 @pytest.mark.django_db
 class TestCreateDeleteAccountRequest:
     def test_should_create_delete_account_request(self):
@@ -179,3 +265,114 @@ class TestDeleteAccount:
 
         with pytest.raises(ValueError, match="Delete account request is not active."):
             delete_account(delete_account_request)
+
+
+@pytest.mark.django_db
+class TestExecuteDueDeleteAccountRequests:
+    def test_should_execute_due_delete_account_requests(
+        self, mocker: MockerFixture, django_assert_max_num_queries, django_capture_on_commit_callbacks
+    ):
+        mock_send_account_deleted_emails_task = mocker.patch.object(send_account_deleted_emails_task, 'delay')
+        delete_account_requests = DeleteAccountRequestFactory.create_batch(
+            5, execute_at=timezone.now() - timedelta(days=1), user__phone_number="+48000000000"
+        )
+        for delete_account_request in delete_account_requests:
+            TenantUserRelationFactory.create_batch(2, user=delete_account_request.user)
+        pending_delete_account_request = DeleteAccountRequestFactory()
+        TenantUserRelationFactory(user=pending_delete_account_request.user)
+        recipients = [(request.user.pk, request.user.email) for request in delete_account_requests]
+
+        with django_capture_on_commit_callbacks(execute=True), django_assert_max_num_queries(40):
+            executed = execute_due_delete_account_requests(chunk_size=2)
+
+        assert executed == 5
+        assert [call.args[0] for call in mock_send_account_deleted_emails_task.call_args_list] == [
+            recipients[0:2],
+            recipients[2:4],
+            recipients[4:5],
+        ]
+
+        for delete_account_request in delete_account_requests:
+            delete_account_request.refresh_from_db()
+            user = delete_account_request.user
+            user.refresh_from_db()
+
+            assert delete_account_request.is_active is False
+            assert user.email == f"deleted-user-{user.pk}@example.com"
+            assert user.username == f"deleted-user-{user.pk}@example.com"
+            assert user.first_name == ""
+            assert user.last_name == ""
+            assert user.phone_number == ""
+            assert user.is_active is False
+            assert TenantUserRelation.objects.filter(user=user).exists() is False
+
+        pending_delete_account_request.refresh_from_db()
+        assert pending_delete_account_request.is_active is True
+        assert TenantUserRelation.objects.filter(user=pending_delete_account_request.user).exists() is True
+
+    def test_should_delete_notifications_of_deleted_users(self, mocker: MockerFixture):
+        mocker.patch.object(send_account_deleted_emails_task, 'delay')
+        delete_account_request = DeleteAccountRequestFactory(execute_at=timezone.now() - timedelta(days=1))
+        tenant_user = TenantUserRelationFactory(user=delete_account_request.user)
+        NotificationFactory.create_batch(2, tenant_user=tenant_user)
+        other_notification = NotificationFactory()
+
+        assert execute_due_delete_account_requests() == 1
+
+        assert TenantUserRelation.objects.filter(user=delete_account_request.user).exists() is False
+        assert list(Notification.objects.all()) == [other_notification]
+        assert UnreadNotificationCounter.objects.filter(tenant_user_id=tenant_user.pk).exists() is False
+
+    def test_should_execute_other_delete_account_requests_when_one_fails(
+        self, mocker: MockerFixture, django_capture_on_commit_callbacks
+    ):
+        mock_send_account_deleted_emails_task = mocker.patch.object(send_account_deleted_emails_task, 'delay')
+        failing_request, *other_requests = DeleteAccountRequestFactory.create_batch(
+            3, execute_at=timezone.now() - timedelta(days=1)
+        )
+        delete_tenant_user_relations = services.delete_tenant_user_relations
+
+        def delete_or_fail(user_ids: list[int]) -> None:
+            if failing_request.user.pk in user_ids:
+                raise ValueError('Unable to delete tenant user relations.')
+            delete_tenant_user_relations(user_ids)
+
+        mocker.patch('apps.privacy.services.delete_tenant_user_relations', side_effect=delete_or_fail)
+
+        with django_capture_on_commit_callbacks(execute=True):
+            executed = execute_due_delete_account_requests(chunk_size=2)
+
+        assert executed == 2
+        assert [call.args[0] for call in mock_send_account_deleted_emails_task.call_args_list] == [
+            [(other_requests[0].user.pk, other_requests[0].user.email)],
+            [(other_requests[1].user.pk, other_requests[1].user.email)],
+        ]
+        assert DeleteAccountRequest.objects.get(pk=failing_request.pk).is_active is True
+        assert not DeleteAccountRequest.objects.filter(
+            pk__in=[request.pk for request in other_requests], is_active=True
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_should_skip_locked_delete_account_requests(self, mocker: MockerFixture):
+        mocker.patch.object(send_account_deleted_emails_task, 'delay')
+        locked_request, other_request = DeleteAccountRequestFactory.create_batch(
+            2, execute_at=timezone.now() - timedelta(days=1)
+        )
+        executed = []
+
+        def execute_concurrently() -> None:
+            try:
+                executed.append(execute_due_delete_account_requests())
+            finally:
+                connection.close()
+
+        with transaction.atomic():
+            DeleteAccountRequest.objects.select_for_update().get(pk=locked_request.pk)
+
+            thread = threading.Thread(target=execute_concurrently)
+            thread.start()
+            thread.join(timeout=10)
+
+        assert executed == [1]
+        assert DeleteAccountRequest.objects.get(pk=locked_request.pk).is_active is True
+        assert DeleteAccountRequest.objects.get(pk=other_request.pk).is_active is False
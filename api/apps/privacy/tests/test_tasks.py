@@ -1,29 +1,48 @@
 from datetime import timedelta
+from smtplib import SMTPServerDisconnected
 from unittest import mock
 from unittest.mock import MagicMock
 
 import pytest
 from celery import states
+from django.core import mail
 from django.utils import timezone
 
-from apps.privacy.factories import DeleteAccountRequestFactory
-from apps.privacy.tasks import execute_delete_account_request, execute_delete_account_requests
+from apps.privacy.factories import DeleteAccountRequestFactory, PrivacyPolicyFactory
+from apps.privacy.tasks import (
+    execute_delete_account_request,
+    execute_delete_account_requests,
+    send_account_deleted_emails_task,
+    send_privacy_changed_email_task,
+)
+from apps.tenants.factories import TenantUserRelationFactory
 
 
 @pytest.mark.django_db
 class TestExecuteDeleteAccountRequests:
-    @mock.patch.object(execute_delete_account_request, "delay")
-    def test_should_execute_delete_account_requests(self, mock_execute_delete_account_request: MagicMock):
+    @mock.patch.object(send_account_deleted_emails_task, "delay")
+    def test_should_execute_delete_account_requests(
+        self, mock_send_account_deleted_emails_task: MagicMock, django_capture_on_commit_callbacks
+    ):
         delete_account_request = DeleteAccountRequestFactory(execute_at=timezone.now() - timedelta(days=2))
-        DeleteAccountRequestFactory(is_active=False, execute_at=timezone.now() - timedelta(days=2))
-        DeleteAccountRequestFactory()
+        inactive_delete_account_request = DeleteAccountRequestFactory(
+            is_active=False, execute_at=timezone.now() - timedelta(days=2)
+        )
+        pending_delete_account_request = DeleteAccountRequestFactory()
+        user_email = delete_account_request.user.email
 
-        result = execute_delete_account_requests.apply()
+        with django_capture_on_commit_callbacks(execute=True):
+            result = execute_delete_account_requests.apply()
 
         assert result.get() is None
         assert result.state == states.SUCCESS
 
-        mock_execute_delete_account_request.assert_called_once_with(delete_account_request.pk)
+        mock_send_account_deleted_emails_task.assert_called_once_with([(delete_account_request.user_id, user_email)])
+        for request in (delete_account_request, inactive_delete_account_request, pending_delete_account_request):
+            request.refresh_from_db()
+        assert delete_account_request.is_active is False
+        assert inactive_delete_account_request.is_active is False
+        assert pending_delete_account_request.is_active is True
 
 
 @pytest.mark.django_db
@@ -35,3 +54,53 @@ class TestExecuteDeleteAccountRequest:
 
         assert result.get() is None
         assert result.state == states.SUCCESS
+
+
+@pytest.mark.django_db
+class TestSendPrivacyChangedEmailTask:
+    def test_should_send_privacy_changed_email(self):
+        policy = PrivacyPolicyFactory()
+        tenant_user = TenantUserRelationFactory()
+
+        result = send_privacy_changed_email_task.apply(args=(policy.pk,))
+
+        assert result.get() is None
+        assert result.state == states.SUCCESS
+        assert [email.to for email in mail.outbox] == [[tenant_user.user.email]]
+
+    def test_should_skip_inactive_policy(self):
+        policy = PrivacyPolicyFactory(is_active=False)
+        TenantUserRelationFactory()
+
+        result = send_privacy_changed_email_task.apply(args=(policy.pk,))
+
+        assert result.state == states.SUCCESS
+        assert len(mail.outbox) == 0
+
+    @mock.patch('apps.privacy.tasks.send_privacy_changed_email', side_effect=SMTPServerDisconnected())
+    def test_should_retry_on_connection_error(self, mock_send_privacy_changed_email: MagicMock):
+        policy = PrivacyPolicyFactory()
+
+        result = send_privacy_changed_email_task.apply(args=(policy.pk,))
+
+        assert result.state == states.FAILURE
+        assert mock_send_privacy_changed_email.call_count == send_privacy_changed_email_task.max_retries + 1
+
+    @mock.patch('apps.privacy.tasks.send_privacy_changed_email', side_effect=ValueError())
+    def test_should_not_retry_other_errors(self, mock_send_privacy_changed_email: MagicMock):
+        policy = PrivacyPolicyFactory()
+
+        result = send_privacy_changed_email_task.apply(args=(policy.pk,))
+
+        assert result.state == states.FAILURE
+        assert mock_send_privacy_changed_email.call_count == 1
+
+
+@pytest.mark.django_db
+class TestSendAccountDeletedEmailsTask:
+    def test_should_send_account_deleted_emails(self):
+        result = send_account_deleted_emails_task.apply(args=([(1, 'first@example.com'), (2, 'second@example.com')],))
+
+        assert result.state == states.SUCCESS
+        assert [email.to for email in mail.outbox] == [['first@example.com'], ['second@example.com']]
+        assert mail.outbox[0].subject == "Your account has been deleted."
@@ -35,7 +35,7 @@ class PlanIndex(CelerySearchIndex, indexes.Indexable):
         return Plan
 
     def index_queryset(self, using=None):
-        return self.get_model().objects.all()
+        return self.get_model().objects.select_related('project')
 
     def prepare_url(self, obj: Plan) -> str:
         return DashboardRoutes.updatePlan.format(projectId=obj.project_id, planId=obj.pk)
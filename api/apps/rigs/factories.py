@@ -3,6 +3,7 @@ from datetime import datetime
 import factory.fuzzy
 
 from apps.core.factories import CleanDjangoModelFactory
+from apps.emps.models import EMPRigType
 from apps.rigs.models import Airgap, DPClass, HighMediumLow, RigStatus, TopsideDesign
 
 
@@ -131,12 +132,14 @@ class BaseCustomRigFactory(CleanDjangoModelFactory):
     tenant = factory.SubFactory('apps.tenants.factories.TenantFactory')
     creator = factory.SubFactory('apps.tenants.factories.UserFactory')
     project = factory.SubFactory('apps.projects.factories.ProjectFactory')
-    emp = factory.SubFactory('apps.emps.factories.EMPFactory')
     draft = False
 
 
 class CustomSemiRigFactory(BaseCustomRigFactory, BaseSemiRigFactory):
     name = factory.Sequence(lambda n: f"custom-semi-rig-{n}")
+    emp = factory.SubFactory(
+        'apps.emps.factories.EMPFactory', tenant=factory.SelfAttribute('..tenant'), rig_type=EMPRigType.SEMI
+    )
 
     class Meta:
         model = "rigs.CustomSemiRig"
@@ -144,6 +147,9 @@ class CustomSemiRigFactory(BaseCustomRigFactory, BaseSemiRigFactory):
 
 class CustomJackupRigFactory(BaseCustomRigFactory, BaseJackupRigFactory):
     name = factory.Sequence(lambda n: f"custom-jackup-rig-{n}")
+    emp = factory.SubFactory(
+        'apps.emps.factories.EMPFactory', tenant=factory.SelfAttribute('..tenant'), rig_type=EMPRigType.JACKUP
+    )
 
     class Meta:
         model = "rigs.CustomJackupRig"
@@ -244,6 +250,9 @@ class ConceptDrillshipFactory(BaseDrillshipFactory):
 
 class CustomDrillshipFactory(BaseCustomRigFactory, BaseDrillshipFactory):
     name = factory.Sequence(lambda n: f"custom-drillship-{n}")
+    emp = factory.SubFactory(
+        'apps.emps.factories.EMPFactory', tenant=factory.SelfAttribute('..tenant'), rig_type=EMPRigType.DRILLSHIP
+    )
 
     class Meta:
         model = "rigs.CustomDrillship"
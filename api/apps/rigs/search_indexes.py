@@ -20,9 +20,8 @@ class CustomSemiRigIndex(CelerySearchIndex, indexes.Indexable):
         return self.get_model().objects.all()
 
     def prepare_url(self, obj: CustomSemiRig) -> str:
-        project = obj.project
-        if project:
-            return DashboardRoutes.projectRig.format(projectId=project.pk, rigType=RigType.Semi, rigId=obj.pk)
+        if obj.project_id:
+            return DashboardRoutes.projectRig.format(projectId=obj.project_id, rigType=RigType.Semi, rigId=obj.pk)
         return DashboardRoutes.rig.format(rigType=RigType.Semi, rigId=obj.pk)
 
 
@@ -41,9 +40,8 @@ class CustomJackupRigIndex(CelerySearchIndex, indexes.Indexable):
         return self.get_model().objects.all()
 
     def prepare_url(self, obj: CustomJackupRig) -> str:
-        project = obj.project
-        if project:
-            return DashboardRoutes.projectRig.format(projectId=project.pk, rigType=RigType.Jackup, rigId=obj.pk)
+        if obj.project_id:
+            return DashboardRoutes.projectRig.format(projectId=obj.project_id, rigType=RigType.Jackup, rigId=obj.pk)
         return DashboardRoutes.rig.format(rigType=RigType.Jackup, rigId=obj.pk)
 
 
@@ -62,7 +60,6 @@ class CustomDrillshipIndex(CelerySearchIndex, indexes.Indexable):
         return self.get_model().objects.all()
 
     def prepare_url(self, obj: CustomDrillship) -> str:
-        project = obj.project
-        if project:
-            return DashboardRoutes.projectRig.format(projectId=project.pk, rigType=RigType.Drillship, rigId=obj.pk)
+        if obj.project_id:
+            return DashboardRoutes.projectRig.format(projectId=obj.project_id, rigType=RigType.Drillship, rigId=obj.pk)
         return DashboardRoutes.rig.format(rigType=RigType.Drillship, rigId=obj.pk)
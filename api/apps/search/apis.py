@@ -6,7 +6,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from apps.search.serializers import SearchQuerySerializer, SearchResultSerializer
-from apps.search.services import search
+from apps.search.services import get_search_results
 from apps.tenants.mixins import TenantMixin
 from apps.tenants.models import User
 from apps.tenants.permissions import IsTenantUser
@@ -22,7 +22,7 @@ class SearchApi(TenantMixin, GenericAPIView):
         query_serializer = SearchQuerySerializer(data=request.GET)
         query_serializer.is_valid(raise_exception=True)
 
-        search_results = search(
+        search_results = get_search_results(
             user=cast(User, self.request.user), tenant=self.tenant, **query_serializer.validated_data
         )
         page = self.paginate_queryset(search_results)  # noqa
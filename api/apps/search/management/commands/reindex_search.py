@@ -0,0 +1,33 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand, CommandParser
+from haystack import DEFAULT_ALIAS
+
+from apps.search.services import REINDEX_CHUNK_SIZE, get_search_indexes, reindex
+
+
+class Command(BaseCommand):
+    help = 'Rebuild search indexes in keyset ordered chunks'
+
+    def add_arguments(self, parser: CommandParser) -> None:
+        parser.add_argument('models', nargs='*', help='Model labels to reindex, e.g. projects.plan. Defaults to all.')
+        parser.add_argument('--using', default=DEFAULT_ALIAS, help='Search connection alias')
+        parser.add_argument('--chunk-size', type=int, default=REINDEX_CHUNK_SIZE, help='Objects indexed per chunk')
+        parser.add_argument('--workers', type=int, default=0, help='Number of parallel worker processes')
+
+    def handle(self, *args: Any, **options: Any) -> None:
+        for index in get_search_indexes(options['using'], options['models']):
+            start = time.perf_counter()
+            indexed = reindex(
+                index,
+                using=options['using'],
+                chunk_size=options['chunk_size'],
+                workers=options['workers'],
+            )
+            duration = time.perf_counter() - start
+
+            self.stdout.write(
+                f'{index.get_model()._meta.label_lower}: indexed {indexed} documents in {duration:.2f}s '
+                f'({indexed / duration if duration else 0:.0f} documents/s)'
+            )
@@ -1,12 +1,132 @@
+import hashlib
 import logging
+import multiprocessing
+from dataclasses import dataclass
+from typing import Iterator, TypedDict
 
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections as db_connections
+from haystack import connections
+from haystack.indexes import SearchIndex
 from haystack.query import SearchQuerySet
 
+from apps.core.haystack import get_search_index_version, touch_search_index
 from apps.tenants.models import Tenant, User
 
 logger = logging.getLogger(__name__)
 
+REINDEX_CHUNK_SIZE = 500
+
 
 def search(user: User, tenant: Tenant, query: str) -> SearchQuerySet:
     logger.info(f'User(id={user}) is searching for "{query}"')
     return SearchQuerySet().filter(tenant_id=tenant.pk).autocomplete(name_auto=query)
+
+
+class SearchResultData(TypedDict):
+    id: str
+    url: str
+    type: str
+    name: str
+
+
+def normalize_search_query(query: str) -> str:
+    return ' '.join(query.lower().split())
+
+
+def search_results_key(tenant_id: int, query: str) -> str:
+    query_hash = hashlib.md5(query.encode()).hexdigest()
+    return f'search-results/{tenant_id}/{get_search_index_version(tenant_id)}/{query_hash}'
+
+
+def get_search_results(*, user: User, tenant: Tenant, query: str) -> list[SearchResultData]:
+    """
+    Return up to SEARCH_RESULT_WINDOW autocomplete results. Results are cached per tenant and normalized query
+    until the tenant's search documents change.
+    """
+    query = normalize_search_query(query)
+    results_key = search_results_key(tenant.pk, query)
+    results: list[SearchResultData] | None = cache.get(results_key)
+
+    if results is None:
+        results = [
+            SearchResultData(id=result.id, url=result.url, type=result.type, name=result.name)
+            for result in search(user=user, tenant=tenant, query=query)[: settings.SEARCH_RESULT_WINDOW]
+        ]
+        cache.set(results_key, results, settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+
+    return results
+
+
+@dataclass
+class ReindexChunk:
+    model_label: str
+    using: str
+    # keyset bounds, (start_pk, end_pk]
+    start_pk: int | None
+    end_pk: int
+
+
+def get_search_indexes(using: str, model_labels: list[str] | None = None) -> list[SearchIndex]:
+    indexes = connections[using].get_unified_index().get_indexes()
+    if not model_labels:
+        return list(indexes.values())
+
+    return [indexes[apps.get_model(model_label)] for model_label in model_labels]
+
+
+def get_reindex_chunks(index: SearchIndex, *, using: str, chunk_size: int) -> Iterator[ReindexChunk]:
+    """
+    Split the index queryset into keyset ranges of chunk_size objects. Only primary keys are read here,
+    so it stays cheap for large tables.
+    """
+    model_label = index.get_model()._meta.label_lower
+    pks = index.index_queryset(using=using).order_by('pk').values_list('pk', flat=True)
+
+    start_pk = None
+    end_pk = None
+    for position, pk in enumerate(pks.iterator(chunk_size=chunk_size), start=1):
+        end_pk = pk
+        if position % chunk_size == 0:
+            yield ReindexChunk(model_label=model_label, using=using, start_pk=start_pk, end_pk=end_pk)
+            start_pk = end_pk
+
+    if end_pk is not None and end_pk != start_pk:
+        yield ReindexChunk(model_label=model_label, using=using, start_pk=start_pk, end_pk=end_pk)
+
+
+def reindex_chunk(chunk: ReindexChunk) -> int:
+    model = apps.get_model(chunk.model_label)
+    index = connections[chunk.using].get_unified_index().get_index(model)
+
+    queryset = index.index_queryset(using=chunk.using).filter(pk__lte=chunk.end_pk).order_by('pk')
+    if chunk.start_pk is not None:
+        queryset = queryset.filter(pk__gt=chunk.start_pk)
+
+    objects = list(queryset)
+    if objects:
+        index.get_backend(chunk.using).update(index, objects)
+    return len(objects)
+
+
+def reindex(index: SearchIndex, *, using: str, chunk_size: int = REINDEX_CHUNK_SIZE, workers: int = 0) -> int:
+    """
+    Rebuild a search index in keyset ordered chunks. Chunks are indexed by a pool of worker
+    processes when workers > 0. Returns the number of indexed documents.
+    """
+    chunks = get_reindex_chunks(index, using=using, chunk_size=chunk_size)
+
+    if workers > 0:
+        chunk_list = list(chunks)
+        # forked workers must not share database connections of the parent process
+        db_connections.close_all()
+        with multiprocessing.Pool(workers) as pool:
+            indexed = sum(pool.imap_unordered(reindex_chunk, chunk_list))
+    else:
+        indexed = sum(reindex_chunk(chunk) for chunk in chunks)
+
+    touch_search_index()
+    logger.info(f'Reindexed {indexed} {index.get_model()._meta.label_lower} documents')
+    return indexed
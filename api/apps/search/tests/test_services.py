@@ -1,11 +1,24 @@
 import pytest
+from django.core.management import call_command
 from django.db import transaction
+from haystack import DEFAULT_ALIAS, connections
+from haystack.query import SearchQuerySet
+from pytest_mock import MockerFixture
 
 from apps.core.dashboard import DashboardRoutes, RigType
+from apps.emps.models import EMP
 from apps.monitors.factories import MonitorFactory
 from apps.projects.factories import PlanFactory, ProjectFactory
+from apps.projects.models import Plan
 from apps.rigs.factories import CustomDrillshipFactory, CustomJackupRigFactory, CustomSemiRigFactory
-from apps.search.services import search
+from apps.search.services import (
+    ReindexChunk,
+    get_reindex_chunks,
+    get_search_results,
+    reindex,
+    reindex_chunk,
+    search,
+)
 from apps.tenants.factories import TenantFactory, UserFactory
 from apps.wells.factories import CustomWellFactory, WellPlannerFactory
 
@@ -183,3 +196,103 @@ class TestSearch:
         assert result.name == well_plan.name.name
         assert result.type == 'Well plan'
         assert result.url == DashboardRoutes.updateWellPlan.format(wellPlanId=well_plan.pk)
+
+
+@pytest.mark.django_db(transaction=True)
+class TestGetSearchResults:
+    def test_should_cache_results(self, clear_haystack, mocker: MockerFixture):
+        tenant = TenantFactory()
+        user = UserFactory()
+        plan = PlanFactory(project__tenant=tenant, name='Test plan')
+        search_mock = mocker.patch('apps.search.services.search', wraps=search)
+
+        results = get_search_results(user=user, tenant=tenant, query='Plan ')
+        cached_results = get_search_results(user=user, tenant=tenant, query='  plan')
+
+        assert results == [
+            {
+                'id': f'projects.plan.{plan.pk}',
+                'url': DashboardRoutes.updatePlan.format(projectId=plan.project_id, planId=plan.pk),
+                'type': 'Plan',
+                'name': plan.name,
+            }
+        ]
+        assert cached_results == results
+        assert search_mock.call_count == 1
+
+    def test_should_invalidate_results_on_tenant_index_update(self, clear_haystack, mocker: MockerFixture):
+        tenant = TenantFactory()
+        user = UserFactory()
+        PlanFactory(project__tenant=tenant, name='Test plan')
+        search_mock = mocker.patch('apps.search.services.search', wraps=search)
+
+        get_search_results(user=user, tenant=tenant, query='plan')
+        PlanFactory(name='Other tenant plan')
+        get_search_results(user=user, tenant=tenant, query='plan')
+
+        assert search_mock.call_count == 1
+
+        PlanFactory(project__tenant=tenant, name='Second plan')
+        results = get_search_results(user=user, tenant=tenant, query='plan')
+
+        assert search_mock.call_count == 2
+        assert len(results) == 2
+
+    def test_should_limit_results(self, clear_haystack, settings):
+        settings.SEARCH_RESULT_WINDOW = 2
+        tenant = TenantFactory()
+        PlanFactory.create_batch(3, project__tenant=tenant, name='Test plan')
+
+        assert len(get_search_results(user=UserFactory(), tenant=tenant, query='plan')) == 2
+
+
+@pytest.mark.django_db
+class TestReindex:
+    def get_index(self, model):
+        return connections[DEFAULT_ALIAS].get_unified_index().get_index(model)
+
+    def test_get_reindex_chunks(self):
+        plans = sorted(PlanFactory.create_batch(5), key=lambda plan: plan.pk)
+
+        chunks = list(get_reindex_chunks(self.get_index(Plan), using=DEFAULT_ALIAS, chunk_size=2))
+
+        assert chunks == [
+            ReindexChunk(model_label='projects.plan', using=DEFAULT_ALIAS, start_pk=None, end_pk=plans[1].pk),
+            ReindexChunk(model_label='projects.plan', using=DEFAULT_ALIAS, start_pk=plans[1].pk, end_pk=plans[3].pk),
+            ReindexChunk(model_label='projects.plan', using=DEFAULT_ALIAS, start_pk=plans[3].pk, end_pk=plans[4].pk),
+        ]
+
+    @pytest.mark.parametrize('RigFactory', (CustomJackupRigFactory, CustomSemiRigFactory, CustomDrillshipFactory))
+    def test_reindex_chunk_should_not_query_relations(self, RigFactory, django_assert_num_queries):
+        rigs = RigFactory.create_batch(3, project=ProjectFactory())
+        emp_pks = sorted(rig.emp.pk for rig in rigs)
+        chunk = ReindexChunk(model_label='emps.emp', using=DEFAULT_ALIAS, start_pk=None, end_pk=emp_pks[-1])
+
+        with django_assert_num_queries(1):
+            assert reindex_chunk(chunk) == 3
+
+    def test_reindex_emp_tenant_without_rig_lookup(self, django_assert_num_queries):
+        rig = CustomSemiRigFactory()
+        emp = EMP.objects.get(pk=rig.emp.pk)
+        index = self.get_index(EMP)
+
+        with django_assert_num_queries(0):
+            assert index.fields['tenant_id'].prepare(emp) == rig.tenant_id
+
+    def test_reindex(self, clear_haystack):
+        plans = PlanFactory.create_batch(5)
+        call_command('clear_index', interactive=False)
+
+        assert reindex(self.get_index(Plan), using=DEFAULT_ALIAS, chunk_size=2) == 5
+
+        results = SearchQuerySet().models(Plan)
+        assert sorted(result.pk for result in results) == sorted(str(plan.pk) for plan in plans)
+
+    def test_reindex_search_command(self, clear_haystack, capsys):
+        CustomJackupRigFactory(project=ProjectFactory())
+        call_command('clear_index', interactive=False)
+
+        call_command('reindex_search', 'emps.emp', chunk_size=10)
+
+        assert SearchQuerySet().models(EMP).count() == 1
+        assert 'emps.emp: indexed 1 documents' in capsys.readouterr().out
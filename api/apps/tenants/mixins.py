@@ -1,20 +1,43 @@
 from django import forms
+from django.http import Http404
 from django.utils.functional import cached_property
 from django.views import View
 from rest_framework.generics import get_object_or_404
 
 from apps.tenants.models import Tenant, TenantUserRelation, UserRole
+from apps.tenants.services import get_tenant_memberships
 
 
-class TenantUserMixin(View):
+class TenantMembershipMixin(View):
+    @cached_property
+    def tenant_membership(self) -> TenantUserRelation | None:
+        """
+        Relation of the request user to the tenant of the request, shared by the tenant mixins.
+        The cached tenant memberships skip the query for tenants the user does not belong to.
+        """
+        user = self.request.user
+        tenant_id = int(self.kwargs['tenant_id'])
+        if not user.is_authenticated or tenant_id not in get_tenant_memberships(user):
+            return None
+
+        return (
+            TenantUserRelation.objects.select_related('tenant', 'user').filter(tenant_id=tenant_id, user=user).first()
+        )
+
+
+class TenantUserMixin(TenantMembershipMixin):
     @cached_property
     def tenant_user(self) -> TenantUserRelation:
-        return get_object_or_404(TenantUserRelation, tenant_id=self.kwargs['tenant_id'], user=self.request.user)
+        if self.tenant_membership is None:
+            raise Http404
+        return self.tenant_membership
 
 
-class TenantMixin(View):
+class TenantMixin(TenantMembershipMixin):
     @cached_property
     def tenant(self) -> Tenant:
+        if self.tenant_membership is not None:
+            return self.tenant_membership.tenant
         return get_object_or_404(Tenant, pk=self.kwargs['tenant_id'])
 
 
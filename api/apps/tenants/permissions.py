@@ -2,7 +2,8 @@ from django.http import HttpRequest
 from rest_framework.permissions import BasePermission
 from rest_framework.views import APIView
 
-from apps.tenants.models import TenantUserRelation, User, UserRole
+from apps.tenants.models import User, UserRole
+from apps.tenants.services import get_tenant_memberships
 
 
 class IsTenantUser(BasePermission):
@@ -18,10 +19,7 @@ class IsTenantUser(BasePermission):
         if tenant_id is None:
             return False
 
-        return TenantUserRelation.objects.filter(
-            user=user,
-            tenant_id=tenant_id,
-        ).exists()
+        return int(tenant_id) in get_tenant_memberships(user)
 
 
 class IsAdminUser(BasePermission):
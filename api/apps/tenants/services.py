@@ -6,6 +6,7 @@ from typing import cast
 from django.conf import settings
 from django.contrib.auth import authenticate, login, password_validation, update_session_auth_hash, user_login_failed
 from django.contrib.auth.tokens import default_token_generator
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import UploadedFile
 from django.core.mail import send_mail
@@ -24,6 +25,29 @@ from apps.tenants.models import Tenant, TenantInvitation, TenantUserRelation, Us
 logger = logging.getLogger(__name__)
 
 
+def tenant_memberships_key(user_id: int) -> str:
+    return f'tenant-memberships/{user_id}'
+
+
+def get_tenant_memberships(user: User) -> dict[int, str]:
+    """
+    Return a map of tenant ids to the user's role within each tenant.
+    """
+    memberships_key = tenant_memberships_key(user.pk)
+    memberships: dict[int, str] | None = cache.get(memberships_key)
+
+    if memberships is None:
+        memberships = dict(TenantUserRelation.objects.filter(user=user).values_list('tenant_id', 'role'))
+        cache.set(memberships_key, memberships, settings.TENANT_MEMBERSHIPS_CACHE_TIMEOUT)
+
+    return memberships
+
+
+def clear_tenant_memberships(user_id: int) -> None:
+    logger.info(f'Clearing cached tenant memberships for User(pk={user_id}).')
+    cache.delete(tenant_memberships_key(user_id))
+
+
 def send_tenant_is_ready_email(tenant: Tenant) -> int:
     if not tenant.is_active:
         raise ValueError(f'Unable to send the email for tenant "{tenant.name}". Inactive tenant.')
@@ -1,11 +1,31 @@
+from typing import Type
+
 from axes.signals import user_locked_out
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.request import Request
 
+from apps.tenants.models import TenantUserRelation
+from apps.tenants.services import clear_tenant_memberships
+
 
 @receiver(user_locked_out)
 def raise_permission_denied(*args, **kwargs):
     if isinstance(kwargs['request'], Request):
         # throw PermissionDenied only for requests from DRF
         raise PermissionDenied("Too many failed login attempts")
+
+
+@receiver(post_save, sender=TenantUserRelation)
+def post_save_tenant_user(sender: Type[TenantUserRelation], instance: TenantUserRelation, **kwargs: dict) -> None:
+    # covers create_tenant_user, accepted invitations, sign ups and admin changes
+    # cleared after commit, so concurrent requests can't cache the memberships from before the change
+    transaction.on_commit(lambda: clear_tenant_memberships(instance.user_id))
+
+
+@receiver(post_delete, sender=TenantUserRelation)
+def post_delete_tenant_user(sender: Type[TenantUserRelation], instance: TenantUserRelation, **kwargs: dict) -> None:
+    # covers deleted accounts and admin changes
+    transaction.on_commit(lambda: clear_tenant_memberships(instance.user_id))
@@ -0,0 +1,43 @@
+import pytest
+from django.http import Http404
+from django.test import RequestFactory
+from rest_framework.views import APIView
+
+from apps.tenants.factories import TenantFactory, TenantUserRelationFactory, UserFactory
+from apps.tenants.mixins import TenantMixin, TenantUserMixin
+from apps.tenants.services import get_tenant_memberships
+
+
+class TenantView(TenantUserMixin, TenantMixin, APIView):
+    pass
+
+
+def get_view(*, user, tenant_id: int) -> TenantView:
+    request = RequestFactory().get('/')
+    request.user = user
+    return TenantView(request=request, kwargs={'tenant_id': str(tenant_id)})
+
+
+@pytest.mark.django_db
+class TestTenantMixins:
+    def test_should_resolve_tenant_and_tenant_user_with_single_query(self, django_assert_num_queries):
+        tenant_user = TenantUserRelationFactory()
+        get_tenant_memberships(tenant_user.user)
+        view = get_view(user=tenant_user.user, tenant_id=tenant_user.tenant_id)
+
+        with django_assert_num_queries(1):
+            assert view.tenant_user == tenant_user
+            assert view.tenant == tenant_user.tenant
+
+    def test_should_not_query_tenant_user_of_other_tenant(self, django_assert_num_queries):
+        user = UserFactory()
+        tenant = TenantFactory()
+        get_tenant_memberships(user)
+        view = get_view(user=user, tenant_id=tenant.pk)
+
+        with django_assert_num_queries(0):
+            with pytest.raises(Http404):
+                view.tenant_user
+
+        with django_assert_num_queries(1):
+            assert view.tenant == tenant
@@ -5,6 +5,7 @@ from unittest.mock import MagicMock
 import pytest
 from django.contrib import auth
 from django.core import mail
+from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.http import HttpRequest
@@ -28,12 +29,14 @@ from apps.tenants.services import (
     decode_password_reset_token,
     expire_invitation,
     generate_password_reset_token,
+    get_tenant_memberships,
     invite_tenant_user,
     login_tenant_user,
     reset_password,
     send_password_reset_email,
     send_tenant_is_ready_email,
     signup_user,
+    tenant_memberships_key,
     update_user_avatar,
     update_user_profile,
 )
@@ -569,3 +572,76 @@ class TestUpdateUserAvatar:
 
         assert updated_user.pk == user.pk
         assert updated_user.profile_image.file.read() == b"test-file-content"
+
+
+@pytest.mark.django_db
+class TestGetTenantMemberships:
+    def test_should_return_tenant_roles(self):
+        user = UserFactory()
+        admin_tenant_user = TenantUserRelationFactory(user=user, role=TenantUserRelation.TenantUserRole.ADMIN)
+        member_tenant_user = TenantUserRelationFactory(user=user, role=TenantUserRelation.TenantUserRole.MEMBER)
+        TenantUserRelationFactory()
+
+        assert get_tenant_memberships(user) == {
+            admin_tenant_user.tenant_id: TenantUserRelation.TenantUserRole.ADMIN,
+            member_tenant_user.tenant_id: TenantUserRelation.TenantUserRole.MEMBER,
+        }
+
+    def test_should_cache_tenant_roles(self, django_assert_num_queries):
+        tenant_user = TenantUserRelationFactory()
+
+        with django_assert_num_queries(1):
+            get_tenant_memberships(tenant_user.user)
+            get_tenant_memberships(tenant_user.user)
+
+        assert cache.get(tenant_memberships_key(tenant_user.user.pk)) == {tenant_user.tenant_id: tenant_user.role}
+
+    def test_should_clear_cache_on_create_tenant_user(self, django_capture_on_commit_callbacks):
+        user = UserFactory()
+        tenant = TenantFactory()
+
+        assert get_tenant_memberships(user) == {}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            create_tenant_user(tenant=tenant, user=user)
+
+        assert get_tenant_memberships(user) == {tenant.pk: TenantUserRelation.TenantUserRole.MEMBER}
+
+    def test_should_clear_cache_on_accept_tenant_invitation(self, django_capture_on_commit_callbacks):
+        user = UserFactory()
+        invitation = TenantInvitationFactory(email=user.email)
+
+        assert get_tenant_memberships(user) == {}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            accept_tenant_invitation(invitation)
+
+        assert get_tenant_memberships(user) == {invitation.tenant_id: TenantUserRelation.TenantUserRole.MEMBER}
+
+    def test_should_clear_cache_on_delete_tenant_user(self, django_capture_on_commit_callbacks):
+        tenant_user = TenantUserRelationFactory()
+        user = tenant_user.user
+
+        assert get_tenant_memberships(user) == {tenant_user.tenant_id: tenant_user.role}
+
+        with django_capture_on_commit_callbacks(execute=True):
+            TenantUserRelation.objects.filter(user=user).delete()
+
+        assert get_tenant_memberships(user) == {}
+
+    def test_should_clear_cache_after_commit(self, django_capture_on_commit_callbacks):
+        tenant_user = TenantUserRelationFactory()
+        user = tenant_user.user
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            TenantUserRelation.objects.filter(user=user).delete()
+            # a concurrent request caching memberships before commit
+            cache.set(tenant_memberships_key(user.pk), {tenant_user.tenant_id: tenant_user.role})
+
+        assert len(callbacks) == 1
+        assert cache.get(tenant_memberships_key(user.pk)) == {tenant_user.tenant_id: tenant_user.role}
+
+        callbacks[0]()
+
+        assert cache.get(tenant_memberships_key(user.pk)) is None
+        assert get_tenant_memberships(user) == {}
@@ -1,9 +1,12 @@
 import logging
-from typing import cast
+from functools import partial
+from typing import Callable, Iterable, cast
 
 from django.db import models
 from django.db.models import QuerySet
+from django.http import StreamingHttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
+from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema
 from rest_framework import filters
 from rest_framework.generics import ListAPIView, RetrieveAPIView, get_object_or_404
@@ -12,6 +15,8 @@ from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from apps.core.api.mixins import DraftMixin
+from apps.core.api.serializers import ExportParametersSerializer
+from apps.core.export import export_response
 from apps.emissions.models import BaselineInput, CustomMode, CustomPhase
 from apps.emissions.serializers import EmissionReductionInitiativeListSerializer
 from apps.monitors.models import MonitorFunctionType
@@ -25,6 +30,8 @@ from apps.wells.serializers import (
     ApproveWellPlannerCompleteHelicopterUsesSerializer,
     ApproveWellPlannerCompleteStepsSerializer,
     ApproveWellPlannerCompleteVesselUsesSerializer,
+    BulkUpdateWellPlannerPlannedStepsResultSerializer,
+    BulkUpdateWellPlannerPlannedStepsSerializer,
     ConceptWellDetailsSerializer,
     ConceptWellListSerializer,
     CreateCustomWellSerializerFactory,
@@ -52,10 +59,15 @@ from apps.wells.serializers import (
     WellReferenceMaterialSerializer,
 )
 from apps.wells.services.api import (
+    WELL_PLANNER_CO2_DATASET_EXPORT_HEADER,
+    WELL_PLANNER_SAVED_CO2_DATASET_EXPORT_HEADER,
+    WellPlannerCo2Dataset,
+    WellPlannerStepCo2Dataset,
     approve_well_planner_complete_helicopter_uses,
     approve_well_planner_complete_steps,
     approve_well_planner_complete_vessel_uses,
     available_emission_reduction_initiatives,
+    bulk_update_well_planner_planned_steps,
     complete_well_planner_planning,
     complete_well_planner_reviewing,
     create_custom_well,
@@ -66,6 +78,7 @@ from apps.wells.services.api import (
     delete_well_planner_planned_step,
     duplicate_well_planner_complete_step,
     duplicate_well_planner_planned_step,
+    get_well_planner_co2_dataset_export_row,
     get_well_planner_measured_co2_dataset,
     get_well_planner_measured_summary,
     get_well_planner_measurement_dataset,
@@ -73,6 +86,8 @@ from apps.wells.services.api import (
     get_well_planner_planned_step_co2,
     get_well_planner_saved_co2_dataset,
     get_well_planner_summary,
+    iter_well_planner_measured_co2_dataset,
+    iter_well_planner_planned_co2_dataset,
     move_well_planner_complete_step,
     move_well_planner_planned_step,
     update_custom_well,
@@ -264,6 +279,35 @@ class DeleteWellPlannerPlannedStepApi(WellPlannerMixin, APIView):
         return Response(status=204)
 
 
+class BulkUpdateWellPlannerPlannedStepsApi(WellPlannerMixin, APIView):
+    permission_classes = [IsTenantUser]
+
+    @extend_schema(
+        request=BulkUpdateWellPlannerPlannedStepsSerializer,
+        responses={200: BulkUpdateWellPlannerPlannedStepsResultSerializer},
+        summary="Bulk update well planner planned steps",
+    )
+    def post(self, request: Request, *args: str, **kwargs: str) -> Response:
+        serializer = BulkUpdateWellPlannerPlannedStepsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        operations = serializer.validated_data['operations']
+        planned_steps = bulk_update_well_planner_planned_steps(
+            well_planner=self.well_planner, user=cast(User, request.user), operations=operations
+        )
+
+        response_data = BulkUpdateWellPlannerPlannedStepsResultSerializer(
+            {
+                'results': [
+                    {'type': operation['type'], 'step': planned_step.pk if planned_step else None}
+                    for operation, planned_step in zip(operations, planned_steps)
+                ],
+                'well_planner': self.well_planner,
+            }
+        ).data
+        return Response(response_data, status=200)
+
+
 class WellPlannerPlannedCo2Api(WellPlannerMixin, APIView):
     permission_classes = [IsTenantUser]
 
@@ -425,6 +469,7 @@ class CompleteWellPlannerCompleteApi(WellPlannerMixin, APIView):
 
 class WellPlannerCompleteSummaryApi(WellPlannerMixin, APIView):
     permission_classes = [IsTenantUser]
+    use_replica = True
 
     @extend_schema(
         responses={200: WellPlannerCompleteSummarySerializer},
@@ -439,6 +484,7 @@ class WellPlannerCompleteSummaryApi(WellPlannerMixin, APIView):
 
 class WellPlannerMeasuredCo2Api(WellPlannerMixin, APIView):
     permission_classes = [IsTenantUser]
+    use_replica = True
 
     @extend_schema(
         responses={200: WellPlannerCO2DatasetSerializer(many=True)},
@@ -457,6 +503,71 @@ class WellPlannerMeasuredCo2Api(WellPlannerMixin, APIView):
         return Response(response_data, status=200)
 
 
+class BaseWellPlannerCo2ExportApi(WellPlannerMixin, APIView):
+    permission_classes = [IsTenantUser]
+    use_replica = True
+    export_name: str
+    export_header = WELL_PLANNER_CO2_DATASET_EXPORT_HEADER
+    # called with the well planner and the optional start and end date
+    export_dataset: Callable[..., Iterable[WellPlannerCo2Dataset | WellPlannerStepCo2Dataset]]
+
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        parameters_serializer = StartEndDateParametersSerializer(data=request.GET)
+        parameters_serializer.is_valid(raise_exception=True)
+        export_parameters_serializer = ExportParametersSerializer(data=request.GET)
+        export_parameters_serializer.is_valid(raise_exception=True)
+
+        dataset = self.export_dataset(well_planner=self.well_planner, **parameters_serializer.validated_data)
+
+        return export_response(
+            rows=map(get_well_planner_co2_dataset_export_row, dataset),
+            header=self.export_header,
+            filename=f'well-{self.well_planner.pk}-{self.export_name}',
+            export_format=export_parameters_serializer.validated_data['file_format'],
+            gzip=export_parameters_serializer.validated_data['gzip'],
+        )
+
+
+class WellPlannerPlannedCo2ExportApi(BaseWellPlannerCo2ExportApi):
+    export_name = 'planned-co2'
+    export_dataset = partial(iter_well_planner_planned_co2_dataset, improved=True)
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[StartEndDateParametersSerializer, ExportParametersSerializer],
+        summary="Export well planner planned CO2 dataset",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
+
+
+class WellPlannerPlannedCo2SavedExportApi(BaseWellPlannerCo2ExportApi):
+    export_name = 'planned-co2-saved'
+    export_header = WELL_PLANNER_SAVED_CO2_DATASET_EXPORT_HEADER
+    export_dataset = staticmethod(get_well_planner_saved_co2_dataset)
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[StartEndDateParametersSerializer, ExportParametersSerializer],
+        summary="Export well planner planned CO2 saved dataset",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
+
+
+class WellPlannerMeasuredCo2ExportApi(BaseWellPlannerCo2ExportApi):
+    export_name = 'measured-co2'
+    export_dataset = staticmethod(iter_well_planner_measured_co2_dataset)
+
+    @extend_schema(
+        responses={200: OpenApiTypes.BINARY},
+        parameters=[StartEndDateParametersSerializer, ExportParametersSerializer],
+        summary="Export well planner measured CO2 dataset",
+    )
+    def get(self, request: Request, *args: str, **kwargs: str) -> StreamingHttpResponse:
+        return super().get(request, *args, **kwargs)
+
+
 class BaseWellPlannerMeasurementApi(WellPlannerMixin, APIView):
     permission_classes = [IsTenantUser]
     MONITOR_FUNCTION_TYPE: MonitorFunctionType
@@ -20,9 +20,8 @@ class CustomWellRigIndex(CelerySearchIndex, indexes.Indexable):
         return self.get_model().objects.all()
 
     def prepare_url(self, obj: CustomWell) -> str:
-        project = obj.project
-        if project:
-            return DashboardRoutes.projectWell.format(projectId=project.pk, wellId=obj.pk)
+        if obj.project_id:
+            return DashboardRoutes.projectWell.format(projectId=obj.project_id, wellId=obj.pk)
         return DashboardRoutes.well.format(wellId=obj.pk)
 
 
@@ -38,7 +37,7 @@ class WellPlannerIndex(CelerySearchIndex, indexes.Indexable):
         return WellPlanner
 
     def index_queryset(self, using=None):
-        return self.get_model().objects.all()
+        return self.get_model().objects.select_related('name', 'asset')
 
     def prepare_url(self, obj: WellPlanner) -> str:
         return DashboardRoutes.updateWellPlan.format(wellPlanId=obj.pk)
@@ -32,6 +32,7 @@ from apps.wells.models import (
     WellPlannerPlannedStep,
     WellReferenceMaterial,
 )
+from apps.wells.services.api import WellPlannerPlannedStepOperationType
 
 
 class CustomWellListSerializer(serializers.ModelSerializer):
@@ -724,6 +725,49 @@ class MoveWellPlannerStepSerializer(serializers.Serializer):
     order = serializers.IntegerField(validators=[MinValueValidator(0)])
 
 
+class WellPlannerPlannedStepOperationSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=WellPlannerPlannedStepOperationType.choices)
+    step = serializers.IntegerField(required=False)
+    order = serializers.IntegerField(required=False, validators=[MinValueValidator(0)])
+    data = serializers.JSONField(required=False)
+
+    def validate(self, attrs: dict[str, Any]) -> dict[str, Any]:
+        operation_type = attrs['type']
+
+        if operation_type != WellPlannerPlannedStepOperationType.CREATE and 'step' not in attrs:
+            raise serializers.ValidationError({'step': 'This field is required.'})
+
+        if operation_type == WellPlannerPlannedStepOperationType.MOVE and 'order' not in attrs:
+            raise serializers.ValidationError({'order': 'This field is required.'})
+
+        data_serializer_class = {
+            WellPlannerPlannedStepOperationType.CREATE: CreateWellPlannerPlannedStepSerializer,
+            WellPlannerPlannedStepOperationType.UPDATE: UpdateWellPlannerPlannedStepSerializer,
+        }.get(operation_type)
+
+        if data_serializer_class:
+            data_serializer = data_serializer_class(data=attrs.get('data', {}))
+            if not data_serializer.is_valid():
+                raise serializers.ValidationError({'data': data_serializer.errors})
+            attrs['data'] = data_serializer.validated_data
+
+        return attrs
+
+
+class BulkUpdateWellPlannerPlannedStepsSerializer(serializers.Serializer):
+    operations = WellPlannerPlannedStepOperationSerializer(many=True, allow_empty=False)
+
+
+class WellPlannerPlannedStepOperationResultSerializer(serializers.Serializer):
+    type = serializers.ChoiceField(choices=WellPlannerPlannedStepOperationType.choices)
+    step = serializers.IntegerField(allow_null=True)
+
+
+class BulkUpdateWellPlannerPlannedStepsResultSerializer(serializers.Serializer):
+    results = WellPlannerPlannedStepOperationResultSerializer(many=True)
+    well_planner = WellPlannerDetailsSerializer()
+
+
 class WellReferenceMaterialSerializer(serializers.ModelSerializer):
     class Meta:
         model = WellReferenceMaterial
@@ -5,7 +5,7 @@ from typing import Any, Generator, TypedDict, TypeVar, cast
 import pytz
 from django.core.exceptions import ValidationError
 from django.db import models, transaction
-from django.db.models import Avg, DateTimeField, F, FloatField, OuterRef, QuerySet, Subquery
+from django.db.models import Avg, DateTimeField, ExpressionWrapper, F, FloatField, OuterRef, QuerySet, Subquery
 from django.db.models.functions import Coalesce
 from django_generate_series.models import generate_series
 
@@ -19,7 +19,7 @@ from apps.emissions.models import (
     EmissionReductionInitiative,
 )
 from apps.emissions.models.assets import MaterialType
-from apps.emissions.services.wells import calculate_planned_emissions
+from apps.emissions.services.wells import calculate_planned_emissions, recalculate_moved_planned_steps
 from apps.monitors.models import MonitorFunctionType, MonitorFunctionValue
 from apps.projects.models import Project
 from apps.rigs.tasks import sync_all_custom_well_co2_calculations_task, sync_all_plan_co2_calculations_task
@@ -40,8 +40,10 @@ from apps.wells.services.co2calculator import (
     calculate_planned_step_improved_duration,
     calculate_well_planner_co2_improvement,
     calculate_well_planner_step_co2,
+    get_co2_planned_steps,
     get_seasons_duration,
     multiply_well_planner_step_co2,
+    prefetch_well_planner_steps_co2,
 )
 
 logger = logging.getLogger(__name__)
@@ -226,6 +228,7 @@ def create_well_planner_planned_step(
     external_energy_supply_enabled: bool,
     external_energy_supply_quota: bool,
     carbon_capture_storage_system_quantity: float | None = None,
+    calculate_emissions: bool = True,
 ) -> WellPlannerPlannedStep:
     logger.info(
         f"User(pk={user.pk}) is creating WellPlannerPlannedStep(phase={phase}, mode={mode}) in WellPlanner(pk={well_planner.pk})."
@@ -261,7 +264,8 @@ def create_well_planner_planned_step(
 
     logger.info(f"WellPlannerPlannedStep(pk={planned_step.pk}) has been created.")
 
-    calculate_planned_emissions(well_planner)
+    if calculate_emissions:
+        calculate_planned_emissions(well_planner)
 
     return cast(WellPlannerPlannedStep, planned_step)
 
@@ -288,6 +292,7 @@ def update_well_planner_planned_step(
     external_energy_supply_enabled: bool,
     external_energy_supply_quota: bool,
     carbon_capture_storage_system_quantity: float | None = None,
+    calculate_emissions: bool = True,
 ) -> WellPlannerPlannedStep:
     logger.info(f"User(pk={user.pk}) is updating WellPlannerPlannedStep(pk={planned_step.pk}).")
 
@@ -321,7 +326,8 @@ def update_well_planner_planned_step(
 
     logger.info(f"WellPlannerPlannedStep(pk={planned_step.pk}) has been updated.")
 
-    calculate_planned_emissions(planned_step.well_planner)
+    if calculate_emissions:
+        calculate_planned_emissions(planned_step.well_planner)
 
     return planned_step
 
@@ -332,7 +338,9 @@ def update_well_planner_planned_step(
     get_well=lambda *args, **kwargs: kwargs['planned_step'].well_planner,
     error='Phase cannot be deleted right now.',
 )
-def delete_well_planner_planned_step(*, planned_step: WellPlannerPlannedStep, user: User) -> None:
+def delete_well_planner_planned_step(
+    *, planned_step: WellPlannerPlannedStep, user: User, calculate_emissions: bool = True
+) -> None:
     logger.info(f"User(pk={user.pk}) is deleting WellPlannerPlannedStep(pk={planned_step.pk}).")
     well_plan = planned_step.well_planner
 
@@ -340,7 +348,8 @@ def delete_well_planner_planned_step(*, planned_step: WellPlannerPlannedStep, us
 
     logger.info(f"WellPlannerPlannedStep(pk={planned_step.pk}) has been deleted.")
 
-    calculate_planned_emissions(well_plan)
+    if calculate_emissions:
+        calculate_planned_emissions(well_plan)
 
 
 WellPlannerStepType = TypeVar('WellPlannerStepType', bound=BaseWellPlannerStep)
@@ -526,24 +535,23 @@ def get_well_planner_daily_co2_dataset(
     return dataset
 
 
-def get_well_planner_planned_co2_dataset(
+def iter_well_planner_planned_co2_dataset(
     *,
     well_planner: WellPlanner,
     improved: bool,
     start_date: datetime.datetime | None = None,
     end_date: datetime.datetime | None = None,
-) -> list[WellPlannerStepCo2Dataset]:
+) -> Generator[WellPlannerStepCo2Dataset, None, None]:
     def get_step_duration(step: WellPlannerPlannedStep) -> float:
         if improved:
             return step.improved_duration
         return step.total_duration
 
     logger.info(f"Generating well planner planned CO2 dataset for WellPlanner(pk={well_planner.pk}).")
-    well_planner_planned_steps = well_planner.planned_steps.order_by('order')  # type: ignore
+    well_planner_planned_steps = get_co2_planned_steps(well_planner)
 
     total_well_planner_duration = sum(get_step_duration(step) for step in well_planner_planned_steps)
 
-    dataset: list[WellPlannerStepCo2Dataset] = []
     plan_start_date = datetime.datetime(
         day=well_planner.planned_start_date.day,
         month=well_planner.planned_start_date.month,
@@ -568,36 +576,87 @@ def get_well_planner_planned_co2_dataset(
         )
 
         if start_date and end_date:
-            dataset.extend(
-                map(
-                    lambda data: WellPlannerStepCo2Dataset(**data, step=planned_step),  # type: ignore
-                    get_well_planner_hourly_co2_dataset(
-                        start_date=start_date,
-                        end_date=end_date,
-                        plan_start_date=plan_start_date,
-                        step_co2=well_planner_step_co2,
-                        step_duration=step_duration,
-                        step_waiting_duration=processed_duration,
-                    ),
-                )
+            step_dataset = get_well_planner_hourly_co2_dataset(
+                start_date=start_date,
+                end_date=end_date,
+                plan_start_date=plan_start_date,
+                step_co2=well_planner_step_co2,
+                step_duration=step_duration,
+                step_waiting_duration=processed_duration,
             )
         else:
-            dataset.extend(
-                map(
-                    lambda data: WellPlannerStepCo2Dataset(**data, step=planned_step),  # type: ignore
-                    get_well_planner_daily_co2_dataset(
-                        plan_start_date=plan_start_date,
-                        step_co2=well_planner_step_co2,
-                        step_duration=step_duration,
-                        step_waiting_duration=processed_duration,
-                    ),
-                )
+            step_dataset = get_well_planner_daily_co2_dataset(
+                plan_start_date=plan_start_date,
+                step_co2=well_planner_step_co2,
+                step_duration=step_duration,
+                step_waiting_duration=processed_duration,
             )
 
+        for data in step_dataset:
+            yield WellPlannerStepCo2Dataset(**data, step=planned_step)  # type: ignore
+
         processed_duration += step_duration
 
     logger.info(f"Well planner dataset for WellPlanner(pk={well_planner.pk}) has been generated.")
-    return dataset
+
+
+def get_well_planner_planned_co2_dataset(
+    *,
+    well_planner: WellPlanner,
+    improved: bool,
+    start_date: datetime.datetime | None = None,
+    end_date: datetime.datetime | None = None,
+) -> list[WellPlannerStepCo2Dataset]:
+    return list(
+        iter_well_planner_planned_co2_dataset(
+            well_planner=well_planner, improved=improved, start_date=start_date, end_date=end_date
+        )
+    )
+
+
+WELL_PLANNER_SAVED_CO2_DATASET_EXPORT_HEADER = [
+    'date',
+    'rig',
+    'vessels',
+    'helicopters',
+    'external_energy_supply',
+    'cement',
+    'steel',
+    'emission_reduction_initiatives',
+]
+WELL_PLANNER_CO2_DATASET_EXPORT_HEADER = [
+    'date',
+    'step',
+    'phase',
+    'mode',
+    *WELL_PLANNER_SAVED_CO2_DATASET_EXPORT_HEADER[1:],
+]
+
+
+def get_well_planner_co2_dataset_export_row(
+    entry: WellPlannerCo2Dataset | WellPlannerStepCo2Dataset,
+) -> dict[str, Any]:
+    row: dict[str, Any] = dict(
+        date=entry['date'],
+        rig=entry['rig'],
+        vessels=entry['vessels'],
+        helicopters=entry['helicopters'],
+        external_energy_supply=entry['external_energy_supply'],
+        cement=entry['cement'],
+        steel=entry['steel'],
+        emission_reduction_initiatives=sum(
+            (
+                emission_reduction_initiative['value']
+                for emission_reduction_initiative in entry['emission_reduction_initiatives']
+            ),
+            0.0,
+        ),
+    )
+
+    if step := cast(BaseWellPlannerStep | None, entry.get('step')):
+        row.update(step=step.pk, phase=step.phase.name, mode=step.mode.name)
+
+    return row
 
 
 def get_well_planner_planned_duration(well_planner: WellPlanner) -> tuple[float, float]:
@@ -650,7 +709,7 @@ def get_well_planner_summary(well_planner: WellPlanner) -> WellPlannerSummary:
         total_target=0.0,
         total_improved_duration=total_improved_duration,
     )
-    well_planner_planned_steps = well_planner.planned_steps.order_by('order')  # type: ignore
+    well_planner_planned_steps = get_co2_planned_steps(well_planner)
     seasons_duration = get_seasons_duration(
         [(step.improved_duration, step.season) for step in well_planner_planned_steps]
     )
@@ -939,20 +998,21 @@ def get_well_planner_hourly_measured_co2_dataset(
     return dataset
 
 
-def get_well_planner_measured_co2_dataset(
+def iter_well_planner_measured_co2_dataset(
     *, well_planner: WellPlanner, start_date: datetime.datetime | None = None, end_date: datetime.datetime | None = None
-) -> list[WellPlannerStepCo2Dataset]:
+) -> Generator[WellPlannerStepCo2Dataset, None, None]:
     logger.info(f"Generating well planner measured dataset for WellPlanner(pk={well_planner.pk}).")
 
     assert well_planner.actual_start_date, f"WellPlanner(pk={well_planner.pk}) is missing actual start date"
 
-    well_planner_complete_steps = well_planner.complete_steps.order_by('order')  # type: ignore
+    well_planner_complete_steps = prefetch_well_planner_steps_co2(
+        well_planner.complete_steps.order_by('order')  # type: ignore
+    )
     plan_duration = sum(complete_step.duration for complete_step in well_planner_complete_steps)
     seasons_duration = get_seasons_duration(
         [(complete_step.duration, complete_step.season) for complete_step in well_planner_complete_steps]
     )
 
-    dataset: list[WellPlannerStepCo2Dataset] = []
     plan_start_date = datetime.datetime(
         day=well_planner.actual_start_date.day,
         month=well_planner.actual_start_date.month,
@@ -966,33 +1026,36 @@ def get_well_planner_measured_co2_dataset(
         step_duration = complete_step.duration
 
         if start_date and end_date:
-            dataset.extend(
-                get_well_planner_hourly_measured_co2_dataset(
-                    start_date=start_date,
-                    end_date=end_date,
-                    complete_step=complete_step,
-                    plan_start_date=plan_start_date,
-                    plan_duration=plan_duration,
-                    season_duration=seasons_duration[complete_step.season],
-                    step_waiting_duration=processed_duration,
-                    step_duration=step_duration,
-                )
+            yield from get_well_planner_hourly_measured_co2_dataset(
+                start_date=start_date,
+                end_date=end_date,
+                complete_step=complete_step,
+                plan_start_date=plan_start_date,
+                plan_duration=plan_duration,
+                season_duration=seasons_duration[complete_step.season],
+                step_waiting_duration=processed_duration,
+                step_duration=step_duration,
             )
         else:
-            dataset.extend(
-                get_well_planner_daily_measured_co2_dataset(
-                    complete_step=complete_step,
-                    plan_start_date=plan_start_date,
-                    plan_duration=plan_duration,
-                    season_duration=seasons_duration[complete_step.season],
-                    step_waiting_duration=processed_duration,
-                    step_duration=step_duration,
-                )
+            yield from get_well_planner_daily_measured_co2_dataset(
+                complete_step=complete_step,
+                plan_start_date=plan_start_date,
+                plan_duration=plan_duration,
+                season_duration=seasons_duration[complete_step.season],
+                step_waiting_duration=processed_duration,
+                step_duration=step_duration,
             )
         processed_duration += step_duration
 
     logger.info(f"Well planner measured dataset for WellPlanner(pk={well_planner.pk}) has been generated.")
-    return dataset
+
+
+def get_well_planner_measured_co2_dataset(
+    *, well_planner: WellPlanner, start_date: datetime.datetime | None = None, end_date: datetime.datetime | None = None
+) -> list[WellPlannerStepCo2Dataset]:
+    return list(
+        iter_well_planner_measured_co2_dataset(well_planner=well_planner, start_date=start_date, end_date=end_date)
+    )
 
 
 def get_well_planner_measurement_daily_dataset(
@@ -1007,7 +1070,9 @@ def get_well_planner_measurement_daily_dataset(
             monitor_function__vessel__pk=vessel_id,
             monitor_function__type=monitor_function_type,
             monitor_function__draft=False,
-            date__date=OuterRef('term'),
+            # a range instead of date__date lets the lookup use the (monitor_function, date) index
+            date__gte=OuterRef('term'),
+            date__lt=ExpressionWrapper(OuterRef('term') + datetime.timedelta(days=1), output_field=DateTimeField()),
         )
         .values('date__date')
         .annotate(average=Coalesce(Avg('value'), 0, output_field=FloatField()))
@@ -1106,7 +1171,7 @@ def get_well_planner_measurement_dataset(
 def get_well_planner_measured_summary(well_planner: WellPlanner) -> WellPlannerMeasuredSummary:
     assert well_planner.actual_start_date, f"WellPlanner(pk={well_planner.pk}) is missing actual start date"
 
-    complete_steps = well_planner.complete_steps.order_by('order')  # type: ignore
+    complete_steps = prefetch_well_planner_steps_co2(well_planner.complete_steps.order_by('order'))  # type: ignore
     total_measured_duration = sum(complete_step.duration for complete_step in complete_steps)
     seasons_duration = get_seasons_duration(
         [(complete_step.duration, complete_step.season) for complete_step in complete_steps]
@@ -1123,7 +1188,7 @@ def get_well_planner_measured_summary(well_planner: WellPlanner) -> WellPlannerM
         day=well_planner.actual_start_date.day,
     )
 
-    for complete_step in well_planner.complete_steps.order_by('order'):  # type: ignore
+    for complete_step in complete_steps:
         measured_well_planner_step_co2 = calculate_measured_well_planner_step_co2(
             complete_step=complete_step,
             start=current_datetime,
@@ -1147,7 +1212,9 @@ def get_well_planner_measured_summary(well_planner: WellPlanner) -> WellPlannerM
     get_well=lambda *args, **kwargs: kwargs['planned_step'].well_planner,
     error='Step cannot be duplicated right now.',
 )
-def duplicate_well_planner_planned_step(*, planned_step: WellPlannerPlannedStep, user: User) -> WellPlannerPlannedStep:
+def duplicate_well_planner_planned_step(
+    *, planned_step: WellPlannerPlannedStep, user: User, calculate_emissions: bool = True
+) -> WellPlannerPlannedStep:
     logger.info(f"User(pk={user.pk}) is duplicating WellPlannerPlannedStep(pk={planned_step.pk}).")
     if planned_step.well_planner.current_step != WellPlannerWizardStep.WELL_PLANNING:
         logger.error(
@@ -1167,7 +1234,8 @@ def duplicate_well_planner_planned_step(*, planned_step: WellPlannerPlannedStep,
 
     duplicate_step.below(planned_step)
 
-    calculate_planned_emissions(planned_step.well_planner)
+    if calculate_emissions:
+        calculate_planned_emissions(planned_step.well_planner)
 
     return duplicate_step
 
@@ -1220,7 +1288,9 @@ def duplicate_well_planner_complete_step(
     get_well=lambda *args, **kwargs: kwargs['step'].well_planner,
     error='Step cannot be moved right now.',
 )
-def move_well_planner_planned_step(*, user: User, step: WellPlannerPlannedStep, order: int) -> WellPlannerPlannedStep:
+def move_well_planner_planned_step(
+    *, user: User, step: WellPlannerPlannedStep, order: int, calculate_emissions: bool = True
+) -> WellPlannerPlannedStep:
     well_plan = step.well_planner
     logger.info(
         f'User(pk={user.pk}) is moving WellPlannerPlannedStep(pk={step.pk}) to position {order} '
@@ -1233,15 +1303,105 @@ def move_well_planner_planned_step(*, user: User, step: WellPlannerPlannedStep,
         )
         raise ValidationError("Step cannot be moved right now.")
 
+    previous_order = step.order
     step.to(order=order)
 
     logger.info('Moved step')
 
-    calculate_planned_emissions(well_plan)
+    if calculate_emissions:
+        recalculate_moved_planned_steps(
+            well_plan=well_plan,
+            first_order=min(previous_order, step.order),
+            last_order=max(previous_order, step.order),
+        )
 
     return step
 
 
+class WellPlannerPlannedStepOperationType(models.TextChoices):
+    CREATE = "CREATE", "Create"
+    UPDATE = "UPDATE", "Update"
+    DELETE = "DELETE", "Delete"
+    DUPLICATE = "DUPLICATE", "Duplicate"
+    MOVE = "MOVE", "Move"
+
+
+class WellPlannerPlannedStepOperation(TypedDict, total=False):
+    type: WellPlannerPlannedStepOperationType
+    step: int
+    order: int
+    data: dict[str, Any]
+
+
+def apply_well_planner_planned_step_operation(
+    *, well_planner: WellPlanner, user: User, operation: WellPlannerPlannedStepOperation
+) -> WellPlannerPlannedStep | None:
+    if operation['type'] == WellPlannerPlannedStepOperationType.CREATE:
+        return create_well_planner_planned_step(
+            well_planner=well_planner, user=user, calculate_emissions=False, **operation['data']
+        )
+
+    planned_step = well_planner.planned_steps.filter(pk=operation['step']).first()  # type: ignore
+    if planned_step is None:
+        logger.info(
+            f"WellPlannerPlannedStep(pk={operation['step']}) does not exist in WellPlanner(pk={well_planner.pk})."
+        )
+        raise ValidationError("Phase does not exist.")
+
+    match operation['type']:
+        case WellPlannerPlannedStepOperationType.UPDATE:
+            return update_well_planner_planned_step(
+                planned_step=planned_step, user=user, calculate_emissions=False, **operation['data']
+            )
+        case WellPlannerPlannedStepOperationType.DELETE:
+            delete_well_planner_planned_step(planned_step=planned_step, user=user, calculate_emissions=False)
+            return None
+        case WellPlannerPlannedStepOperationType.DUPLICATE:
+            return duplicate_well_planner_planned_step(planned_step=planned_step, user=user, calculate_emissions=False)
+        case WellPlannerPlannedStepOperationType.MOVE:
+            return move_well_planner_planned_step(
+                step=planned_step, user=user, order=operation['order'], calculate_emissions=False
+            )
+
+    raise ValueError(f"Unknown planned step operation: {operation['type']}")
+
+
+@transaction.atomic
+@require_well_step(allowed_steps=[WellPlannerWizardStep.WELL_PLANNING], error='Phases cannot be updated right now.')
+def bulk_update_well_planner_planned_steps(
+    *, well_planner: WellPlanner, user: User, operations: list[WellPlannerPlannedStepOperation]
+) -> list[WellPlannerPlannedStep | None]:
+    """
+    Apply all operations in order and recalculate planned emissions once. Either every operation is applied or,
+    when any of them fails, none is and the errors are raised keyed by the operation index.
+    """
+    logger.info(
+        f"User(pk={user.pk}) is applying {len(operations)} operations to WellPlanner(pk={well_planner.pk}) phases."
+    )
+    results: list[WellPlannerPlannedStep | None] = []
+    errors: dict[str, list[str]] = {}
+
+    for index, operation in enumerate(operations):
+        try:
+            # savepoint per operation, so the remaining operations are still validated
+            with transaction.atomic():
+                results.append(
+                    apply_well_planner_planned_step_operation(well_planner=well_planner, user=user, operation=operation)
+                )
+        except ValidationError as error:
+            errors[str(index)] = error.messages
+            results.append(None)
+
+    if errors:
+        logger.info(f"Unable to apply operations to WellPlanner(pk={well_planner.pk}) phases. Errors: {errors}.")
+        raise ValidationError(errors)
+
+    calculate_planned_emissions(well_planner)
+
+    logger.info(f"Operations have been applied to WellPlanner(pk={well_planner.pk}) phases.")
+    return results
+
+
 @transaction.atomic
 @require_well_step(
     allowed_steps=[
@@ -1467,33 +1627,52 @@ def set_well_step_materials(
     well_step: WellPlannerCompleteStep | WellPlannerPlannedStep,
     materials: list[WellPlannerStepMaterialData],
 ) -> None:
-    materials_to_delete = well_step.materials.exclude(
-        pk__in=[material['id'] for material in materials if material.get('id') is not None]
-    )
+    """
+    Materials with an id update the existing material, materials without one are created and the remaining
+    materials of the step are deleted. Changes are diffed in memory and applied with bulk queries.
+    """
+    existing_materials = {material.pk: material for material in well_step.materials.all()}
+    material_ids = {material_data['id'] for material_data in materials if material_data.get('id')}  # type: ignore
 
-    for material in materials_to_delete:
-        material.delete()
-        logger.info(f"{material.__class__.__name__}(pk={material.pk}) has been deleted.")
+    if not material_ids.issubset(existing_materials):
+        raise ValidationError({"materials": "Chosen materials is not a valid choice."})
+
+    material_model = well_step.materials.model
+    materials_to_update = []
+    materials_to_create = []
 
     for material_data in materials:
-        material_id = material_data.pop('id', None)  # type: ignore
+        material_id = material_data.get('id')
 
         if material_id:
-            well_step_material = well_step.materials.filter(pk=material_id).first()
-
-            if not well_step_material:
-                raise ValidationError({"materials": "Chosen materials is not a valid choice."})
-
+            well_step_material = existing_materials[material_id]
             well_step_material.material_type = material_data['material_type']
             well_step_material.quantity = material_data['quantity']
             well_step_material.quota = material_data['quota']
-
-            well_step_material.save()
-            logger.info(f"{well_step_material.__class__.__name__}(pk={well_step_material.pk}) has been updated.")
+            materials_to_update.append(well_step_material)
         else:
-            well_step_material = well_step.materials.create(
-                material_type=material_data['material_type'],
-                quantity=material_data['quantity'],
-                quota=material_data['quota'],
+            materials_to_create.append(
+                material_model(
+                    step=well_step,
+                    material_type=material_data['material_type'],
+                    quantity=material_data['quantity'],
+                    quota=material_data['quota'],
+                )
             )
-            logger.info(f"{well_step_material.__class__.__name__}(pk={well_step_material.pk}) has been created.")
+
+    material_ids_to_delete = existing_materials.keys() - material_ids
+    if material_ids_to_delete:
+        well_step.materials.filter(pk__in=material_ids_to_delete).delete()
+        logger.info(f"{material_model.__name__}(pk__in={sorted(material_ids_to_delete)}) have been deleted.")
+
+    if materials_to_update:
+        material_model.objects.bulk_update(materials_to_update, ['material_type', 'quantity', 'quota'])
+        logger.info(
+            f"{material_model.__name__}(pk__in={[material.pk for material in materials_to_update]}) have been updated."
+        )
+
+    if materials_to_create:
+        material_model.objects.bulk_create(materials_to_create)
+        logger.info(
+            f"{material_model.__name__}(pk__in={[material.pk for material in materials_to_create]}) have been created."
+        )
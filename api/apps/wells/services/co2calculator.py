@@ -1,9 +1,9 @@
 import logging
 from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import DefaultDict, NamedTuple, TypedDict, cast
+from typing import DefaultDict, NamedTuple, TypedDict, TypeVar, cast
 
-from django.db.models import QuerySet, Sum
+from django.db.models import QuerySet, Sum, prefetch_related_objects
 
 from apps.emissions.models import (
     AssetSeason,
@@ -22,6 +22,8 @@ logger = logging.getLogger(__name__)
 CO2_FACTOR = 3.17
 HELICOPTER_CO2_FACTOR = 3.16
 
+WellPlannerStepT = TypeVar('WellPlannerStepT', WellPlannerPlannedStep, WellPlannerCompleteStep)
+
 
 class VesselOperation(NamedTuple):
     # number of days in operation
@@ -351,13 +353,46 @@ def subtract_well_planner_step_co2s(
     return subtracted_well_planner_co2
 
 
-def calculate_well_planner_step_base_co2(*, well_planner_step: WellPlannerPlannedStep, duration: float) -> float:
-    baseline_input = BaselineInput.objects.get(
-        baseline=well_planner_step.well_planner.baseline,
-        phase=well_planner_step.phase,
-        mode=well_planner_step.mode,
-        season=well_planner_step.season,
+def prefetch_well_planner_steps_co2(steps: QuerySet[WellPlannerStepT]) -> QuerySet[WellPlannerStepT]:
+    """
+    Load the step relations read by the CO2 calculation upfront, so calculating CO2 of all steps of
+    a well planner takes the same number of queries regardless of the number of steps.
+    """
+    return steps.select_related('phase', 'mode').prefetch_related(
+        'materials__material_type', 'emission_reduction_initiatives__emission_reduction_initiative_inputs'
+    )
+
+
+def get_co2_planned_steps(well_planner: WellPlanner) -> QuerySet[WellPlannerPlannedStep]:
+    """
+    Return planned steps of the well planner in order, with everything their CO2 calculation reads
+    loaded upfront. The steps share the given well planner instance and its prefetched relations.
+    """
+    prefetch_related_objects(
+        [well_planner],
+        'baseline__baselineinput_set',
+        'plannedhelicopteruse_set__helicopter_type',
+        'plannedvesseluse_set__vessel_type',
+    )
+    return prefetch_well_planner_steps_co2(well_planner.planned_steps.order_by('order'))  # type: ignore
+
+
+def get_well_planner_step_baseline_input(well_planner_step: WellPlannerPlannedStep) -> BaselineInput:
+    for baseline_input in well_planner_step.well_planner.baseline.baselineinput_set.all():
+        if (
+            baseline_input.phase_id == well_planner_step.phase_id
+            and baseline_input.mode_id == well_planner_step.mode_id
+            and baseline_input.season == well_planner_step.season
+        ):
+            return baseline_input
+
+    raise BaselineInput.DoesNotExist(
+        f'BaselineInput matching the phase, mode and season of {well_planner_step} does not exist.'
     )
+
+
+def calculate_well_planner_step_base_co2(*, well_planner_step: WellPlannerPlannedStep, duration: float) -> float:
+    baseline_input = get_well_planner_step_baseline_input(well_planner_step)
     base_co2 = calculate_phase_base_co2(
         phase_duration=duration,
         fuel_consumption=baseline_input.value,
@@ -387,9 +422,10 @@ def calculate_well_planner_step_cement_co2(
 ) -> float:
     cement_co2 = 0.0
 
-    for cement_material in well_planner_step.materials.select_related('material_type').filter(
-        material_type__category=MaterialCategory.CEMENT
-    ):
+    for cement_material in well_planner_step.materials.all():
+        if cement_material.material_type.category != MaterialCategory.CEMENT:
+            continue
+
         cement_co2 += calculate_phase_cement_co2(
             cement=cement_material.quantity,
             co2_factor=cement_material.material_type.co2,
@@ -401,9 +437,10 @@ def calculate_well_planner_step_cement_co2(
 def calculate_well_planner_step_steel_co2(well_planner_step: BaseWellPlannerStep) -> float:
     steel_co2 = 0.0
 
-    for steel_material in well_planner_step.materials.select_related('material_type').filter(
-        material_type__category=MaterialCategory.STEEL
-    ):
+    for steel_material in well_planner_step.materials.all():
+        if steel_material.material_type.category != MaterialCategory.STEEL:
+            continue
+
         steel_co2 += calculate_phase_steel_co2(
             steel=steel_material.quantity,
             co2_factor=steel_material.material_type.co2,
@@ -449,16 +486,18 @@ def calculate_well_planner_step_emission_reduction_initiative_improvements(
 ) -> list[WellPlannerStepCO2EmissionReductionInitiative]:
     emission_reduction_initiative_improvements = []
 
-    emission_reduction_initiative_inputs = (
-        EmissionReductionInitiativeInput.objects.filter(
-            emission_reduction_initiative__in=well_planner_step.emission_reduction_initiatives.exclude(
-                type=EmissionReductionInitiativeType.PRODUCTIVITY
-            ),
-            phase=well_planner_step.phase,
-            mode=well_planner_step.mode,
-        )
-        .select_related('emission_reduction_initiative')
-        .order_by('id')
+    emission_reduction_initiative_inputs = sorted(
+        (
+            emission_reduction_initiative_input
+            for emission_reduction_initiative in well_planner_step.emission_reduction_initiatives.all()
+            if emission_reduction_initiative.type != EmissionReductionInitiativeType.PRODUCTIVITY
+            for emission_reduction_initiative_input in (
+                emission_reduction_initiative.emission_reduction_initiative_inputs.all()
+            )
+            if emission_reduction_initiative_input.phase_id == well_planner_step.phase_id
+            and emission_reduction_initiative_input.mode_id == well_planner_step.mode_id
+        ),
+        key=lambda emission_reduction_initiative_input: emission_reduction_initiative_input.pk,
     )
 
     for emission_reduction_initiative_input in emission_reduction_initiative_inputs:
@@ -519,7 +558,8 @@ def calculate_well_planner_step_co2(
                 vessel_type=vessel_use.vessel_type, season=cast(AssetSeason, planned_step.season)
             ),
         )
-        for vessel_use in planned_step.well_planner.plannedvesseluse_set.filter(season=planned_step.season)
+        for vessel_use in planned_step.well_planner.plannedvesseluse_set.all()
+        if vessel_use.season == planned_step.season
     ]
     vessels_co2 = calculate_well_planner_step_vessels_co2(
         vessel_operations=vessel_operations, duration=duration, total_season_duration=total_season_duration
@@ -576,7 +616,7 @@ def calculate_total_well_planner_step_co2(well_planner: WellPlanner, improved: b
             return step.improved_duration
         return step.total_duration
 
-    planned_steps = well_planner.planned_steps.order_by('order')  # type: ignore
+    planned_steps = get_co2_planned_steps(well_planner)
     total_step_co2 = WellPlannerStepCO2Result(
         base=0,
         baseline=0,
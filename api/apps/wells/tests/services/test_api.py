@@ -5,6 +5,8 @@ from unittest.mock import MagicMock, call
 import pytest
 import pytz
 from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from pytest_mock import MockerFixture
 
 from apps.emissions.factories import (
@@ -41,12 +43,14 @@ from apps.wells.services.api import (
     WellPlannerCo2Dataset,
     WellPlannerMeasuredSummary,
     WellPlannerMeasurementDataset,
+    WellPlannerPlannedStepOperationType,
     WellPlannerStepCo2Dataset,
     WellPlannerStepMaterialData,
     approve_well_planner_complete_helicopter_uses,
     approve_well_planner_complete_steps,
     approve_well_planner_complete_vessel_uses,
     available_emission_reduction_initiatives,
+    bulk_update_well_planner_planned_steps,
     complete_well_planner_planning,
     complete_well_planner_reviewing,
     copy_well_planner_step,
@@ -70,6 +74,7 @@ from apps.wells.services.api import (
     get_well_planner_summary,
     move_well_planner_complete_step,
     move_well_planner_planned_step,
+    set_well_step_materials,
     split_duration_into_hours,
     update_custom_well,
     update_well_planner_actual_start_date,
@@ -2032,7 +2037,8 @@ def test_copy_well_planner_step():
 
 @pytest.mark.django_db
 class TestMoveWellPlannerPlannedStep:
-    def test_move_well_planner_planned_step(self, mocked_calculate_planned_emissions: MagicMock):
+    def test_move_well_planner_planned_step(self, mocker: MockerFixture):
+        mocked_recalculate_moved_planned_steps = mocker.patch("apps.wells.services.api.recalculate_moved_planned_steps")
         user = UserFactory()
         well_planner = WellPlannerFactory(current_step=WellPlannerWizardStep.WELL_PLANNING)
         ExternalEnergySupplyFactory(asset=well_planner.asset)
@@ -2054,7 +2060,9 @@ class TestMoveWellPlannerPlannedStep:
         assert second_step.order == 0
         assert first_step.order == 1
 
-        mocked_calculate_planned_emissions.assert_called_once_with(well_planner)
+        mocked_recalculate_moved_planned_steps.assert_called_once_with(
+            well_plan=well_planner, first_order=0, last_order=1
+        )
 
     @pytest.mark.parametrize('current_step', set(WellPlannerWizardStep.values) - {WellPlannerWizardStep.WELL_PLANNING})
     def test_cannot_move_for_well_planner_with_invalid_current_step(self, current_step: WellPlannerWizardStep):
@@ -2072,6 +2080,104 @@ class TestMoveWellPlannerPlannedStep:
         assert ex.value.message == "Step cannot be moved right now."
 
 
+@pytest.mark.django_db
+class TestBulkUpdateWellPlannerPlannedSteps:
+    def test_should_apply_operations_and_calculate_planned_emissions_once(
+        self, mocked_calculate_planned_emissions: MagicMock
+    ):
+        user = UserFactory()
+        well_planner = WellPlannerFactory(current_step=WellPlannerWizardStep.WELL_PLANNING)
+        ExternalEnergySupplyFactory(asset=well_planner.asset)
+        updated_step, deleted_step, duplicated_step, moved_step = WellPlannerPlannedStepFactory.create_batch(
+            4, well_planner=well_planner
+        )
+        phase = CustomPhaseFactory(asset=well_planner.asset)
+        mode = CustomModeFactory(asset=well_planner.asset)
+        BaselineInputFactory(
+            baseline=well_planner.baseline, phase=phase, mode=mode, season=WELL_PLANNER_PLANNED_STEP_DATA["season"]
+        )
+        data = {
+            **WELL_PLANNER_PLANNED_STEP_DATA,
+            "phase": phase,
+            "mode": mode,
+            "emission_reduction_initiatives": [],
+            "materials": [],
+        }
+
+        created_step, updated, deleted, duplicate_step, moved = bulk_update_well_planner_planned_steps(
+            well_planner=well_planner,
+            user=user,
+            operations=[
+                {"type": WellPlannerPlannedStepOperationType.CREATE, "data": data},
+                {"type": WellPlannerPlannedStepOperationType.UPDATE, "step": updated_step.pk, "data": data},
+                {"type": WellPlannerPlannedStepOperationType.DELETE, "step": deleted_step.pk},
+                {"type": WellPlannerPlannedStepOperationType.DUPLICATE, "step": duplicated_step.pk},
+                {"type": WellPlannerPlannedStepOperationType.MOVE, "step": moved_step.pk, "order": 0},
+            ],
+        )
+
+        assert created_step.phase == phase
+        assert updated == updated_step
+        assert deleted is None
+        assert moved == moved_step
+
+        updated_step.refresh_from_db()
+        assert updated_step.phase == phase
+        assert updated_step.duration == WELL_PLANNER_PLANNED_STEP_DATA["duration"]
+
+        assert list(well_planner.planned_steps.order_by('order')) == [
+            moved_step,
+            updated_step,
+            duplicated_step,
+            duplicate_step,
+            created_step,
+        ]
+
+        mocked_calculate_planned_emissions.assert_called_once_with(well_planner)
+
+    def test_should_not_apply_any_operation_when_one_fails(self, mocked_calculate_planned_emissions: MagicMock):
+        user = UserFactory()
+        well_planner = WellPlannerFactory(current_step=WellPlannerWizardStep.WELL_PLANNING)
+        first_step, second_step = WellPlannerPlannedStepFactory.create_batch(2, well_planner=well_planner)
+        other_step = WellPlannerPlannedStepFactory()
+
+        with pytest.raises(ValidationError) as ex:
+            bulk_update_well_planner_planned_steps(
+                well_planner=well_planner,
+                user=user,
+                operations=[
+                    {"type": WellPlannerPlannedStepOperationType.DELETE, "step": first_step.pk},
+                    {"type": WellPlannerPlannedStepOperationType.DELETE, "step": other_step.pk},
+                    {"type": WellPlannerPlannedStepOperationType.MOVE, "step": second_step.pk, "order": 0},
+                    {"type": WellPlannerPlannedStepOperationType.DELETE, "step": first_step.pk},
+                ],
+            )
+
+        assert ex.value.message_dict == {
+            "1": ["Phase does not exist."],
+            "3": ["Phase does not exist."],
+        }
+        assert list(well_planner.planned_steps.order_by('order')) == [first_step, second_step]
+        mocked_calculate_planned_emissions.assert_not_called()
+
+    @pytest.mark.parametrize(
+        'current_step', (set(WellPlannerWizardStep.values) - {WellPlannerWizardStep.WELL_PLANNING})
+    )
+    def test_should_raise_error_for_invalid_current_step(self, current_step: WellPlannerWizardStep):
+        user = UserFactory()
+        well_planner = WellPlannerFactory(current_step=current_step)
+        step = WellPlannerPlannedStepFactory(well_planner=well_planner)
+
+        with pytest.raises(ValidationError) as ex:
+            bulk_update_well_planner_planned_steps(
+                well_planner=well_planner,
+                user=user,
+                operations=[{"type": WellPlannerPlannedStepOperationType.DELETE, "step": step.pk}],
+            )
+
+        assert ex.value.message == "Phases cannot be updated right now."
+
+
 @pytest.mark.django_db
 class TestMoveWellPlannerCompleteStep:
     @pytest.mark.parametrize(
@@ -2704,3 +2810,85 @@ class TestAvailableEmissionReductionInitiatives:
         emission_reduction_initiatives = available_emission_reduction_initiatives(well_planner=well_planner)
 
         assert list(emission_reduction_initiatives) == []
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'StepFactory, StepMaterialFactory',
+    (
+        (WellPlannerPlannedStepFactory, WellPlannedStepMaterialFactory),
+        (WellPlannerCompleteStepFactory, WellCompleteStepMaterialFactory),
+    ),
+)
+class TestSetWellStepMaterials:
+    def test_should_set_well_step_materials(self, StepFactory, StepMaterialFactory):
+        step = StepFactory()
+        updated_material, deleted_material = StepMaterialFactory.create_batch(2, step=step)
+        material_type = MaterialTypeFactory(tenant=step.well_planner.asset.tenant)
+
+        set_well_step_materials(
+            well_step=step,
+            materials=[
+                WellPlannerStepMaterialData(
+                    id=updated_material.pk, material_type=material_type, quantity=10.0, quota=True
+                ),
+                WellPlannerStepMaterialData(id=None, material_type=material_type, quantity=15.0, quota=False),
+            ],
+        )
+
+        assert list(step.materials.order_by('pk').values('material_type', 'quantity', 'quota')) == [
+            {'material_type': material_type.pk, 'quantity': 10.0, 'quota': True},
+            {'material_type': material_type.pk, 'quantity': 15.0, 'quota': False},
+        ]
+        assert step.materials.filter(pk=updated_material.pk).exists()
+        assert not step.materials.filter(pk=deleted_material.pk).exists()
+
+    def test_should_raise_error_for_material_of_other_step(self, StepFactory, StepMaterialFactory):
+        step = StepFactory()
+        material = StepMaterialFactory(step=step)
+        other_material = StepMaterialFactory()
+
+        with pytest.raises(ValidationError) as ex:
+            set_well_step_materials(
+                well_step=step,
+                materials=[
+                    WellPlannerStepMaterialData(
+                        id=other_material.pk,
+                        material_type=other_material.material_type,
+                        quantity=10.0,
+                        quota=True,
+                    ),
+                ],
+            )
+
+        assert ex.value.message_dict == {"materials": ["Chosen materials is not a valid choice."]}
+        assert list(step.materials.all()) == [material]
+        other_material.refresh_from_db()
+        assert other_material.quantity == 0.0
+
+    def test_should_not_query_per_material(self, StepFactory, StepMaterialFactory):
+        def count_queries(materials_count: int) -> int:
+            step = StepFactory()
+            existing_materials = StepMaterialFactory.create_batch(2 * materials_count, step=step)
+            material_type = MaterialTypeFactory(tenant=step.well_planner.asset.tenant)
+            materials = [
+                *(
+                    WellPlannerStepMaterialData(id=material.pk, material_type=material_type, quantity=1.0, quota=True)
+                    for material in existing_materials[:materials_count]
+                ),
+                *(
+                    WellPlannerStepMaterialData(id=None, material_type=material_type, quantity=2.0, quota=False)
+                    for _ in range(materials_count)
+                ),
+            ]
+
+            with CaptureQueriesContext(connection) as queries:
+                set_well_step_materials(well_step=step, materials=materials)
+
+            assert step.materials.count() == 2 * materials_count
+            return len(queries)
+
+        queries_count = count_queries(1)
+
+        assert queries_count <= 5
+        assert count_queries(10) == queries_count
@@ -1,3 +1,4 @@
+import gzip
 from datetime import date, datetime, timedelta
 
 import pytest
@@ -863,6 +864,163 @@ class TestDeleteWellPlannerPlannedStepApi:
         assert response.data == {"detail": 'You do not have permission to perform this action.'}
 
 
+@pytest.mark.django_db
+class TestBulkUpdateWellPlannerPlannedStepsApi:
+    def test_should_bulk_update_well_planner_planned_steps(self):
+        tenant_user = TenantUserRelationFactory()
+        well_planner = WellPlannerFactory(
+            asset__tenant=tenant_user.tenant, current_step=WellPlannerWizardStep.WELL_PLANNING
+        )
+        ExternalEnergySupplyFactory(asset=well_planner.asset)
+        phase = CustomPhaseFactory(asset=well_planner.asset)
+        mode = CustomModeFactory(asset=well_planner.asset)
+        BaselineInputFactory(baseline=well_planner.baseline, phase=phase, mode=mode, season=AssetSeason.SUMMER)
+        first_step, second_step = WellPlannerPlannedStepFactory.create_batch(
+            2, well_planner=well_planner, phase=phase, mode=mode, season=AssetSeason.SUMMER
+        )
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        data = {
+            **WELL_PLANNER_PLANNED_STEP_DATA,
+            "phase": phase.pk,
+            "mode": mode.pk,
+            "season": AssetSeason.SUMMER,
+            "emission_reduction_initiatives": [],
+            "materials": [],
+        }
+
+        url = reverse(
+            'wells:bulk_update_well_planner_planned_steps',
+            kwargs={"tenant_id": tenant_user.tenant_id, "well_planner_id": well_planner.pk},
+        )
+        response = api_client.post(
+            url,
+            data={
+                "operations": [
+                    {"type": "CREATE", "data": data},
+                    {"type": "UPDATE", "step": first_step.pk, "data": {**data, "duration": 10}},
+                    {"type": "DELETE", "step": second_step.pk},
+                    {"type": "MOVE", "step": first_step.pk, "order": 1},
+                ]
+            },
+            format='json',
+        )
+
+        assert response.status_code == 200
+        created_step = well_planner.planned_steps.exclude(pk=first_step.pk).get()
+        assert response.data['results'] == [
+            {"type": "CREATE", "step": created_step.pk},
+            {"type": "UPDATE", "step": first_step.pk},
+            {"type": "DELETE", "step": None},
+            {"type": "MOVE", "step": first_step.pk},
+        ]
+        well_planner.refresh_from_db()
+        assert response.data['well_planner'] == WellPlannerDetailsSerializer(well_planner).data
+        assert [step['id'] for step in response.data['well_planner']['planned_steps']] == [
+            created_step.pk,
+            first_step.pk,
+        ]
+
+    def test_should_validate_operations(self):
+        tenant_user = TenantUserRelationFactory()
+        well_planner = WellPlannerFactory(
+            asset__tenant=tenant_user.tenant, current_step=WellPlannerWizardStep.WELL_PLANNING
+        )
+        planned_step = WellPlannerPlannedStepFactory(well_planner=well_planner)
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        url = reverse(
+            'wells:bulk_update_well_planner_planned_steps',
+            kwargs={"tenant_id": tenant_user.tenant_id, "well_planner_id": well_planner.pk},
+        )
+        response = api_client.post(
+            url,
+            data={
+                "operations": [
+                    {"type": "DELETE"},
+                    {"type": "MOVE", "step": planned_step.pk},
+                    {"type": "DUPLICATE", "step": planned_step.pk},
+                ]
+            },
+            format='json',
+        )
+
+        assert response.status_code == 400
+        assert response.data == {
+            "detail": {
+                "operations": [
+                    {"step": ["This field is required."]},
+                    {"order": ["This field is required."]},
+                    {},
+                ]
+            }
+        }
+        assert well_planner.planned_steps.count() == 1
+
+    def test_should_not_apply_operations_when_one_fails(self):
+        tenant_user = TenantUserRelationFactory()
+        well_planner = WellPlannerFactory(
+            asset__tenant=tenant_user.tenant, current_step=WellPlannerWizardStep.WELL_PLANNING
+        )
+        planned_step = WellPlannerPlannedStepFactory(well_planner=well_planner)
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        url = reverse(
+            'wells:bulk_update_well_planner_planned_steps',
+            kwargs={"tenant_id": tenant_user.tenant_id, "well_planner_id": well_planner.pk},
+        )
+        response = api_client.post(
+            url,
+            data={
+                "operations": [
+                    {"type": "DELETE", "step": planned_step.pk},
+                    {"type": "DELETE", "step": 9999},
+                ]
+            },
+            format='json',
+        )
+
+        assert response.status_code == 400
+        assert response.data == {"detail": {"1": ["Phase does not exist."]}}
+        assert WellPlannerPlannedStep.objects.filter(pk=planned_step.pk).exists()
+
+    def test_should_be_forbidden_for_anonymous_user(self):
+        tenant = TenantFactory()
+        well_planner = WellPlannerFactory(asset__tenant=tenant, current_step=WellPlannerWizardStep.WELL_PLANNING)
+        api_client = APIClient()
+
+        url = reverse(
+            'wells:bulk_update_well_planner_planned_steps',
+            kwargs={"tenant_id": tenant.pk, "well_planner_id": well_planner.pk},
+        )
+        response = api_client.post(url)
+
+        assert response.status_code == 403
+        assert response.data == {"detail": 'Authentication credentials were not provided.'}
+
+    def test_should_be_forbidden_for_non_tenant_user(self):
+        user = UserFactory()
+        tenant = TenantFactory()
+        well_planner = WellPlannerFactory(asset__tenant=tenant, current_step=WellPlannerWizardStep.WELL_PLANNING)
+        api_client = APIClient()
+        api_client.force_authenticate(user=user)
+
+        url = reverse(
+            'wells:bulk_update_well_planner_planned_steps',
+            kwargs={"tenant_id": tenant.pk, "well_planner_id": well_planner.pk},
+        )
+        response = api_client.post(url)
+
+        assert response.status_code == 403
+        assert response.data == {"detail": 'You do not have permission to perform this action.'}
+
+
 @pytest.mark.django_db
 class TestWellPlannerPlannedCo2Api:
     def test_should_retrieve_well_planner_planned_co2(self):
@@ -2083,6 +2241,67 @@ class TestWellPlannerMeasuredCo2Api:
         assert response.data == {"detail": 'You do not have permission to perform this action.'}
 
 
+@pytest.mark.django_db
+class TestWellPlannerMeasuredCo2ExportApi:
+    def test_should_export_well_planner_measured_co2(self):
+        tenant_user = TenantUserRelationFactory()
+
+        well_planner = WellPlannerFactory(
+            asset__tenant=tenant_user.tenant, current_step=WellPlannerWizardStep.WELL_REVIEWING
+        )
+        complete_step = WellPlannerCompleteStepFactory(
+            well_planner=well_planner,
+            duration=1,
+            external_energy_supply_enabled=False,
+        )
+        BaselineInputFactory(baseline__asset=well_planner.asset, phase=complete_step.phase, value=0)
+        MonitorFunctionValueFactory(
+            monitor_function__vessel=well_planner.asset.vessel,
+            monitor_function__type=MonitorFunctionType.CO2_EMISSION,
+            value=0,
+        )
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        url = reverse(
+            'wells:well_planner_measured_co2_export',
+            kwargs={
+                "tenant_id": tenant_user.tenant_id,
+                "well_planner_id": well_planner.pk,
+            },
+        )
+        response = api_client.get(url, {"file_format": "csv", "gzip": "true"})
+
+        assert response.status_code == 200
+        assert response['Content-Type'] == 'application/gzip'
+        assert response['Content-Disposition'] == f'attachment; filename=well-{well_planner.pk}-measured-co2.csv.gz'
+        assert gzip.decompress(b''.join(response.streaming_content)).decode().splitlines() == [
+            'date,step,phase,mode,rig,vessels,helicopters,external_energy_supply,cement,steel,'
+            'emission_reduction_initiatives',
+            f'{datetime.combine(well_planner.actual_start_date, datetime.min.time())},{complete_step.pk},'
+            f'{complete_step.phase.name},{complete_step.mode.name},0.0,0.0,0.0,0.0,0.0,0.0,0.0',
+        ]
+
+    def test_should_be_not_found_for_deleted_well_planner(self):
+        tenant_user = TenantUserRelationFactory()
+        well_planner = WellPlannerFactory(asset__tenant=tenant_user.tenant, deleted=True)
+
+        api_client = APIClient()
+        api_client.force_authenticate(user=tenant_user.user)
+
+        url = reverse(
+            'wells:well_planner_measured_co2_export',
+            kwargs={
+                "tenant_id": tenant_user.tenant_id,
+                "well_planner_id": well_planner.pk,
+            },
+        )
+        response = api_client.get(url)
+
+        assert response.status_code == 404
+
+
 @pytest.mark.django_db
 @pytest.mark.parametrize(
     "path,monitor_function_type",
@@ -40,6 +40,11 @@ urlpatterns += [
         apis.CreateWellPlannerPlannedStepApi.as_view(),
         name='create_well_planner_planned_step',
     ),
+    path(
+        'wells/planners/<int:well_planner_id>/planned/steps/bulk/',
+        apis.BulkUpdateWellPlannerPlannedStepsApi.as_view(),
+        name='bulk_update_well_planner_planned_steps',
+    ),
     path(
         'wells/planners/<int:well_planner_id>/planned/steps/<int:well_planner_planned_step_id>/update/',
         apis.UpdateWellPlannerPlannedStepApi.as_view(),
@@ -75,6 +80,16 @@ urlpatterns += [
         apis.WellPlannerPlannedCo2SavedApi.as_view(),
         name='well_planner_planned_co2_saved',
     ),
+    path(
+        'wells/planners/<int:well_planner_id>/planned/co2/export/',
+        apis.WellPlannerPlannedCo2ExportApi.as_view(),
+        name='well_planner_planned_co2_export',
+    ),
+    path(
+        'wells/planners/<int:well_planner_id>/planned/co2/saved/export/',
+        apis.WellPlannerPlannedCo2SavedExportApi.as_view(),
+        name='well_planner_planned_co2_saved_export',
+    ),
     path(
         'wells/planners/<int:well_planner_id>/planned/summary/',
         apis.WellPlannerPlannedSummaryApi.as_view(),
@@ -125,6 +140,11 @@ urlpatterns += [
         apis.WellPlannerMeasuredCo2Api.as_view(),
         name='well_planner_measured_co2',
     ),
+    path(
+        'wells/planners/<int:well_planner_id>/measured/co2/export/',
+        apis.WellPlannerMeasuredCo2ExportApi.as_view(),
+        name='well_planner_measured_co2_export',
+    ),
     path(
         'wells/planners/<int:well_planner_id>/measured/wind-speed/',
         apis.WellPlannerMeasuredWindSpeedApi.as_view(),
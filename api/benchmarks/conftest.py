@@ -0,0 +1,24 @@
+from typing import Any, Callable
+
+import pytest
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from apps.core.instrumentation import collect_metrics
+
+
+@pytest.fixture
+def run_benchmark(benchmark: BenchmarkFixture) -> Callable[..., Any]:
+    """
+    Benchmark a function and store its query count and database time next to the timings
+    in the saved benchmark results.
+    """
+
+    def run(func: Callable[..., Any], *args: Any, rounds: int = 3, **kwargs: Any) -> Any:
+        with collect_metrics() as metrics:
+            result = benchmark.pedantic(func, args=args, kwargs=kwargs, rounds=rounds, iterations=1)
+
+        benchmark.extra_info['queries'] = metrics.queries // rounds
+        benchmark.extra_info['db_time'] = metrics.db_time / rounds
+        return result
+
+    return run
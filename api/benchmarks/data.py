@@ -0,0 +1,196 @@
+import copy
+import datetime
+import random
+
+import pytz
+from django.utils import timezone
+
+from apps.emissions.factories import (
+    BaselineInputFactory,
+    CompleteHelicopterUseFactory,
+    CompleteVesselUseFactory,
+    CustomModeFactory,
+    CustomPhaseFactory,
+    EmissionReductionInitiativeInputFactory,
+    PlannedHelicopterUseFactory,
+    PlannedVesselUseFactory,
+)
+from apps.emissions.models import AssetSeason, CustomMode, CustomPhase, EmissionReductionInitiative
+from apps.kims.factories import TagFactory, VesselFactory
+from apps.kims.models import TagValue
+from apps.monitors.factories import MonitorFunctionFactory
+from apps.monitors.models import MonitorFunction, MonitorFunctionType, MonitorFunctionValue
+from apps.projects.factories import PlanFactory, PlanWellRelationFactory
+from apps.projects.models import Plan
+from apps.rigs.models import CustomJackupRig
+from apps.tenants.factories import TenantFactory
+from apps.tenants.models import Tenant, TenantUserRelation, User, UserRole
+from apps.wells.factories import WellPlannerCompleteStepFactory, WellPlannerFactory, WellPlannerPlannedStepFactory
+from apps.wells.models import WellPlanner, WellPlannerWizardStep
+
+MEASURED_STEPS = 10
+PLAN_WELLS = 5
+MONITOR_FUNCTION_TAGS = 5
+
+MONITOR_FUNCTION_SOURCE = """
+def monitor(tags):
+    return tags['benchmark-tag-0']['mean'] + tags['benchmark-tag-1']['average']
+"""
+
+VECTORIZED_MONITOR_FUNCTION_SOURCE = """
+def monitor(tags):
+    means = tags['benchmark-tag-0']['mean']
+    averages = tags['benchmark-tag-1']['average']
+    return [mean + average for mean, average in zip(means, averages)]
+"""
+
+
+def hourly_dates(start: datetime.datetime, days: int) -> list[datetime.datetime]:
+    return [start + datetime.timedelta(hours=hour) for hour in range(days * 24)]
+
+
+def create_well_planner_inputs(
+    well_planner: WellPlanner,
+) -> tuple[CustomPhase, CustomMode, EmissionReductionInitiative]:
+    phase = CustomPhaseFactory(asset=well_planner.asset)
+    mode = CustomModeFactory(asset=well_planner.asset)
+
+    for season in AssetSeason:
+        BaselineInputFactory(baseline=well_planner.baseline, phase=phase, mode=mode, season=season, value=25.0)
+
+    emission_reduction_initiative_input = EmissionReductionInitiativeInputFactory(
+        emission_reduction_initiative__emission_management_plan=well_planner.emission_management_plan,
+        phase=phase,
+        mode=mode,
+        value=10.0,
+    )
+
+    return phase, mode, emission_reduction_initiative_input.emission_reduction_initiative
+
+
+def create_planned_well_planner(steps: int) -> WellPlanner:
+    """
+    Well plan in the planning phase with the given number of planned steps, alternating seasons,
+    vessel and helicopter uses and an emission reduction initiative applied to every step.
+    """
+    well_planner = WellPlannerFactory(current_step=WellPlannerWizardStep.WELL_PLANNING)
+    phase, mode, emission_reduction_initiative = create_well_planner_inputs(well_planner)
+
+    for season in AssetSeason:
+        PlannedVesselUseFactory(well_planner=well_planner, vessel_type__tenant=well_planner.asset.tenant, season=season)
+    PlannedHelicopterUseFactory(well_planner=well_planner, helicopter_type__tenant=well_planner.asset.tenant)
+
+    for index in range(steps):
+        planned_step = WellPlannerPlannedStepFactory(
+            well_planner=well_planner,
+            phase=phase,
+            mode=mode,
+            season=AssetSeason.values[index % len(AssetSeason.values)],
+            duration=2.0,
+            improved_duration=1.5,
+        )
+        planned_step.emission_reduction_initiatives.add(emission_reduction_initiative)
+
+    return well_planner
+
+
+def create_measured_well_planner(days: int) -> WellPlanner:
+    """
+    Well plan in the reviewing phase spanning the given number of days with hourly measured rig CO2.
+    """
+    actual_start_date = (timezone.now() - datetime.timedelta(days=days)).date()
+    well_planner = WellPlannerFactory(
+        current_step=WellPlannerWizardStep.WELL_REVIEWING, actual_start_date=actual_start_date
+    )
+    phase, mode, emission_reduction_initiative = create_well_planner_inputs(well_planner)
+
+    for season in AssetSeason:
+        CompleteVesselUseFactory(
+            well_planner=well_planner, vessel_type__tenant=well_planner.asset.tenant, season=season
+        )
+    CompleteHelicopterUseFactory(well_planner=well_planner, helicopter_type__tenant=well_planner.asset.tenant)
+
+    for index in range(MEASURED_STEPS):
+        complete_step = WellPlannerCompleteStepFactory(
+            well_planner=well_planner,
+            phase=phase,
+            mode=mode,
+            season=AssetSeason.values[index % len(AssetSeason.values)],
+            duration=days / MEASURED_STEPS,
+        )
+        complete_step.emission_reduction_initiatives.add(emission_reduction_initiative)
+
+    monitor_function = MonitorFunctionFactory(
+        vessel=well_planner.asset.vessel,
+        type=MonitorFunctionType.CO2_EMISSION,
+        start_date=datetime.datetime.combine(actual_start_date, datetime.time(), tzinfo=pytz.UTC),
+    )
+    MonitorFunctionValue.objects.bulk_create(
+        [
+            MonitorFunctionValue(monitor_function=monitor_function, date=date, value=random.uniform(0, 100))
+            for date in hourly_dates(monitor_function.start_date, days)
+        ],
+        batch_size=1000,
+    )
+
+    return well_planner
+
+
+def create_monitor_function(days: int, vectorized: bool = False) -> MonitorFunction:
+    """
+    Monitor function of a vessel with hourly tag values synced for the given number of days.
+    """
+    tags_synced_at = timezone.now().replace(minute=0, second=0, microsecond=0)
+    start_date = tags_synced_at - datetime.timedelta(days=days)
+
+    vessel = VesselFactory(tags_synced_at=tags_synced_at)
+    tags = [TagFactory(vessel=vessel, name=f'benchmark-tag-{index}') for index in range(MONITOR_FUNCTION_TAGS)]
+    TagValue.objects.bulk_create(
+        [
+            TagValue(tag=tag, date=date, mean=str(random.uniform(0, 1000)), average=str(random.uniform(0, 1000)))
+            for tag in tags
+            for date in hourly_dates(start_date, days)
+        ],
+        batch_size=1000,
+    )
+
+    return MonitorFunctionFactory(
+        vessel=vessel,
+        monitor_function_source=VECTORIZED_MONITOR_FUNCTION_SOURCE if vectorized else MONITOR_FUNCTION_SOURCE,
+        start_date=start_date,
+        vectorized=vectorized,
+    )
+
+
+def create_jackup_plan(rig: CustomJackupRig, rigs: int) -> tuple[Plan, list[CustomJackupRig]]:
+    """
+    Plan with a few wells and the given number of copies of the jackup rig to calculate it for.
+    """
+    plan = PlanFactory()
+    PlanWellRelationFactory.create_batch(PLAN_WELLS, plan=plan)
+
+    custom_jackup_rigs = []
+    for _ in range(rigs):
+        custom_jackup_rig = copy.copy(rig)
+        custom_jackup_rig.pk = None
+        custom_jackup_rig._state.adding = True
+        custom_jackup_rig.save()
+        custom_jackup_rigs.append(custom_jackup_rig)
+
+    return plan, custom_jackup_rigs
+
+
+def create_tenant_users(users: int) -> Tenant:
+    """
+    Tenant with the given number of members. Users are inserted in bulk and have no usable password.
+    """
+    tenant = TenantFactory()
+    created_users = User.objects.bulk_create(
+        User(username=email, email=email, role=UserRole.ADMIN, password='!')
+        for email in (f'benchmark-{tenant.pk}-{index}@example.com' for index in range(users))
+    )
+    TenantUserRelation.objects.bulk_create(
+        TenantUserRelation(tenant=tenant, user=user, role=TenantUserRelation.TenantUserRole.MEMBER)
+        for user in created_users
+    )
+    return tenant
@@ -0,0 +1,51 @@
+import datetime
+import random
+from typing import Any, Callable
+
+import pytest
+from django.utils import timezone
+
+from apps.kims.factories import TagFactory, VesselFactory
+from apps.kims.models import Tag, TagValue
+from apps.kims.services import create_tag_value_partitions
+from benchmarks.data import hourly_dates
+
+YEARS = [1, 3]
+TAGS = 5
+
+
+def create_tag_values(years: int) -> list[Tag]:
+    """
+    Hourly tag values of a vessel for the given number of years before now.
+    """
+    end = timezone.now().replace(minute=0, second=0, microsecond=0)
+    vessel = VesselFactory()
+    tags = [TagFactory(vessel=vessel, name=f'benchmark-tag-{index}') for index in range(TAGS)]
+    TagValue.objects.bulk_create(
+        (
+            TagValue(tag=tag, date=date, mean=str(random.uniform(0, 1000)), average=str(random.uniform(0, 1000)))
+            for tag in tags
+            for date in hourly_dates(end - datetime.timedelta(days=365 * years), 365 * years)
+        ),
+        batch_size=5000,
+    )
+    return tags
+
+
+def read_tag_values(tags: list[Tag], start: datetime.datetime, end: datetime.datetime) -> int:
+    return sum(len(TagValue.objects.filter(tag=tag, date__gte=start, date__lt=end)) for tag in tags)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('years', YEARS)
+@pytest.mark.parametrize('partitioned', (False, True), ids=('default-partition', 'monthly-partitions'))
+@pytest.mark.benchmark(group='tag-value-range-read')
+def test_read_tag_value_range(years: int, partitioned: bool, run_benchmark: Callable[..., Any]):
+    tags = create_tag_values(years)
+    if partitioned:
+        create_tag_value_partitions(months_ahead=0)
+
+    end = timezone.now().replace(minute=0, second=0, microsecond=0) - datetime.timedelta(days=30)
+    read = run_benchmark(read_tag_values, tags, end - datetime.timedelta(days=7), end)
+
+    assert read == TAGS * 7 * 24
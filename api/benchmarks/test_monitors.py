@@ -0,0 +1,28 @@
+import datetime
+from typing import Any, Callable
+
+import pytest
+
+from apps.monitors.models import MonitorFunctionValue
+from apps.monitors.services import sync_monitor_function_values
+from benchmarks.data import create_monitor_function
+
+MONITOR_DAYS = [30, 365, 1000]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('days', MONITOR_DAYS)
+@pytest.mark.parametrize('vectorized', (False, True), ids=('per-hour', 'vectorized'))
+@pytest.mark.benchmark(group='sync-monitor-function-values')
+def test_sync_monitor_function_values(days: int, vectorized: bool, run_benchmark: Callable[..., Any]):
+    monitor_function = create_monitor_function(days, vectorized=vectorized)
+
+    run_benchmark(
+        sync_monitor_function_values,
+        monitor_function=monitor_function,
+        start_date=monitor_function.start_date,
+        end_date=monitor_function.vessel.tags_synced_at - datetime.timedelta(hours=1),
+        rounds=1,
+    )
+
+    assert MonitorFunctionValue.objects.filter(monitor_function=monitor_function).count() == days * 24
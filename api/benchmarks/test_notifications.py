@@ -0,0 +1,20 @@
+from typing import Any, Callable
+
+import pytest
+
+from apps.notifications.models import Notification
+from apps.notifications.services import create_notifications
+from benchmarks.data import create_tenant_users
+
+USERS = [100, 1000, 10000]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('users', USERS)
+@pytest.mark.benchmark(group='create-notifications')
+def test_create_notifications(users: int, run_benchmark: Callable[..., Any]):
+    tenant = create_tenant_users(users)
+
+    run_benchmark(create_notifications, tenant=tenant, title='Plan calculated', url='/plans/1/')
+
+    assert Notification.objects.filter(tenant_user__tenant=tenant).count() == users * 3
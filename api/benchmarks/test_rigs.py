@@ -0,0 +1,26 @@
+from typing import Any, Callable
+
+import pytest
+
+from apps.projects.models import Plan
+from apps.rigs.models import CustomJackupPlanCO2, CustomJackupRig
+from apps.rigs.services.apis import sync_custom_jackup_plan_co2
+from benchmarks.data import create_jackup_plan
+
+RIGS = [10, 100]
+
+
+def sync_plan_co2(plan: Plan, custom_jackup_rigs: list[CustomJackupRig]) -> None:
+    for custom_jackup_rig in custom_jackup_rigs:
+        sync_custom_jackup_plan_co2(custom_jackup_rig=custom_jackup_rig, plan=plan)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('rigs', RIGS)
+@pytest.mark.benchmark(group='sync-plan-co2')
+def test_sync_plan_co2(rigs: int, concept_cj70: CustomJackupRig, run_benchmark: Callable[..., Any]):
+    plan, custom_jackup_rigs = create_jackup_plan(concept_cj70, rigs)
+
+    run_benchmark(sync_plan_co2, plan, custom_jackup_rigs)
+
+    assert CustomJackupPlanCO2.objects.filter(plan=plan).count() == rigs
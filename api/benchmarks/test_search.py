@@ -0,0 +1,69 @@
+from typing import Any, Callable, Iterable
+
+import pytest
+from django.db.models import Model
+from haystack import connections
+from haystack.backends.simple_backend import SimpleEngine, SimpleSearchBackend
+from haystack.indexes import SearchIndex
+from pytest_benchmark.fixture import BenchmarkFixture
+
+from apps.emps.models import EMP
+from apps.projects.factories import PlanFactory, ProjectFactory
+from apps.projects.models import Plan
+from apps.rigs.factories import CustomJackupRigFactory, CustomSemiRigFactory
+from apps.search.services import reindex
+
+DOCUMENTS = [100, 1000]
+BENCHMARK_ALIAS = 'benchmark'
+
+
+class PrepareSearchBackend(SimpleSearchBackend):
+    """
+    Stand-in for the elasticsearch backend preparing documents without sending them anywhere.
+    """
+
+    def update(self, index: SearchIndex, iterable: Iterable[Model], commit: bool = True) -> None:
+        for obj in iterable:
+            index.full_prepare(obj)
+
+
+class PrepareSearchEngine(SimpleEngine):
+    backend = PrepareSearchBackend
+
+
+@pytest.fixture
+def benchmark_connection():
+    connections.connections_info[BENCHMARK_ALIAS] = {'ENGINE': 'benchmarks.test_search.PrepareSearchEngine'}
+    yield BENCHMARK_ALIAS
+    del connections.connections_info[BENCHMARK_ALIAS]
+
+
+def create_emps(documents: int) -> None:
+    project = ProjectFactory()
+    CustomJackupRigFactory.create_batch(documents // 2, project=project)
+    CustomSemiRigFactory.create_batch(documents - documents // 2, project=project)
+
+
+def create_plans(documents: int) -> None:
+    PlanFactory.create_batch(documents, project=ProjectFactory())
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('documents', DOCUMENTS)
+@pytest.mark.parametrize('model, create_documents', ((EMP, create_emps), (Plan, create_plans)))
+@pytest.mark.benchmark(group='reindex')
+def test_reindex(
+    documents: int,
+    model: type[Model],
+    create_documents: Callable[[int], None],
+    benchmark_connection: str,
+    run_benchmark: Callable[..., Any],
+    benchmark: BenchmarkFixture,
+):
+    create_documents(documents)
+    index = connections[benchmark_connection].get_unified_index().get_index(model)
+
+    indexed = run_benchmark(reindex, index, using=benchmark_connection)
+
+    assert indexed == documents
+    benchmark.extra_info['documents_per_second'] = documents / benchmark.stats.stats.mean
@@ -0,0 +1,59 @@
+from typing import Any, Callable
+
+import pytest
+
+from apps.emissions.services.wells import calculate_planned_emissions
+from apps.wells.services.api import (
+    get_well_planner_measured_co2_dataset,
+    get_well_planner_planned_co2_dataset,
+    get_well_planner_saved_co2_dataset,
+)
+from benchmarks.data import create_measured_well_planner, create_planned_well_planner
+
+PLANNED_STEPS = [10, 100, 500]
+MEASURED_DAYS = [30, 365, 1000]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('steps', PLANNED_STEPS)
+class TestPlannedWellPlannerBenchmark:
+    @pytest.mark.benchmark(group='calculate-planned-emissions')
+    def test_calculate_planned_emissions(self, steps: int, run_benchmark: Callable[..., Any]):
+        well_planner = create_planned_well_planner(steps)
+
+        run_benchmark(calculate_planned_emissions, well_planner)
+
+    @pytest.mark.benchmark(group='planned-co2-dataset')
+    def test_planned_co2_dataset(self, steps: int, run_benchmark: Callable[..., Any]):
+        well_planner = create_planned_well_planner(steps)
+
+        dataset = run_benchmark(get_well_planner_planned_co2_dataset, well_planner=well_planner, improved=False)
+
+        assert dataset
+
+    @pytest.mark.benchmark(group='improved-co2-dataset')
+    def test_improved_co2_dataset(self, steps: int, run_benchmark: Callable[..., Any]):
+        well_planner = create_planned_well_planner(steps)
+
+        dataset = run_benchmark(get_well_planner_planned_co2_dataset, well_planner=well_planner, improved=True)
+
+        assert dataset
+
+    @pytest.mark.benchmark(group='saved-co2-dataset')
+    def test_saved_co2_dataset(self, steps: int, run_benchmark: Callable[..., Any]):
+        well_planner = create_planned_well_planner(steps)
+
+        dataset = run_benchmark(get_well_planner_saved_co2_dataset, well_planner=well_planner)
+
+        assert dataset
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize('days', MEASURED_DAYS)
+@pytest.mark.benchmark(group='measured-co2-dataset')
+def test_measured_co2_dataset(days: int, run_benchmark: Callable[..., Any]):
+    well_planner = create_measured_well_planner(days)
+
+    dataset = run_benchmark(get_well_planner_measured_co2_dataset, well_planner=well_planner)
+
+    assert dataset
@@ -12,6 +12,8 @@ from apps.rigs.factories import CustomJackupRigFactory, CustomSemiRigFactory
 from apps.rigs.models import Airgap, CustomJackupRig, CustomSemiRig, HighMediumLow, RigStatus, TopsideDesign
 from apps.studies.models import StudyMetric
 
+pytest_plugins = ['apps.core.pytest_plugin']
+
 
 @pytest.fixture
 def api_client() -> APIClient:
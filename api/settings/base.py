@@ -13,6 +13,7 @@ import os
 from pathlib import Path
 
 import environ
+from kombu import Queue
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 
@@ -80,6 +81,9 @@ INSTALLED_APPS = [
 SITE_ID = 1
 
 MIDDLEWARE = [
+    "apps.core.instrumentation.InstrumentationMiddleware",
+    "apps.core.routers.ReplicaRoutingMiddleware",
+    "apps.core.haystack.SearchIndexUpdatesMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -122,6 +126,14 @@ DATABASES = {
     "default": env.db(),
 }
 
+if env.str("DATABASE_REPLICA_URL", default=""):
+    DATABASES["replica"] = env.db("DATABASE_REPLICA_URL")
+
+DATABASE_ROUTERS = ["apps.core.routers.ReplicaRouter"]
+DATABASE_REPLICA_ENABLED = "replica" in DATABASES
+# seconds during which a client reads from the primary after a mutation
+DATABASE_REPLICA_STICKINESS = env.int("DATABASE_REPLICA_STICKINESS", default=10)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -172,6 +184,32 @@ CELERY_RESULT_BACKEND = CELERY_BROKER_URL
 CELERY_TASK_TIME_LIMIT = 10 * 60
 CELERY_TASK_SOFT_TIME_LIMIT = 5 * 60
 
+# workloads are consumed by separate workers, see "Celery workers" in README.md
+CELERY_TASK_DEFAULT_QUEUE = "default"
+CELERY_TASK_QUEUES = [
+    Queue(name) for name in ("default", "interactive", "kims", "monitors", "maintenance", "search", "emails")
+]
+CELERY_TASK_CREATE_MISSING_QUEUES = False
+# with the redis broker lower numbers are consumed first
+CELERY_TASK_DEFAULT_PRIORITY = 5
+CELERY_BROKER_TRANSPORT_OPTIONS = {"queue_order_strategy": "priority", "priority_steps": list(range(10))}
+# exact task names are matched first, then patterns in the given order
+CELERY_TASK_ROUTES = {
+    # recalculations triggered by users editing plans, rigs and wells
+    "apps.rigs.tasks.*": {"queue": "interactive", "priority": 0},
+    "apps.monitors.tasks.sync_all_monitor_function_values_task": {"queue": "monitors", "priority": 0},
+    "apps.monitors.tasks.run_monitor_function_test_task": {"queue": "monitors", "priority": 3},
+    # hourly monitor function values calculated after every KIMS sync
+    "apps.monitors.tasks.*": {"queue": "monitors", "priority": 6},
+    "apps.kims.tasks.create_tag_value_partitions_task": {"queue": "maintenance"},
+    "apps.kims.tasks.downsample_*": {"queue": "maintenance"},
+    "apps.kims.tasks.*": {"queue": "kims"},
+    "apps.core.tasks.update_search_index_task": {"queue": "search"},
+    "celery_haystack.*": {"queue": "search"},
+    "apps.privacy.tasks.send_*": {"queue": "emails"},
+    "djcelery_email_send_multiple": {"queue": "emails"},
+}
+
 AUTH_USER_MODEL = "tenants.User"
 
 DEFAULT_FROM_EMAIL = env("DEFAULT_FROM_EMAIL", default="")
@@ -192,6 +230,9 @@ else:
     EMAIL_USE_TLS = env.bool("EMAIL_USE_TLS", default=False)
     EMAIL_USE_SSL = env("EMAIL_USE_SSL", default=True)
 
+# number of privacy policy changed emails sent over a single mail connection
+PRIVACY_POLICY_EMAIL_CHUNK_SIZE = env.int("PRIVACY_POLICY_EMAIL_CHUNK_SIZE", default=100)
+
 SERVER_PROTOCOL = env("SERVER_PROTOCOL", default="https")
 
 REST_FRAMEWORK = {
@@ -330,6 +371,8 @@ DRF_RECAPTCHA_SECRET_KEY = RECAPTCHA_PRIVATE_KEY
 SILENCED_SYSTEM_CHECKS = ['axes.W003']
 
 REMOVE_ACCOUNTS_AFTER_DAYS = env("REMOVE_ACCOUNTS_AFTER_DAYS", default=5)
+# number of delete account requests executed in a single transaction
+DELETE_ACCOUNT_REQUESTS_CHUNK_SIZE = env.int("DELETE_ACCOUNT_REQUESTS_CHUNK_SIZE", default=100)
 
 SENTRY_DSN = env("SENTRY_DSN", default="")
 SENTRY_LEVEL = env("SENTRY_LEVEL", default="INFO")
@@ -360,7 +403,7 @@ HAYSTACK_CONNECTIONS = {
     },
 }
 
-HAYSTACK_SIGNAL_PROCESSOR = 'celery_haystack.signals.CelerySignalProcessor'
+HAYSTACK_SIGNAL_PROCESSOR = 'apps.core.haystack.BatchedCelerySignalProcessor'
 
 REDIS_CACHE_LOCATION = env("REDIS_CACHE_LOCATION")
 CACHES = {
@@ -370,6 +413,28 @@ CACHES = {
     }
 }
 
+INSTRUMENTATION_ENABLED = env.bool("INSTRUMENTATION_ENABLED", default=False)
+INSTRUMENTATION_METRICS_TOKEN = env.str("INSTRUMENTATION_METRICS_TOKEN", default="")
+
+TENANT_MEMBERSHIPS_CACHE_TIMEOUT = env.int("TENANT_MEMBERSHIPS_CACHE_TIMEOUT", default=60)
+
+SEARCH_RESULTS_CACHE_TIMEOUT = env.int("SEARCH_RESULTS_CACHE_TIMEOUT", default=60)
+SEARCH_RESULT_WINDOW = env.int("SEARCH_RESULT_WINDOW", default=100)
+
+# seconds a notification poll request waits for new notifications, every waiting request holds a worker thread
+NOTIFICATIONS_POLL_TIMEOUT = env.int("NOTIFICATIONS_POLL_TIMEOUT", default=10)
+
 KIMS_API_REQUEST_RATE = env("KIMS_API_REQUEST_RATE", default="1/s")
+# number of upcoming months with an empty tag value partition
+KIMS_TAG_VALUE_PARTITION_MONTHS_AHEAD = env.int("KIMS_TAG_VALUE_PARTITION_MONTHS_AHEAD", default=3)
+# number of downsampled tag values deleted per transaction
+KIMS_TAG_VALUE_DELETE_BATCH_SIZE = env.int("KIMS_TAG_VALUE_DELETE_BATCH_SIZE", default=5000)
+
+# number of compiled monitor functions kept in memory by every process
+MONITOR_FUNCTION_CODE_CACHE_SIZE = env.int("MONITOR_FUNCTION_CODE_CACHE_SIZE", default=256)
+# number of hours evaluated and stored at once by a monitor function test run
+MONITOR_FUNCTION_TEST_RUN_PAGE_HOURS = env.int("MONITOR_FUNCTION_TEST_RUN_PAGE_HOURS", default=168)
+# CPU seconds a monitor function test run may spend before it fails
+MONITOR_FUNCTION_TEST_RUN_CPU_TIME_LIMIT = env.int("MONITOR_FUNCTION_TEST_RUN_CPU_TIME_LIMIT", default=60)
 
 SYNC_VESSELS_TASK_SCHEDULE_MINUTE = env("SYNC_VESSELS_TASK_SCHEDULE_MINUTE", default="0")
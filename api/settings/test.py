@@ -1,5 +1,9 @@
 from settings.base import *  # noqa
 
+# same database alias, tests enable the replica routing explicitly
+DATABASES["replica"] = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}  # type: ignore # noqa
+DATABASE_REPLICA_ENABLED = False
+
 HAYSTACK_SIGNAL_PROCESSOR = "apps.core.haystack.SyncCelerySignalProcessor"
 
 KIMS_API_REQUEST_RATE = "1000000/s"